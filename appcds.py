@@ -0,0 +1,156 @@
+import os
+import sys
+import glob
+import hashlib
+import subprocess
+
+from game_files import launcher_data_path, user_cache_path, read_json, write_json_atomic
+
+# Linhas do log que indicam que o jogo chegou ao menu principal (fim do treino)
+MAIN_MENU_MARKERS = ("Sound engine started", "SoundSystem initialized")
+
+# Uma lista de classes de um treino que chegou ao menu tem milhares de entradas (JDK, LaunchWrapper,
+# Forge e Minecraft); bem menos que isso indica que a JVM foi encerrada antes de gravar tudo
+MIN_CLASS_LIST_ENTRIES = 1000
+TRAINING_MAIN_CLASS = "net/minecraft/launchwrapper/Launch"
+
+# Flags de desbloqueio da AppCDS, em ordem de tentativa:
+#  - JDK 10+: AppCDS faz parte da JVM, nenhuma flag extra
+#  - Oracle JDK 8u40+: recurso comercial, precisa ser desbloqueado
+APPCDS_FLAG_SETS = ([], ["-XX:+UnlockCommercialFeatures", "-XX:+UseAppCDS"])
+
+
+def _run_java(java_path, arguments, timeout=60):
+    creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+    return subprocess.run([java_path] + arguments, capture_output=True, text=True, errors="replace",
+                          timeout=timeout, creationflags=creationflags)
+
+
+def class_list_complete(class_list):
+    """
+    Confere se a lista do -XX:DumpLoadedClassList foi gravada até o fim: a JVM só descarrega
+    o buffer ao sair normalmente, então um encerramento à força deixa a última linha cortada.
+    """
+    with open(class_list, "rb") as f:
+        data = f.read()
+    if not data.endswith(b"\n"):
+        return False
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return len(lines) >= MIN_CLASS_LIST_ENTRIES and TRAINING_MAIN_CLASS in lines
+
+
+def appcds_flags(java_runtime):
+    """
+    Descobre (uma vez por binário do java) quais flags habilitam a AppCDS.
+    Retorna a lista de flags, ou None se a JVM não suportar arquivos de classes da aplicação.
+    """
+    cache_path = user_cache_path("appcds_support.json")
+    cache = read_json(cache_path, {})
+    st = os.stat(java_runtime.path)
+    entry = cache.get(java_runtime.path)
+    if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+        return entry["flags"]
+
+    supported = None
+    for flags in APPCDS_FLAG_SETS:
+        if java_runtime.major < 10 and not flags:
+            # No Java 8 sem flags só existe a CDS das classes do próprio JDK
+            continue
+        try:
+            result = _run_java(java_runtime.path, flags + ["-XX:DumpLoadedClassList=" + os.devnull, "-Xshare:auto", "-version"])
+        except (OSError, subprocess.SubprocessError):
+            continue
+        if result.returncode == 0 and "Unrecognized VM option" not in result.stderr:
+            supported = flags
+            break
+    cache[java_runtime.path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "flags": supported}
+    write_json_atomic(cache_path, cache)
+    return supported
+
+
+class StartupArchive:
+    """
+    Arquivo de classes compartilhadas (AppCDS) para o classpath do Forge.
+
+    O arquivo é identificado por um hash do java usado e do classpath exato
+    (ordem, caminhos, tamanho e mtime de cada jar). Qualquer mudança no
+    classpath gera outra chave, e o arquivo antigo deixa de ser usado.
+    """
+
+    def __init__(self, game_directory):
+        self.root = launcher_data_path(game_directory, "appcds")
+
+    def key(self, java_runtime, classpath):
+        sha1 = hashlib.sha1()
+        sha1.update(f"{java_runtime.path}\0{java_runtime.version}\0".encode("utf-8"))
+        for entry in classpath:
+            sha1.update(entry.encode("utf-8"))
+            try:
+                st = os.stat(entry)
+                sha1.update(f"\0{st.st_size}\0{st.st_mtime_ns}\n".encode("ascii"))
+            except OSError:
+                sha1.update(b"\0ausente\n")
+        return sha1.hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.root, key)
+        return base + ".classlist", base + ".jsa", base + ".json"
+
+    def launch_flags(self, java_runtime, classpath):
+        """Flags para usar o arquivo nos lançamentos normais, ou [] se não houver arquivo válido."""
+        _class_list, archive, metadata_path = self._paths(self.key(java_runtime, classpath))
+        metadata = read_json(metadata_path)
+        if not metadata or not os.path.isfile(archive):
+            return []
+        return metadata["flags"] + ["-Xshare:auto", f"-XX:SharedArchiveFile={archive}"]
+
+    def training_flags(self, java_runtime, classpath):
+        """Flags do lançamento de treino, que grava a lista de classes carregadas."""
+        flags = appcds_flags(java_runtime)
+        if flags is None:
+            return None
+        class_list, _archive, _metadata = self._paths(self.key(java_runtime, classpath))
+        os.makedirs(self.root, exist_ok=True)
+        return flags + ["-Xshare:off", f"-XX:DumpLoadedClassList={class_list}"]
+
+    def build(self, java_runtime, classpath, time_to_menu=None):
+        """Gera o arquivo .jsa a partir da lista de classes do treino. Retorna o caminho do arquivo."""
+        flags = appcds_flags(java_runtime)
+        if flags is None:
+            raise RuntimeError(f"O Java {java_runtime.version} não suporta AppCDS.")
+        key = self.key(java_runtime, classpath)
+        class_list, archive, metadata_path = self._paths(key)
+        if not os.path.isfile(class_list) or os.path.getsize(class_list) == 0:
+            raise RuntimeError("O lançamento de treino não gerou a lista de classes.")
+        if not class_list_complete(class_list):
+            # JVM encerrada à força: a lista saiu cortada e o arquivo deixaria classes de fora
+            raise RuntimeError("A lista de classes do treino está incompleta (o jogo não fechou normalmente). "
+                               "Tente otimizar de novo.")
+
+        result = _run_java(java_runtime.path, flags + [
+            "-Xshare:dump",
+            f"-XX:SharedClassListFile={class_list}",
+            f"-XX:SharedArchiveFile={archive}",
+            "-cp", os.pathsep.join(classpath),
+        ], timeout=300)
+        if result.returncode != 0 or not os.path.isfile(archive):
+            raise RuntimeError(f"Falha ao gerar o arquivo CDS: {result.stderr.strip()[-500:]}")
+
+        write_json_atomic(metadata_path, {
+            "java": java_runtime.path,
+            "java_version": java_runtime.version,
+            "flags": flags,
+            "classes": sum(1 for _ in open(class_list, encoding="utf-8", errors="replace")),
+            "training_time_to_menu": time_to_menu,
+        })
+        self.remove_others(key)
+        return archive
+
+    def remove_others(self, keep_key):
+        """Apaga arquivos de classpaths antigos."""
+        for path in glob.glob(os.path.join(self.root, "*")):
+            if not os.path.basename(path).startswith(keep_key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,519 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import hashlib
+import zipfile
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import threading
+import http.server
+from datetime import datetime
+from functools import partial
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_FORMAT = 1
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10 # Regressão: mediana 10% pior que a da referência...
+NOISE_FLOOR_MS = 0.05 # ...e pelo menos 0,05 ms pior (abaixo disso é ruído do relógio)
+SEED = 1655
+BENCH_VERSION = "1.8.8-forge1.8.8-11.15.0.1655"
+VANILLA_VERSION = "1.8.8"
+RESOURCES_URL = "https://resources.download.minecraft.net/"
+
+# Tamanho do diretório sintético (próximo do 1.8.8 + Forge: ~40 bibliotecas, ~1000 assets)
+SYNTHETIC_LIBRARIES = 40
+SYNTHETIC_LIBRARY_BYTES = (20_000, 400_000)
+SYNTHETIC_ASSETS = 1000
+SYNTHETIC_ASSET_BYTES = (200, 8_000)
+SYNTHETIC_CLIENT_BYTES = 5_000_000
+
+
+class BenchmarkSkipped(Exception):
+    pass
+
+
+def summarize(samples_ms):
+    """Estatísticas de uma lista de amostras em milissegundos."""
+    return {
+        "unit": "ms",
+        "samples": len(samples_ms),
+        "median": round(statistics.median(samples_ms), 4),
+        "mean": round(statistics.fmean(samples_ms), 4),
+        "min": round(min(samples_ms), 4),
+        "max": round(max(samples_ms), 4),
+        "stdev": round(statistics.stdev(samples_ms), 4) if len(samples_ms) > 1 else 0.0,
+    }
+
+
+def timed(function, *args, **kwargs):
+    """(resultado, milissegundos) de uma chamada."""
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+# --- Diretório do jogo e espelho sintéticos ---
+
+def _put(root, relative_path, data):
+    path = os.path.join(root, *relative_path.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return hashlib.sha1(data).hexdigest()
+
+
+def build_synthetic_mirror(mirror_root, mirror_url, seed=SEED):
+    """
+    Gera em mirror_root (servido em mirror_url) bibliotecas, natives, jar do cliente e assets
+    de uma versão sintética com a mesma estrutura do 1.8.8 + Forge. O conteúdo vem da seed,
+    então dois runs com a mesma seed usam exatamente os mesmos arquivos. Retorna os JSONs
+    das versões {id: dados}, já com os SHA-1 e as URLs do espelho.
+    """
+    rng = random.Random(seed)
+    # As URLs apontam direto para o espelho porque o minecraft_launcher_lib baixa sozinho o que
+    # o prefetch não cobriu (ex.: o jar do vanilla); só os assets usam o url_rewrites
+    data = lambda size: rng.randbytes(size)
+    libraries = []
+    for i in range(SYNTHETIC_LIBRARIES):
+        relative = f"org/grcraft/bench/lib{i}/1.0/lib{i}-1.0.jar"
+        payload = data(rng.randint(*SYNTHETIC_LIBRARY_BYTES))
+        sha1 = _put(mirror_root, "libraries/" + relative, payload)
+        libraries.append({"name": f"org.grcraft.bench:lib{i}:1.0", "downloads": {"artifact": {
+            "path": relative, "sha1": sha1, "size": len(payload), "url": f"{mirror_url}libraries/{relative}"}}})
+
+    natives = io.BytesIO()
+    with zipfile.ZipFile(natives, "w") as jar:
+        for name in ("liblwjgl.so", "lwjgl.dll", "liblwjgl.dylib", "libopenal.so", "OpenAL32.dll"):
+            jar.writestr(name, data(50_000))
+        jar.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\n")
+    classifiers = {}
+    for os_name in ("linux", "windows", "osx"):
+        relative = f"org/lwjgl/lwjgl/lwjgl-platform/2.9.4/lwjgl-platform-2.9.4-natives-{os_name}.jar"
+        sha1 = _put(mirror_root, "libraries/" + relative, natives.getvalue())
+        classifiers[f"natives-{os_name}"] = {"path": relative, "sha1": sha1, "size": len(natives.getvalue()),
+                                             "url": f"{mirror_url}libraries/{relative}"}
+    libraries.append({"name": "org.lwjgl.lwjgl:lwjgl-platform:2.9.4",
+                      "natives": {"linux": "natives-linux", "windows": "natives-windows", "osx": "natives-osx"},
+                      "extract": {"exclude": ["META-INF/"]}, "downloads": {"classifiers": classifiers}})
+
+    objects = {}
+    for i in range(SYNTHETIC_ASSETS):
+        payload = data(rng.randint(*SYNTHETIC_ASSET_BYTES))
+        sha1 = hashlib.sha1(payload).hexdigest()
+        _put(mirror_root, f"resources/{sha1[:2]}/{sha1}", payload)
+        objects[f"minecraft/bench/{i}.ogg"] = {"hash": sha1, "size": len(payload)}
+    index = json.dumps({"objects": objects}).encode("utf-8")
+    index_sha1 = _put(mirror_root, "indexes/1.8.json", index)
+    client = data(SYNTHETIC_CLIENT_BYTES)
+    client_sha1 = _put(mirror_root, f"versions/{VANILLA_VERSION}.jar", client)
+
+    vanilla = {
+        "id": VANILLA_VERSION, "type": "release", "mainClass": "net.minecraft.client.main.Main", "assets": "1.8",
+        "minecraftArguments": "--username ${auth_player_name} --version ${version_name} --gameDir ${game_directory} "
+                              "--assetsDir ${assets_root} --assetIndex ${assets_index_name} --uuid ${auth_uuid} "
+                              "--accessToken ${auth_access_token} --userProperties ${user_properties} "
+                              "--userType ${user_type}",
+        "assetIndex": {"id": "1.8", "sha1": index_sha1, "size": len(index), "url": f"{mirror_url}indexes/1.8.json"},
+        "downloads": {"client": {"sha1": client_sha1, "size": len(client), "url": f"{mirror_url}versions/{VANILLA_VERSION}.jar"}},
+        "libraries": libraries[:-6] + [libraries[-1]],
+    }
+    with open(os.path.join(ROOT_DIR, f"{BENCH_VERSION}.json"), encoding="utf-8") as f:
+        forge = json.load(f) # O JSON real do Forge, com as bibliotecas trocadas pelas sintéticas
+    forge["libraries"] = libraries[-6:-1]
+    # authlib no caminho que o prepare_launch confere
+    authlib = data(60_000)
+    relative = "com/mojang/authlib/1.5.21/authlib-1.5.21.jar"
+    forge["libraries"].append({"name": "com.mojang:authlib:1.5.21", "downloads": {"artifact": {
+        "path": relative, "sha1": _put(mirror_root, "libraries/" + relative, authlib), "size": len(authlib),
+        "url": f"{mirror_url}libraries/{relative}"}}})
+    return {VANILLA_VERSION: vanilla, BENCH_VERSION: forge}
+
+
+def write_version_jsons(game_directory, versions):
+    """Um diretório do jogo "recém-criado": só os JSONs das versões, nada baixado."""
+    for version_id, data in versions.items():
+        _put(game_directory, f"versions/{version_id}/{version_id}.json", json.dumps(data).encode("utf-8"))
+
+
+class LocalMirror:
+    """Servidor HTTP/1.1 (keep-alive) servindo a pasta do espelho em 127.0.0.1, numa thread."""
+
+    def __init__(self, root):
+        handler = partial(_QuietHandler, directory=root)
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url_rewrites(self):
+        return {RESOURCES_URL: self.url + "resources/"}
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_args):
+        pass
+
+
+# --- Benchmarks ---
+
+class BenchmarkContext:
+    """Pastas temporárias, espelho e opções compartilhados pelos benchmarks de um run."""
+
+    def __init__(self, work_directory, mirror, versions, repeat):
+        self.work_directory = work_directory
+        self.mirror = mirror
+        self.versions = versions
+        self.repeat = repeat
+        self._counter = 0
+        self._app = None
+
+    def new_directory(self, name):
+        self._counter += 1
+        path = os.path.join(self.work_directory, f"{name}-{self._counter}")
+        os.makedirs(path)
+        return path
+
+    def installed_game_directory(self):
+        """Diretório do jogo instalado a partir do espelho (criado uma vez e reaproveitado)."""
+        path = os.path.join(self.work_directory, "installed")
+        if not os.path.isdir(path):
+            from launch_pipeline import install_version
+            write_version_jsons(path, self.versions)
+            invalid = install_version(BENCH_VERSION, path, use_shared_store=False, url_rewrites=self.mirror.url_rewrites())
+            if invalid:
+                raise RuntimeError(f"Instalação sintética incompleta: {len(invalid)} arquivo(s)")
+        return path
+
+    def qt_app(self):
+        from PyQt5.QtWidgets import QApplication
+        self._app = QApplication.instance() or QApplication([sys.argv[0]])
+        return self._app
+
+
+def bench_startup(context, warm):
+    """Processo novo do launcher até a primeira pintura (python main.py --profile-startup)."""
+    samples = []
+    shared_home = context.new_directory("startup-home")
+    for _ in range(context.repeat + (1 if warm else 0)):
+        home = shared_home if warm else context.new_directory("startup-home")
+        env = dict(os.environ, XDG_CONFIG_HOME=os.path.join(home, "config"), XDG_CACHE_HOME=os.path.join(home, "cache"),
+                   XDG_DATA_HOME=os.path.join(home, "data"), APPDATA=os.path.join(home, "config"),
+                   LOCALAPPDATA=os.path.join(home, "cache"), GRCRAFT_GAME_DIR=os.path.join(home, "game"))
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, "main.py"), "--profile-startup"],
+                                   cwd=home, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                   text=True, encoding="utf-8", errors="replace")
+        watchdog = threading.Timer(60, process.kill)
+        watchdog.start()
+        total = None
+        try:
+            for line in process.stderr:
+                if "primeira pintura" in line:
+                    total = float(line.split()[-2].replace(",", "."))
+                    break
+        finally:
+            watchdog.cancel()
+            process.kill()
+            process.wait()
+        if total is None:
+            raise RuntimeError("O launcher não chegou à primeira pintura")
+        samples.append(total)
+    return summarize(samples[1:] if warm else samples)
+
+
+def bench_install_cold(context):
+    """install_version num diretório novo: download do espelho local, instalador e índice."""
+    from launch_pipeline import install_version
+    samples = []
+    for _ in range(context.repeat):
+        game_directory = context.new_directory("install")
+        write_version_jsons(game_directory, context.versions)
+        invalid, elapsed = timed(install_version, BENCH_VERSION, game_directory, use_shared_store=False,
+                                 url_rewrites=context.mirror.url_rewrites())
+        if invalid:
+            raise RuntimeError(f"{len(invalid)} arquivo(s) inválido(s) após a instalação")
+        samples.append(elapsed)
+        shutil.rmtree(game_directory)
+    return summarize(samples)
+
+
+def bench_install_warm(context):
+    """install_version com tudo instalado: só a conferência pelo índice (o caminho de toda abertura)."""
+    from launch_pipeline import install_version
+    game_directory = context.installed_game_directory()
+    samples = [timed(install_version, BENCH_VERSION, game_directory, use_shared_store=False)[1]
+               for _ in range(context.repeat)]
+    return summarize(samples)
+
+
+def bench_verify(context):
+    """verify_game_files: SHA-1 de todas as bibliotecas, natives, jar e assets."""
+    from integrity import verify_game_files
+    game_directory = context.installed_game_directory()
+    samples = []
+    for _ in range(context.repeat):
+        report, elapsed = timed(verify_game_files, BENCH_VERSION, game_directory)
+        if report.bad_files:
+            raise RuntimeError("Arquivos inválidos no diretório sintético")
+        samples.append(elapsed)
+    return dict(summarize(samples), files=report.files_checked)
+
+
+def _require_java():
+    from java_runtime import JavaRegistry
+    if JavaRegistry().best(required_major=8) is None:
+        raise BenchmarkSkipped("Java 8 não encontrado (use --java-home)")
+
+
+def bench_launch_command(context, mode):
+    """
+    prepare_launch até o comando final. cold: sem cache de plano e natives; warm: caches prontos;
+    template: com o LaunchTemplate que o launcher prepara em segundo plano enquanto a página está aberta.
+    """
+    from launch_pipeline import prepare_launch, prepare_template
+    from game_files import launcher_data_path
+    _require_java()
+    game_directory = context.installed_game_directory()
+    prepare_launch(BENCH_VERSION, game_directory, "Benchmark", 2) # Aquece imports e a sonda do Java
+    samples = []
+    for _ in range(context.repeat):
+        template = None
+        if mode == "cold":
+            for cache in ("launch_plan", "natives"):
+                shutil.rmtree(launcher_data_path(game_directory, cache), ignore_errors=True)
+        elif mode == "template":
+            template = prepare_template(BENCH_VERSION, game_directory, 2)
+        samples.append(timed(prepare_launch, BENCH_VERSION, game_directory, "Benchmark", 2, template=template)[1])
+    return summarize(samples)
+
+
+def bench_particles(context, frames=300):
+    """
+    ParticleWidget: custo por quadro de update_particles e do paintEvent (1280x720), na quantidade
+    padrão de partículas e em cada nível oferecido nas configurações ("particles.150.update").
+    """
+    context.qt_app()
+    import numpy as np
+    from main import ParticleWidget
+    from settings_store import DEFAULT_PARTICLES, PARTICLE_LEVELS
+    widget = ParticleWidget()
+    widget.resize(1280, 720)
+    widget.show()
+    context._app.processEvents()
+    results = {}
+    counts = [DEFAULT_PARTICLES] + [count for count, _label in PARTICLE_LEVELS if count not in (0, DEFAULT_PARTICLES)]
+    for count in counts:
+        widget.rng = np.random.default_rng(SEED)
+        widget.set_particle_count(count)
+        updates, paints = [], []
+        for _ in range(frames):
+            # Os quadros são disparados aqui, sem o QTimer (o loop de eventos não roda durante a medição)
+            widget.update_particles()
+            widget.repaint()
+            updates.append(widget.update_ms)
+            paints.append(widget.paint_ms)
+        result = {"update": summarize(updates), "paint": summarize(paints)}
+        if count == DEFAULT_PARTICLES:
+            results.update(result) # Mesmos nomes de antes ("particles.update"): as referências continuam valendo
+        else:
+            results[str(count)] = result
+    widget.timer.stop()
+    widget.close()
+    return results
+
+
+def bench_settings(context):
+    """
+    SettingsStore: custo de um set() no thread da interface, de um flush (gravação atômica)
+    e quantas gravações um arraste de 100 passos do slider de RAM provoca.
+    """
+    from settings_store import SettingsStore
+    directory = context.new_directory("settings")
+    store = SettingsStore(os.path.join(directory, "settings.json"), delay=0.2, legacy_ini=os.devnull)
+    set_samples, flush_samples = [], []
+    for i in range(context.repeat * 20):
+        set_samples.append(timed(store.set, ram_gb=i % 16 + 1)[1])
+        flush_samples.append(timed(store.flush)[1])
+    writes_before = store.writer.writes
+    for i in range(100):
+        store.set(ram_gb=i % 16 + 1)
+    writes_during_drag = store.writer.writes - writes_before
+    time.sleep(0.4)
+    return {"set": summarize(set_samples), "flush": summarize(flush_samples),
+            "drag_writes": {"unit": "count", "during": writes_during_drag, "after": store.writer.writes - writes_before}}
+
+
+BENCHMARKS = {
+    "startup_cold": partial(bench_startup, warm=False),
+    "startup_warm": partial(bench_startup, warm=True),
+    "install_cold": bench_install_cold,
+    "install_warm": bench_install_warm,
+    "verify": bench_verify,
+    "launch_command_cold": partial(bench_launch_command, mode="cold"),
+    "launch_command_warm": partial(bench_launch_command, mode="warm"),
+    "launch_command_template": partial(bench_launch_command, mode="template"),
+    "particles": bench_particles,
+    "settings": bench_settings,
+}
+
+
+def _flatten(name, result):
+    """Resultados aninhados ("particles" -> "particles.update") viram uma entrada por métrica."""
+    if "unit" in result:
+        return {name: result}
+    flat = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(f"{name}.{key}", value))
+        else:
+            flat.setdefault(name, {})[key] = value
+    return flat
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(names=None, repeat=DEFAULT_REPEAT, progress=None):
+    """Roda os benchmarks (todos ou names) num ambiente isolado. Retorna o dicionário de resultados."""
+    progress = progress or (lambda _message: None)
+    names = list(names or BENCHMARKS)
+    work_directory = tempfile.mkdtemp(prefix="grcraft-bench-")
+    # Pastas do usuário e store isolados: nada do launcher instalado na máquina entra na medição
+    saved_environ = dict(os.environ)
+    os.environ.update(XDG_CONFIG_HOME=os.path.join(work_directory, "config"),
+                      XDG_CACHE_HOME=os.path.join(work_directory, "cache"),
+                      XDG_DATA_HOME=os.path.join(work_directory, "data"),
+                      APPDATA=os.path.join(work_directory, "config"), LOCALAPPDATA=os.path.join(work_directory, "cache"),
+                      GRCRAFT_STORE="off")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    results = {}
+    try:
+        os.makedirs(os.path.join(work_directory, "mirror"))
+        with LocalMirror(os.path.join(work_directory, "mirror")) as mirror:
+            progress("Gerando o espelho sintético...")
+            versions = build_synthetic_mirror(os.path.join(work_directory, "mirror"), mirror.url)
+            context = BenchmarkContext(work_directory, mirror, versions, repeat)
+            for name in names:
+                progress(f"{name}...")
+                try:
+                    results.update(_flatten(name, BENCHMARKS[name](context)))
+                except BenchmarkSkipped as e:
+                    results[name] = {"skipped": str(e)}
+                progress(f"{name}: {_describe(name, results)}")
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        shutil.rmtree(work_directory, ignore_errors=True)
+    return {
+        "format": RESULTS_FORMAT,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "machine": platform.machine(), "cpus": os.cpu_count()},
+        "repeat": repeat,
+        "seed": SEED,
+        "results": results,
+    }
+
+
+def _describe(name, results):
+    parts = []
+    for key, value in results.items():
+        if key == name or key.startswith(name + "."):
+            if "skipped" in value:
+                parts.append(f"pulado ({value['skipped']})")
+            elif value.get("unit") == "ms":
+                parts.append(f"{key} {value['median']:.3f} ms")
+    return ", ".join(parts)
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compara as medianas de dois runs. Retorna [(métrica, antes, depois, variação, regressão)];
+    regressão é piora acima de threshold (fração) e de NOISE_FLOOR_MS.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if result.get("unit") != "ms" or not before or before.get("unit") != "ms":
+            continue
+        old, new = before["median"], result["median"]
+        change = (new - old) / old if old else 0.0
+        rows.append((name, old, new, change, change > threshold and new - old > NOISE_FLOOR_MS))
+    return rows
+
+
+def main(argv=None):
+    """python benchmarks.py run [-o resultados.json] [--baseline ref.json] | compare ref.json novo.json"""
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos críticos do launcher.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Roda os benchmarks")
+    run_parser.add_argument("names", nargs="*", metavar="nome", help=f"Padrão: todos ({', '.join(BENCHMARKS)})")
+    run_parser.add_argument("-o", "--output", help="Grava os resultados neste JSON")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    run_parser.add_argument("--java-home", help="Java 8 usado nos benchmarks de lançamento")
+    run_parser.add_argument("--baseline", help="Compara com um run anterior (sai com 1 se houver regressão)")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    compare_parser = subparsers.add_parser("compare", help="Compara dois runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        unknown = [name for name in args.names if name not in BENCHMARKS]
+        if unknown:
+            parser.error(f"benchmark desconhecido: {', '.join(unknown)}")
+        if args.java_home:
+            os.environ["JAVA_HOME"] = args.java_home
+        current = run_benchmarks(args.names, args.repeat, lambda message: print(message, file=sys.stderr, flush=True))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=2)
+        else:
+            print(json.dumps(current, indent=2))
+        if not args.baseline:
+            return 0
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+
+    rows = compare(baseline, current, args.threshold)
+    regressions = [row for row in rows if row[4]]
+    for name, old, new, change, regression in rows:
+        flag = "  REGRESSÃO" if regression else ""
+        print(f"{name:<32}{old:>12.3f} ms {new:>12.3f} ms {change:>+8.1%}{flag}", file=sys.stderr)
+    if regressions:
+        print(f"{len(regressions)} regressão(ões) acima de {args.threshold:.0%}.", file=sys.stderr)
+        return 1
+    print("Nenhuma regressão.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import argparse
+
+from jvm_profiles import JVM_PROFILES, DEFAULT_PROFILE
+from install_progress import InstallProgress, describe_progress
+from launch_pipeline import (
+    DEFAULT_VERSION, EXIT_OK, EXIT_ERROR, EXIT_INSTALL_FAILED, EXIT_GAME_FAILED, EXIT_INTERRUPTED,
+    EXIT_INVALID_NICKNAME, LaunchError, default_game_directory, install_version, is_valid_nickname, new_tracer,
+    prepare_launch, start_game,
+)
+
+
+def _status_printer(quiet):
+    if quiet:
+        return None
+    return lambda message: print(message, file=sys.stderr, flush=True)
+
+
+def _apply_profile_defaults(args, profile):
+    """Completa as opções não informadas com os valores do perfil (ou com os padrões)."""
+    if args.version is None:
+        args.version = profile.version if profile else DEFAULT_VERSION
+    if args.game_dir is None:
+        args.game_dir = profile.game_directory if profile else default_game_directory()
+    if args.ram is None:
+        args.ram = profile.ram_gb if profile else 2
+    if args.jvm_profile is None:
+        args.jvm_profile = profile.jvm_profile if profile else DEFAULT_PROFILE
+    if args.jvm_args is None:
+        args.jvm_args = profile.extra_jvm_arguments if profile else []
+    if args.backup is None:
+        args.backup = profile.backup_worlds if profile else False
+    if args.backup_interval is None:
+        args.backup_interval = profile.backup_interval_hours if profile else 0
+
+
+def _report_resources(monitor, ram_gb):
+    """Resumo do ResourceMonitor e sugestão de RAM no stderr."""
+    monitor.stop()
+    summary = monitor.summary()
+    print(f"Recursos: pico de RSS {summary['peak_rss_mb']:.0f} MB, CPU média {summary['mean_cpu_percent']:.0f}%, "
+          f"{summary['gc_count']} coletas (pausa máx. {summary['max_gc_pause_ms']:.0f} ms)", file=sys.stderr)
+    recommendation = monitor.recommendation(current_heap_mb=ram_gb * 1024)
+    if recommendation is not None:
+        print(f"RAM sugerida: --ram {recommendation.ram_gb} ({recommendation.reason})", file=sys.stderr)
+    if monitor.gc_log_path and os.path.exists(monitor.gc_log_path):
+        os.remove(monitor.gc_log_path)
+
+
+def main(argv=None):
+    """
+    Modo sem interface (não cria QApplication):
+        python cli.py --nickname Steve [--profile <nome>] [--game-dir <pasta>] [--ram 4] [--dry-run]
+    Com --profile, versão, pasta, RAM, perfil e argumentos da JVM vêm do perfil salvo pelo
+    launcher; as opções passadas explicitamente têm prioridade.
+    Códigos de saída: 0 ok, 2 argumentos inválidos, 3 nickname inválido, 4 versão não encontrada,
+    5 Java não encontrado, 6 bibliotecas ausentes, 7 falha na instalação, 8 o jogo falhou,
+    9 conflito de mods, 130 interrompido (Ctrl+C), 1 outros erros.
+    """
+    parser = argparse.ArgumentParser(description="Instala e inicia o GRcraft sem a interface gráfica.")
+    parser.add_argument("--profile", help="Perfil de instância salvo pelo launcher")
+    parser.add_argument("--version", default=None, help=f"Padrão: {DEFAULT_VERSION}")
+    parser.add_argument("--game-dir", default=None)
+    parser.add_argument("--nickname", required=True)
+    parser.add_argument("--ram", type=int, default=None, help="RAM em GB (padrão: 2)")
+    parser.add_argument("--jvm-profile", choices=list(JVM_PROFILES), default=None)
+    parser.add_argument("--jvm-arg", action="append", default=None, dest="jvm_args",
+                        help="Argumento extra da JVM (pode ser repetido)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Só resolve o comando e o imprime em JSON, sem instalar, iniciar o jogo nem "
+                             "gravar nada (natives não extraídos, caches e trace não atualizados)")
+    parser.add_argument("--skip-install", action="store_true", help="Não confere nem completa a instalação")
+    parser.add_argument("--no-shared-store", action="store_true",
+                        help="Não usa o store compartilhado de bibliotecas e assets entre instâncias")
+    parser.add_argument("--skip-mods-check", action="store_true", help="Não verifica conflitos na pasta mods")
+    parser.add_argument("--backup", action=argparse.BooleanOptionalAction, default=None,
+                        help="Backup incremental dos mundos antes de jogar (padrão: o do perfil)")
+    parser.add_argument("--backup-interval", type=float, metavar="HORAS",
+                        help="Só faz backup se o último tiver mais de HORAS horas (0 = sempre; padrão: o do perfil)")
+    parser.add_argument("--server", help="Entra direto neste servidor (host[:porta]) ao abrir o jogo")
+    parser.add_argument("--monitor", action="store_true",
+                        help="Amostra memória, CPU e GC do jogo e sugere a RAM ao final da sessão")
+    parser.add_argument("--quiet", action="store_true", help="Não imprime as mensagens de status")
+    args = parser.parse_args(argv)
+    if args.profile:
+        from profiles import ProfileStore
+        profile = ProfileStore().get(args.profile)
+        if profile is None:
+            parser.error(f"perfil não encontrado: {args.profile}")
+    else:
+        profile = None
+    _apply_profile_defaults(args, profile)
+    status = _status_printer(args.quiet)
+    if not is_valid_nickname(args.nickname):
+        # Antes da instalação: um nickname errado não deve custar um download inteiro
+        print("Erro: Nickname deve ter entre 3 e 16 caracteres.", file=sys.stderr)
+        return EXIT_INVALID_NICKNAME
+
+    game_process = monitor = None
+    gc_log_path = None
+    if args.monitor and not args.dry_run:
+        from resource_monitor import gc_log_template
+        gc_log_path = gc_log_template(args.game_dir)
+    try:
+        if not args.dry_run and not args.skip_install:
+            install_tracer = new_tracer("install", args.game_dir, version=args.version, headless=True)
+            try:
+                progress = None
+                if not args.quiet:
+                    # Uma linha de progresso por segundo no stderr
+                    progress = InstallProgress(lambda snapshot: status(describe_progress(snapshot)), interval=1.0)
+                install_version(args.version, args.game_dir, status_callback=status, progress=progress,
+                                tracer=install_tracer, use_shared_store=not args.no_shared_store)
+                install_tracer.finish("ok")
+            except Exception as e:
+                install_tracer.finish("error", error=str(e))
+                raise LaunchError(f"Falha ao instalar bibliotecas: {e}", EXIT_INSTALL_FAILED)
+
+        tracer = new_tracer("launch", None if args.dry_run else args.game_dir, version=args.version, ram_gb=args.ram, profile=args.profile,
+                            jvm_profile=args.jvm_profile, headless=True, dry_run=args.dry_run)
+        try:
+            prepared = prepare_launch(args.version, args.game_dir, args.nickname, args.ram, args.jvm_profile,
+                                      status_callback=status, tracer=tracer, check_mods=not args.skip_mods_check,
+                                      extra_jvm_arguments=args.jvm_args, gc_log_path=gc_log_path,
+                                      backup_worlds=args.backup, backup_interval_hours=args.backup_interval,
+                                      server_address=args.server, read_only=args.dry_run)
+            if args.dry_run:
+                tracer.finish("ok")
+                print(json.dumps(prepared.to_dict(), indent=2))
+                return EXIT_OK
+            game_process = start_game(
+                prepared,
+                on_output=None if args.quiet else lambda lines: print("\n".join(lines), flush=True),
+                tracer=tracer,
+            )
+        except Exception as e:
+            tracer.finish("error", error=str(e))
+            raise
+        if args.monitor:
+            from resource_monitor import ResourceMonitor
+            monitor = ResourceMonitor(game_process.pid, gc_log_path).start()
+        returncode = game_process.wait()
+        if monitor is not None:
+            _report_resources(monitor, args.ram)
+    except LaunchError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return e.exit_code
+    except KeyboardInterrupt:
+        # Ctrl+C também fecha o jogo iniciado por este processo
+        if game_process is not None:
+            game_process.stop()
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    if returncode != 0:
+        print(f"Erro: o Minecraft terminou com código de saída {returncode}.", file=sys.stderr)
+        return EXIT_GAME_FAILED
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
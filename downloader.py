@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import http.client
+from urllib.parse import urlsplit, urljoin
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from game_files import (
+    load_version_chain, merge_version_chain, library_files, client_jar_file,
+    asset_index_file, asset_object_files, version_json_path, file_sha1,
+)
+
+VERSION_MANIFEST_URL = "https://launchermeta.mojang.com/mc/game/version_manifest_v2.json"
+USER_AGENT = "GRcraft-Launcher"
+CHUNK_SIZE = 64 * 1024
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadProgress:
+    """Contadores agregados do download, seguros para várias threads."""
+
+    def __init__(self, callback=None, interval=0.1):
+        self.callback = callback
+        self.interval = interval
+        self.files_total = 0
+        self.files_done = 0
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.started = time.monotonic()
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    def add_files(self, files):
+        with self._lock:
+            self.files_total += len(files)
+            self.bytes_total += sum(f.size or 0 for f in files)
+
+    def add_bytes(self, count):
+        with self._lock:
+            self.bytes_done += count
+        self._report()
+
+    def file_done(self):
+        with self._lock:
+            self.files_done += 1
+            finished = self.files_done >= self.files_total
+        self._report(force=finished)
+
+    def _report(self, force=False):
+        if not self.callback:
+            return
+        now = time.monotonic()
+        # Atualizações de bytes são limitadas a uma a cada "interval" segundos
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        self.callback(self.files_done, self.files_total, self.bytes_done, self.bytes_total)
+
+
+class DownloadEngine:
+    """
+    Baixa muitos arquivos em paralelo com um pool limitado de workers.
+
+    - Cada worker mantém uma conexão keep-alive por host (http.client), reaproveitada
+      entre arquivos do mesmo servidor.
+    - Downloads interrompidos continuam de onde pararam (arquivo .part + Range).
+    - O SHA-1 é conferido contra os checksums da versão antes de mover o arquivo.
+    - url_rewrites permite apontar para um espelho local, ex.:
+      {"https://libraries.minecraft.net/": "http://127.0.0.1:8000/libraries/"}
+    - Com um store (shared_store.ContentStore), arquivos que outra instância já baixou
+      viram links para o store em vez de downloads, e os novos downloads entram nele.
+    """
+
+    def __init__(self, max_workers=8, timeout=30, retries=3, progress_callback=None, url_rewrites=None, store=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.progress = DownloadProgress(progress_callback)
+        self.url_rewrites = url_rewrites or {}
+        self.store = store
+        self._local = threading.local()
+        self._all_connections = []
+        self._connections_lock = threading.Lock()
+
+    # --- Conexões ---
+
+    def _rewrite(self, url):
+        for prefix, replacement in self.url_rewrites.items():
+            if url.startswith(prefix):
+                return replacement + url[len(prefix):]
+        return url
+
+    def _connection(self, scheme, netloc):
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        key = (scheme, netloc)
+        conn = connections.get(key)
+        if conn is None:
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(netloc, timeout=self.timeout)
+            else:
+                conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+            connections[key] = conn
+            with self._connections_lock:
+                self._all_connections.append(conn)
+        return conn
+
+    def _drop_connection(self, scheme, netloc):
+        connections = getattr(self._local, "connections", {})
+        conn = connections.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def _request(self, url, headers=None, redirects=5):
+        """Faz um GET reaproveitando a conexão do host. Retorna (resposta, url_final)."""
+        for _ in range(redirects + 1):
+            parts = urlsplit(url)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+            request_headers = {"User-Agent": USER_AGENT, "Connection": "keep-alive"}
+            request_headers.update(headers or {})
+            conn = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers=request_headers)
+                response = conn.getresponse()
+            except (OSError, http.client.HTTPException):
+                # A conexão keep-alive pode ter sido fechada pelo servidor; tenta uma nova
+                self._drop_connection(parts.scheme, parts.netloc)
+                conn = self._connection(parts.scheme, parts.netloc)
+                conn.request("GET", path, headers=request_headers)
+                response = conn.getresponse()
+            if response.status in (301, 302, 303, 307, 308):
+                location = response.getheader("Location")
+                response.read()
+                if not location:
+                    raise DownloadError(f"Redirecionamento sem destino em {url}")
+                url = urljoin(url, location)
+                continue
+            return response, url
+        raise DownloadError(f"Redirecionamentos demais em {url}")
+
+    def close(self):
+        if self.store is not None:
+            self.store.save()
+        with self._connections_lock:
+            for conn in self._all_connections:
+                conn.close()
+            self._all_connections = []
+
+    # --- Downloads ---
+
+    def fetch_bytes(self, url):
+        """Baixa um recurso pequeno (ex.: manifesto de versões) para a memória."""
+        response, final_url = self._request(self._rewrite(url))
+        data = response.read()
+        if response.status != 200:
+            raise DownloadError(f"HTTP {response.status} ao baixar {final_url}")
+        return data
+
+    def _is_valid(self, game_file):
+        if not os.path.isfile(game_file.path):
+            return False
+        if not game_file.checksums:
+            return True
+        sha1 = file_sha1(game_file.path)
+        if sha1 not in game_file.checksums:
+            return False
+        if self.store is not None:
+            self.store.adopt(game_file.path, sha1)
+        return True
+
+    def _download_once(self, game_file):
+        part_path = game_file.path + ".part"
+        os.makedirs(os.path.dirname(game_file.path), exist_ok=True)
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        response, final_url = self._request(self._rewrite(game_file.url), headers)
+        if response.status == 416:
+            # O .part já está completo (ou é inválido); a verificação do SHA-1 decide
+            response.read()
+        elif response.status in (200, 206):
+            mode = "ab" if response.status == 206 else "wb"
+            if response.status == 200 and offset:
+                # Servidor ignorou o Range: recomeça do zero
+                self.progress.add_bytes(-offset)
+            with open(part_path, mode) as f:
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    self.progress.add_bytes(len(chunk))
+        else:
+            response.read()
+            raise DownloadError(f"HTTP {response.status} ao baixar {final_url}")
+
+        if game_file.checksums:
+            sha1 = file_sha1(part_path)
+            if sha1 not in game_file.checksums:
+                size = os.path.getsize(part_path)
+                os.remove(part_path)
+                self.progress.add_bytes(-size)
+                raise DownloadError(f"Checksum inválido para {os.path.basename(game_file.path)}: {sha1}")
+        os.replace(part_path, game_file.path)
+        if game_file.checksums and self.store is not None:
+            self.store.adopt(game_file.path, sha1)
+
+    def download_file(self, game_file):
+        """Baixa um arquivo (com tentativas). Retorna True se precisou baixar."""
+        if self._is_valid(game_file):
+            self.progress.add_bytes(game_file.size or 0)
+            self.progress.file_done()
+            return False
+        if self.store is not None and game_file.checksums and self.store.link_into(game_file.path, game_file.checksums):
+            # Outra instância já baixou este arquivo
+            self.progress.add_bytes(game_file.size or 0)
+            self.progress.file_done()
+            return False
+        if not game_file.url:
+            raise DownloadError(f"Sem URL para {game_file.path}")
+        part_path = game_file.path + ".part"
+        if os.path.exists(part_path):
+            # Bytes de um download anterior que serão retomados
+            self.progress.add_bytes(os.path.getsize(part_path))
+        last_error = None
+        for _attempt in range(self.retries):
+            try:
+                self._download_once(game_file)
+                self.progress.file_done()
+                return True
+            except (OSError, http.client.HTTPException, DownloadError) as e:
+                last_error = e
+        raise DownloadError(f"Falha ao baixar {game_file.url}: {last_error}")
+
+    def download_all(self, files):
+        """Baixa todos os arquivos no pool. Retorna a lista de (arquivo, erro) que falharam."""
+        self.progress.add_files(files)
+        # Maiores primeiro, para o pool não terminar esperando um arquivo grande sozinho
+        ordered = sorted(files, key=lambda f: f.size or 0, reverse=True)
+        failures = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="download") as pool:
+            futures = {pool.submit(self.download_file, f): f for f in ordered}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except DownloadError as e:
+                    failures.append((futures[future], e))
+        return failures
+
+
+def ensure_version_chain(version, game_directory, engine):
+    """Garante que os JSONs de toda a cadeia de herança existam, baixando os de versões oficiais."""
+    manifest = None
+    while True:
+        try:
+            return load_version_chain(version, game_directory)
+        except FileNotFoundError as e:
+            missing_path = e.filename
+        if manifest is None:
+            manifest = json.loads(engine.fetch_bytes(VERSION_MANIFEST_URL))
+        missing_id = os.path.basename(os.path.dirname(missing_path))
+        entry = next((v for v in manifest["versions"] if v["id"] == missing_id), None)
+        if entry is None:
+            raise DownloadError(f"Versão {missing_id} não encontrada no manifesto oficial")
+        data = engine.fetch_bytes(entry["url"])
+        if entry.get("sha1") and hashlib.sha1(data).hexdigest() != entry["sha1"]:
+            raise DownloadError(f"Checksum inválido para o JSON da versão {missing_id}")
+        path = version_json_path(game_directory, missing_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+def prefetch_version(version, game_directory, engine, status_callback=None):
+    """
+    Baixa em paralelo tudo o que a versão precisa: primeiro bibliotecas, jar do
+    cliente e índice de assets; depois os objetos de assets listados no índice.
+    Retorna a lista de falhas.
+    """
+    status = status_callback or (lambda message: None)
+    chain = ensure_version_chain(version, game_directory, engine)
+    merged = merge_version_chain(chain)
+
+    status("Baixando bibliotecas e jar do cliente...")
+    first_pass = library_files(merged, game_directory) + [client_jar_file(merged, game_directory)]
+    index_file = asset_index_file(merged, game_directory)
+    if index_file is not None:
+        first_pass.append(index_file)
+    failures = engine.download_all([f for f in first_pass if f.url])
+
+    if index_file is not None and os.path.isfile(index_file.path):
+        status("Baixando assets...")
+        failures += engine.download_all(asset_object_files(index_file.path, game_directory))
+    return failures
@@ -0,0 +1,313 @@
+import os
+import re
+import sys
+import json
+import shutil
+import threading
+import hashlib
+import platform
+from collections import namedtuple
+
+LIBRARIES_URL = "https://libraries.minecraft.net/"
+RESOURCES_URL = "https://resources.download.minecraft.net/"
+
+# Pasta (dentro do diretório do jogo) onde o launcher guarda índices e caches próprios
+LAUNCHER_DIR_NAME = ".grcraft"
+
+# Um arquivo que o jogo precisa: caminho absoluto, URL de download, SHA-1 principal,
+# todos os SHA-1 aceitos (o Forge lista mais de um em "checksums"), tamanho e tipo
+GameFile = namedtuple("GameFile", "path url sha1 checksums size kind")
+
+
+def launcher_data_path(game_directory, *parts):
+    """Retorna um caminho dentro de <game_dir>/.grcraft."""
+    return os.path.join(game_directory, LAUNCHER_DIR_NAME, *parts)
+
+
+def _user_base_dir(kind):
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        env = "LOCALAPPDATA" if kind == "cache" else "APPDATA"
+        return os.path.join(os.environ.get(env) or os.path.join(home, "AppData", "Roaming"), "GRcraft")
+    if sys.platform == "darwin":
+        folder = "Caches" if kind == "cache" else "Application Support"
+        return os.path.join(home, "Library", folder, "GRcraft")
+    if kind == "cache":
+        return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache"), "grcraft")
+    if kind == "data":
+        return os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.join(home, ".local", "share"), "grcraft")
+    return os.path.join(os.environ.get("XDG_CONFIG_HOME") or os.path.join(home, ".config"), "grcraft")
+
+
+def user_config_path(*parts):
+    """Caminho na pasta de configuração do usuário (APPDATA, ~/Library/Application Support, ~/.config)."""
+    return os.path.join(_user_base_dir("config"), *parts)
+
+
+def user_cache_path(*parts):
+    """Caminho na pasta de cache do usuário (LOCALAPPDATA, ~/Library/Caches, ~/.cache)."""
+    return os.path.join(_user_base_dir("cache"), *parts)
+
+
+def user_data_path(*parts):
+    """Caminho na pasta de dados do usuário (APPDATA, ~/Library/Application Support, ~/.local/share)."""
+    return os.path.join(_user_base_dir("data"), *parts)
+
+
+def link_or_copy(src, dst):
+    """Hardlink se o sistema de arquivos permitir, senão symlink, senão cópia. Retorna o modo usado."""
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        pass
+    try:
+        os.symlink(src, dst)
+        return "symlink"
+    except (OSError, NotImplementedError):
+        pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def file_sha1(path, chunk_size=1024 * 1024):
+    """Calcula o SHA-1 de um arquivo."""
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            sha1.update(data)
+    return sha1.hexdigest()
+
+
+def write_json_atomic(path, data):
+    """Grava JSON em um arquivo temporário e renomeia, para nunca deixar o arquivo pela metade."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_json(path, default=None):
+    """Lê um JSON, retornando default se o arquivo não existir ou estiver corrompido."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def version_json_path(game_directory, version):
+    return os.path.join(game_directory, "versions", version, version + ".json")
+
+
+def load_version_chain(version, game_directory):
+    """
+    Carrega o JSON da versão e de todas as versões herdadas (inheritsFrom).
+    Retorna uma lista [(id, dados, bytes_brutos)] da versão filha até a base.
+    Levanta FileNotFoundError se algum JSON da cadeia não existir.
+    """
+    chain = []
+    current = version
+    while current:
+        with open(version_json_path(game_directory, current), "rb") as f:
+            raw = f.read()
+        data = json.loads(raw)
+        chain.append((current, data, raw))
+        current = data.get("inheritsFrom")
+        if current in (item[0] for item in chain):
+            raise ValueError(f"Herança circular na versão {version}")
+    return chain
+
+
+def version_chain_hash(chain):
+    """SHA-1 do conteúdo de todos os JSONs da cadeia de herança."""
+    sha1 = hashlib.sha1()
+    for version_id, _data, raw in chain:
+        sha1.update(version_id.encode("utf-8"))
+        sha1.update(raw)
+    return sha1.hexdigest()
+
+
+def merge_version_chain(chain):
+    """Mescla a cadeia de herança como o minecraft_launcher_lib faz (listas da filha vêm primeiro)."""
+    merged = dict(chain[-1][1])
+    for _version_id, data, _raw in reversed(chain[:-1]):
+        result = dict(merged)
+        for key, value in data.items():
+            if isinstance(value, list) and isinstance(merged.get(key), list):
+                result[key] = value + merged[key]
+            elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+                combined = dict(merged[key])
+                for sub_key, sub_value in value.items():
+                    if isinstance(sub_value, list):
+                        combined[sub_key] = combined.get(sub_key, []) + sub_value
+                result[key] = combined
+            else:
+                result[key] = value
+        merged = result
+    return merged
+
+
+def current_os_name():
+    if sys.platform == "win32":
+        return "windows"
+    if sys.platform == "darwin":
+        return "osx"
+    return "linux"
+
+
+def rules_allow(rules):
+    """Avalia a lista "rules" de uma biblioteca para o sistema atual."""
+    if not rules:
+        return True
+    allowed = False
+    for rule in rules:
+        matches = True
+        os_rule = rule.get("os", {})
+        if "name" in os_rule and os_rule["name"] != current_os_name():
+            matches = False
+        if "arch" in os_rule and os_rule["arch"] == "x86" and platform.architecture()[0] != "32bit":
+            matches = False
+        if "version" in os_rule and not re.match(os_rule["version"], platform.release()):
+            matches = False
+        if matches:
+            allowed = rule.get("action") == "allow"
+    return allowed
+
+
+def native_classifier(library):
+    """Classificador de natives da biblioteca para o sistema atual (ex.: natives-windows), ou ""."""
+    natives = library.get("natives")
+    if not natives:
+        return ""
+    arch = "32" if platform.architecture()[0] == "32bit" else "64"
+    return natives.get(current_os_name(), "").replace("${arch}", arch)
+
+
+def maven_path(name, classifier=""):
+    """Converte grupo:artefato:versão[@ext] no caminho relativo dentro de libraries/."""
+    parts = name.split(":")
+    group, artifact, version = parts[0:3]
+    extension = "jar"
+    if "@" in version:
+        version, extension = version.split("@", 1)
+    extra = "".join(f"-{p}" for p in parts[3:])
+    if classifier:
+        extra += f"-{classifier}"
+    filename = f"{artifact}-{version}{extra}.{extension}"
+    return "/".join(group.split(".") + [artifact, version, filename])
+
+
+def _library_file(game_directory, library, download, relative_path, classifier, kind):
+    if download and download.get("url"):
+        path = download.get("path", relative_path)
+        checksums = (download["sha1"],) if download.get("sha1") else ()
+        return GameFile(
+            os.path.join(game_directory, "libraries", *path.split("/")),
+            download["url"], download.get("sha1"), checksums, download.get("size"), kind,
+        )
+    base_url = library.get("url") or LIBRARIES_URL
+    if not base_url.endswith("/"):
+        base_url += "/"
+    checksums = tuple(library.get("checksums", ()))
+    return GameFile(
+        os.path.join(game_directory, "libraries", *relative_path.split("/")),
+        base_url + relative_path, checksums[0] if checksums else None, checksums, None, kind,
+    )
+
+
+def library_files(merged, game_directory):
+    """Lista os jars de bibliotecas (classpath) e de natives exigidos pela versão."""
+    files = []
+    for library in merged.get("libraries", []):
+        if not rules_allow(library.get("rules")):
+            continue
+        # Bibliotecas marcadas como exclusivas do servidor não vão para o cliente
+        if library.get("clientreq") is False:
+            continue
+        downloads = library.get("downloads", {})
+        classifier = native_classifier(library)
+        if classifier:
+            download = downloads.get("classifiers", {}).get(classifier)
+            files.append(_library_file(game_directory, library, download,
+                                       maven_path(library["name"], classifier), classifier, "native"))
+        if not library.get("natives") or "artifact" in downloads:
+            files.append(_library_file(game_directory, library, downloads.get("artifact"),
+                                       maven_path(library["name"]), "", "library"))
+    return files
+
+
+def native_files(merged, game_directory):
+    """Lista os jars de natives do sistema atual com a lista "extract.exclude" de cada um."""
+    natives = []
+    for library in merged.get("libraries", []):
+        if not rules_allow(library.get("rules")) or library.get("clientreq") is False:
+            continue
+        classifier = native_classifier(library)
+        if not classifier:
+            continue
+        download = library.get("downloads", {}).get("classifiers", {}).get(classifier)
+        game_file = _library_file(game_directory, library, download,
+                                  maven_path(library["name"], classifier), classifier, "native")
+        natives.append((game_file, library.get("extract", {}).get("exclude", [])))
+    return natives
+
+
+def client_jar_file(merged, game_directory):
+    jar_id = merged.get("jar") or merged["id"]
+    client = merged.get("downloads", {}).get("client", {})
+    return GameFile(
+        os.path.join(game_directory, "versions", jar_id, jar_id + ".jar"),
+        client.get("url"), client.get("sha1"), (client["sha1"],) if client.get("sha1") else (),
+        client.get("size"), "client",
+    )
+
+
+def asset_index_file(merged, game_directory):
+    asset_index = merged.get("assetIndex")
+    if not asset_index:
+        return None
+    return GameFile(
+        os.path.join(game_directory, "assets", "indexes", merged.get("assets", asset_index["id"]) + ".json"),
+        asset_index.get("url"), asset_index.get("sha1"), (asset_index["sha1"],) if asset_index.get("sha1") else (),
+        asset_index.get("size"), "asset_index",
+    )
+
+
+def asset_object_files(index_path, game_directory):
+    """Lista os objetos de assets descritos em um índice de assets já baixado."""
+    index = read_json(index_path)
+    if not index:
+        return []
+    files = []
+    seen = set()
+    for entry in index.get("objects", {}).values():
+        sha1 = entry["hash"]
+        if sha1 in seen:
+            continue
+        seen.add(sha1)
+        files.append(GameFile(
+            os.path.join(game_directory, "assets", "objects", sha1[:2], sha1),
+            f"{RESOURCES_URL}{sha1[:2]}/{sha1}", sha1, (sha1,), entry.get("size"), "asset",
+        ))
+    return files
+
+
+def game_files(version, game_directory, chain=None, include_assets=True):
+    """Todos os arquivos (bibliotecas, natives, jar do cliente, assets) que a versão precisa."""
+    if chain is None:
+        chain = load_version_chain(version, game_directory)
+    merged = merge_version_chain(chain)
+    files = library_files(merged, game_directory)
+    files.append(client_jar_file(merged, game_directory))
+    index_file = asset_index_file(merged, game_directory)
+    if index_file is not None and include_assets:
+        files.append(index_file)
+        files.extend(asset_object_files(index_file.path, game_directory))
+    return files
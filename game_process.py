@@ -0,0 +1,278 @@
+import os
+import sys
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+
+# Linhas do log do cliente 1.8.8 que indicam que a janela do jogo já foi criada
+LAUNCHED_MARKERS = (
+    "LWJGL Version",
+    "Created: ",
+    "Setting user:",
+)
+
+
+def _close_windows(pid):
+    """Envia WM_CLOSE às janelas de nível superior do processo (Windows). Retorna True se achou alguma."""
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    WM_CLOSE = 0x0010
+    found = []
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def callback(hwnd, _lparam):
+        window_pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(window_pid))
+        if window_pid.value == pid and user32.IsWindowVisible(hwnd):
+            user32.PostMessageW(hwnd, WM_CLOSE, 0, 0)
+            found.append(hwnd)
+        return True
+
+    user32.EnumWindows(callback, 0)
+    return bool(found)
+
+
+class OutputRingBuffer:
+    """Guarda apenas as últimas N linhas da saída do jogo (memória constante)."""
+
+    def __init__(self, max_lines=2000):
+        self._lines = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+
+    def append(self, line):
+        with self._lock:
+            self._lines.append(line)
+
+    def tail(self, count=50):
+        with self._lock:
+            if count >= len(self._lines):
+                return list(self._lines)
+            return list(self._lines)[-count:]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._lines)
+
+
+class RotatingLogWriter:
+    """Grava a saída completa em disco, rotacionando o arquivo ao atingir o tamanho máximo."""
+
+    def __init__(self, path, max_bytes=5 * 1024 * 1024, backup_count=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8", errors="replace")
+        self._size = self._file.tell()
+
+    def write(self, line):
+        data = line + "\n"
+        if self._size + len(data) > self.max_bytes and self._size > 0:
+            self._rotate()
+        self._file.write(data)
+        self._size += len(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def _rotate(self):
+        self._file.close()
+        # launcher.log.2 -> launcher.log.3, launcher.log.1 -> launcher.log.2, ...
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "w", encoding="utf-8", errors="replace")
+        self._size = 0
+
+
+class GameProcess:
+    """
+    Supervisiona o processo do Minecraft sem bloquear quem o iniciou.
+
+    A saída é lida linha a linha por uma thread própria, guardada em um buffer
+    circular e gravada em um log rotativo; outra thread entrega as linhas novas em
+    lotes. Os callbacks são chamados a partir dessas threads:
+      - on_launched(): quando a janela do jogo aparece, ou após launch_timeout sem nenhum
+        marcador no log (aí launch_assumed fica True: o jogo pode não ter aberto a janela)
+      - on_output(lines): lote de linhas novas, até output_interval depois de lidas
+      - on_exit(returncode, launched): quando o processo termina (depois do último on_output)
+    """
+
+    def __init__(self, command, cwd=None, log_path=None, on_launched=None, on_output=None,
+                 on_exit=None, buffer_lines=2000, output_interval=0.25, launch_timeout=20.0):
+        self.command = command
+        self.cwd = cwd
+        self.log_path = log_path
+        self.on_launched = on_launched
+        self.on_output = on_output
+        self.on_exit = on_exit
+        self.output_interval = output_interval
+        self.launch_timeout = launch_timeout
+        self.buffer = OutputRingBuffer(buffer_lines)
+        self.process = None
+        self.launched = False
+        self.returncode = None
+        self.started_at = None
+        self.launch_seconds = None # Tempo do Popen até a janela do jogo aparecer
+        self.launch_assumed = False # Lançado por launch_timeout, sem marcador no log
+        self._launched_lock = threading.Lock()
+        self._pending = [] # Linhas lidas ainda não entregues ao on_output
+        self._pending_lock = threading.Lock()
+        self._output_done = threading.Event()
+        self._reader = None
+        self._flusher = None
+        self._watchdog = None
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    def start(self):
+        """Inicia o processo e retorna imediatamente."""
+        self.started_at = time.monotonic()
+        creationflags = 0
+        if os.name == "nt":
+            creationflags = subprocess.CREATE_NO_WINDOW
+        self.process = subprocess.Popen(
+            self.command,
+            cwd=self.cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            bufsize=1,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            creationflags=creationflags,
+        )
+        self._flusher = threading.Thread(target=self._flush_loop, name="game-output-flush", daemon=True)
+        self._flusher.start()
+        self._reader = threading.Thread(target=self._read_output, name="game-output", daemon=True)
+        self._reader.start()
+        # Se nenhum marcador aparecer (ex.: log4j silencioso), considera lançado após o timeout
+        self._watchdog = threading.Timer(self.launch_timeout, self._launch_timeout_reached)
+        self._watchdog.daemon = True
+        self._watchdog.start()
+        return self
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def wait(self, timeout=None):
+        """Aguarda o fim do processo e da leitura da saída."""
+        if self.process is None:
+            return None
+        self.process.wait(timeout)
+        if self._reader is not None:
+            self._reader.join(timeout)
+        return self.returncode
+
+    def request_exit(self, timeout=60.0):
+        """
+        Pede para o jogo fechar normalmente (como o botão de fechar a janela) e espera até timeout.
+        No Windows o terminate() é um TerminateProcess, que mata a JVM sem deixá-la gravar nada
+        (ex.: o -XX:DumpLoadedClassList); lá a janela recebe um WM_CLOSE. Nos outros sistemas o
+        SIGTERM já faz a JVM encerrar normalmente. Retorna True se o processo saiu a tempo.
+        """
+        if not self.is_running():
+            return True
+        if sys.platform == "win32":
+            if not _close_windows(self.process.pid):
+                return False
+        else:
+            self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            return False
+        if self._reader is not None:
+            self._reader.join(timeout)
+        return True
+
+    def stop(self, timeout=10.0):
+        """Encerra o jogo: primeiro terminate(), depois kill() se não sair a tempo."""
+        if not self.is_running():
+            return self.returncode
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        if self._reader is not None:
+            self._reader.join(timeout)
+        return self.returncode
+
+    def _mark_launched(self, assumed=False):
+        with self._launched_lock:
+            if self.launched:
+                return
+            self.launched = True
+            self.launch_assumed = assumed
+            self.launch_seconds = time.monotonic() - self.started_at
+        if self.on_launched:
+            self.on_launched()
+
+    def _launch_timeout_reached(self):
+        if self.is_running():
+            self._mark_launched(assumed=True)
+
+    def _read_output(self):
+        log = RotatingLogWriter(self.log_path) if self.log_path else None
+        last_flush = time.monotonic()
+        try:
+            for raw_line in self.process.stdout:
+                line = raw_line.rstrip("\r\n")
+                self.buffer.append(line)
+                if log:
+                    log.write(line)
+                with self._pending_lock:
+                    self._pending.append(line)
+
+                if not self.launched and any(marker in line for marker in LAUNCHED_MARKERS):
+                    self._mark_launched()
+
+                now = time.monotonic()
+                if log and now - last_flush >= self.output_interval:
+                    log.flush()
+                    last_flush = now
+        finally:
+            # O flusher entrega o que sobrou antes do on_exit
+            self._output_done.set()
+            self._flusher.join()
+            if log:
+                log.close()
+            self.process.stdout.close()
+            self.returncode = self.process.wait()
+            if self._watchdog is not None:
+                self._watchdog.cancel()
+            if self.on_exit:
+                self.on_exit(self.returncode, self.launched)
+
+    def _flush_loop(self):
+        """
+        Entrega as linhas pendentes a cada output_interval. Fica numa thread separada porque a
+        leitura bloqueia esperando a próxima linha: as últimas linhas antes de uma pausa do jogo
+        não ficam presas até a linha seguinte.
+        """
+        while not self._output_done.wait(self.output_interval):
+            self._flush_output()
+        self._flush_output()
+
+    def _flush_output(self):
+        with self._pending_lock:
+            lines, self._pending = self._pending, []
+        if lines and self.on_output:
+            self.on_output(lines)
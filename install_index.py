@@ -0,0 +1,120 @@
+import os
+
+from game_files import (
+    launcher_data_path, load_version_chain, version_chain_hash, game_files,
+    file_sha1, read_json, write_json_atomic,
+)
+
+INDEX_FORMAT = 1
+
+
+class InstallIndex:
+    """
+    Índice em disco dos arquivos já instalados de uma versão.
+
+    Cada entrada guarda caminho, tamanho, mtime e SHA-1 do arquivo. O índice
+    inteiro é associado ao hash dos JSONs da versão: se o JSON mudar, o índice
+    é descartado. Em uma inicialização "quente" a verificação vira apenas um
+    os.stat() por arquivo, sem reler nem recalcular hashes.
+    """
+
+    def __init__(self, game_directory, version):
+        self.game_directory = game_directory
+        self.version = version
+        self.path = launcher_data_path(game_directory, "install_index", version + ".json")
+        self.version_hash = None
+        self.entries = {}
+        self.missing = []
+
+    def _relative(self, path):
+        return os.path.relpath(path, self.game_directory).replace(os.sep, "/")
+
+    def _absolute(self, relative_path):
+        return os.path.join(self.game_directory, *relative_path.split("/"))
+
+    def _current_version_hash(self):
+        try:
+            return version_chain_hash(load_version_chain(self.version, self.game_directory))
+        except (OSError, ValueError):
+            return None
+
+    def load(self):
+        """Carrega o índice salvo. Retorna False se não existir ou for de outra versão do JSON."""
+        data = read_json(self.path)
+        if not data or data.get("format") != INDEX_FORMAT:
+            return False
+        current_hash = self._current_version_hash()
+        if current_hash is None or data.get("version_hash") != current_hash:
+            return False
+        self.version_hash = current_hash
+        self.entries = data.get("entries", {})
+        self.missing = data.get("missing", [])
+        return True
+
+    def stale_entries(self):
+        """
+        Varredura rápida por os.stat(). Retorna a lista de caminhos relativos
+        ausentes ou alterados, ou None se não houver índice válido (instalação fria).
+        """
+        if not self.load() or not self.entries:
+            return None
+        # Arquivos que já estavam inválidos na última reconstrução continuam pendentes
+        stale = list(self.missing)
+        for relative_path, entry in self.entries.items():
+            try:
+                st = os.stat(self._absolute(relative_path))
+            except OSError:
+                stale.append(relative_path)
+                continue
+            if st.st_size != entry["size"] or st.st_mtime_ns != entry["mtime_ns"]:
+                stale.append(relative_path)
+        return stale
+
+    def files_for(self, relative_paths):
+        """GameFile (com URL e checksums) de cada caminho relativo, ex.: os de stale_entries()."""
+        wanted = set(relative_paths)
+        return [game_file for game_file in game_files(self.version, self.game_directory)
+                if self._relative(game_file.path) in wanted]
+
+    def rebuild(self, files=None):
+        """
+        Reconstrói o índice a partir dos arquivos da versão. Arquivos cujo stat não
+        mudou reaproveitam o SHA-1 já registrado; os demais são recalculados e só
+        entram no índice se baterem com o checksum esperado.
+        Retorna a lista de arquivos inválidos (ausentes ou com SHA-1 errado).
+        """
+        chain = load_version_chain(self.version, self.game_directory)
+        if files is None:
+            files = game_files(self.version, self.game_directory, chain=chain)
+        previous = self.entries
+        entries = {}
+        invalid = []
+        for game_file in files:
+            relative_path = self._relative(game_file.path)
+            try:
+                st = os.stat(game_file.path)
+            except OSError:
+                invalid.append(game_file)
+                continue
+            old = previous.get(relative_path)
+            if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                sha1 = old["sha1"]
+            else:
+                sha1 = file_sha1(game_file.path)
+            if game_file.checksums and sha1 not in game_file.checksums:
+                invalid.append(game_file)
+                continue
+            entries[relative_path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": sha1}
+        self.version_hash = version_chain_hash(chain)
+        self.entries = entries
+        self.missing = [self._relative(game_file.path) for game_file in invalid]
+        return invalid
+
+    def save(self):
+        write_json_atomic(self.path, {
+            "format": INDEX_FORMAT,
+            "version": self.version,
+            "version_hash": self.version_hash,
+            "entries": self.entries,
+            "missing": self.missing,
+        })
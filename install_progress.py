@@ -0,0 +1,148 @@
+import time
+import threading
+
+# Nomes das etapas enviados pelo minecraft_launcher_lib no setStatus
+PHASE_LABELS = {
+    "download": "Baixando arquivos do jogo",
+    "Download Libraries": "Verificando bibliotecas",
+    "Download Assets": "Verificando assets",
+    "Install java runtime": "Instalando o Java",
+    "Installation complete": "Instalação concluída",
+}
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+def format_eta(seconds):
+    """Tempo restante legível. Ex.: 75 -> "1min15s"."""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}min{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}min"
+
+
+def describe_progress(snapshot):
+    """Texto da barra de progresso para um snapshot do InstallProgress."""
+    parts = [f"{snapshot['label']}: {snapshot['done']}/{snapshot['total']}"]
+    if snapshot["bytes_total"]:
+        parts[0] += f" ({format_size(snapshot['bytes_done'])} de {format_size(snapshot['bytes_total'])})"
+    if snapshot["rate"]:
+        if snapshot["unit"] == "bytes":
+            parts.append(f"{format_size(snapshot['rate'])}/s")
+        else:
+            parts.append(f"{snapshot['rate']:.0f} arquivos/s")
+    if snapshot["eta"] is not None:
+        parts.append(f"~{format_eta(snapshot['eta'])} restantes")
+    return " · ".join(parts)
+
+
+class InstallProgress:
+    """
+    Junta o progresso do download paralelo e dos callbacks do minecraft_launcher_lib
+    (setStatus/setMax/setProgress) em um único estado com vazão e tempo restante.
+
+    Os callbacks podem chegar milhares de vezes por segundo de várias threads; o callback
+    final (ex.: um sinal Qt) é chamado no máximo a cada "interval" segundos, e sempre na
+    troca de etapa e no fim. A vazão é uma média móvel exponencial, reiniciada a cada etapa.
+    """
+
+    def __init__(self, callback, interval=0.1, smoothing=0.3):
+        self.callback = callback
+        self.interval = interval
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._reset("download")
+
+    def _reset(self, phase):
+        self.phase = phase
+        self.done = 0
+        self.total = 0
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.rate = 0.0
+        self.phase_started = time.monotonic()
+        self._last_report = 0.0
+        self._last_sample = None # O primeiro snapshot da etapa só define a base (ignora bytes retomados de .part)
+
+    def installer_callbacks(self):
+        """Dicionário de callbacks no formato do install_minecraft_version."""
+        return {"setStatus": self.set_status, "setMax": self.set_max, "setProgress": self.set_progress}
+
+    def set_status(self, status):
+        with self._lock:
+            if status == self.phase:
+                return
+            self._reset(status)
+        self._report(force=True)
+
+    def set_max(self, value):
+        with self._lock:
+            # A lib chama setMax de novo para cada lista (ex.: bibliotecas do Forge e depois do 1.8.8)
+            self.total = max(0, int(value))
+            self.done = 0
+            self.rate = 0.0
+            self._last_sample = None
+        self._report(force=True)
+
+    def set_progress(self, value):
+        with self._lock:
+            self.done = int(value)
+        self._report(force=self.total and self.done >= self.total)
+
+    def downloads(self, files_done, files_total, bytes_done, bytes_total):
+        """Callback do DownloadEngine (arquivos e bytes agregados de todos os workers)."""
+        with self._lock:
+            if self.phase != "download":
+                self._reset("download")
+            self.done, self.total = files_done, files_total
+            self.bytes_done, self.bytes_total = bytes_done, bytes_total
+        self._report(force=files_total and files_done >= files_total)
+
+    def finish(self):
+        self._report(force=True)
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot(time.monotonic())
+
+    def _snapshot(self, now):
+        by_bytes = self.bytes_total > 0
+        completed = self.bytes_done if by_bytes else self.done
+        if self._last_sample is None:
+            self._last_sample = (now, completed)
+        last_time, last_completed = self._last_sample
+        if now > last_time and completed >= last_completed:
+            instant = (completed - last_completed) / (now - last_time)
+            self.rate = instant if self.rate == 0 else self.rate + self.smoothing * (instant - self.rate)
+            self._last_sample = (now, completed)
+        remaining = (self.bytes_total - self.bytes_done) if by_bytes else (self.total - self.done)
+        eta = remaining / self.rate if self.rate > 0 and remaining > 0 else None
+        return {
+            "phase": self.phase,
+            "label": PHASE_LABELS.get(self.phase, self.phase),
+            "done": self.done,
+            "total": self.total,
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "unit": "bytes" if by_bytes else "files",
+            "rate": self.rate,
+            "eta": eta,
+            "elapsed": now - self.phase_started,
+        }
+
+    def _report(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report < self.interval:
+                return
+            self._last_report = now
+            snapshot = self._snapshot(now)
+        self.callback(snapshot)
@@ -0,0 +1,159 @@
+import os
+import sys
+import mmap
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from game_files import game_files
+from install_index import InstallIndex
+
+
+def _hash_file(path):
+    """Calcula o SHA-1 de um arquivo mapeado em memória (executado nos processos do pool)."""
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if size == 0:
+                return path, hashlib.sha1().hexdigest(), 0, None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return path, hashlib.sha1(mm).hexdigest(), size, None
+    except OSError as e:
+        return path, None, 0, str(e)
+
+
+class VerifyReport:
+    """Resultado da verificação dos arquivos do jogo."""
+
+    def __init__(self):
+        self.files_checked = 0
+        self.bytes_checked = 0
+        self.elapsed = 0.0
+        self.corrupt = [] # GameFile com SHA-1 diferente do esperado
+        self.missing = [] # GameFile que não existem em disco
+        self.repaired = []
+        self.repair_failures = []
+
+    @property
+    def bad_files(self):
+        return self.missing + self.corrupt
+
+    @property
+    def throughput_mbps(self):
+        if self.elapsed <= 0:
+            return 0.0
+        return self.bytes_checked / (1024 * 1024) / self.elapsed
+
+    def to_dict(self):
+        return {
+            "files_checked": self.files_checked,
+            "bytes_checked": self.bytes_checked,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "throughput_mbps": round(self.throughput_mbps, 1),
+            "missing": [f.path for f in self.missing],
+            "corrupt": [f.path for f in self.corrupt],
+            "repaired": [f.path for f in self.repaired],
+            "repair_failures": [f.path for f, _error in self.repair_failures],
+        }
+
+
+def verify_game_files(version, game_directory, workers=None, progress_callback=None):
+    """
+    Confere o SHA-1 de todas as bibliotecas, natives, jar do cliente e objetos de
+    assets contra os valores do JSON da versão e do índice de assets, usando um
+    pool de processos (um por núcleo) sobre arquivos mapeados em memória.
+    """
+    report = VerifyReport()
+    started = time.monotonic()
+    files = game_files(version, game_directory)
+    by_path = {}
+    to_hash = []
+    for game_file in files:
+        if not os.path.isfile(game_file.path):
+            report.missing.append(game_file)
+        elif game_file.checksums:
+            by_path[game_file.path] = game_file
+            to_hash.append(game_file.path)
+        else:
+            # Sem checksum conhecido (algumas bibliotecas do Forge): só a existência é verificada
+            report.files_checked += 1
+
+    total = len(to_hash)
+    # Lotes grandes reduzem o custo de IPC com milhares de assets pequenos
+    chunksize = max(1, total // ((workers or os.cpu_count() or 1) * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for done, (path, sha1, size, error) in enumerate(pool.map(_hash_file, to_hash, chunksize=chunksize), 1):
+            game_file = by_path[path]
+            report.files_checked += 1
+            report.bytes_checked += size
+            if error is not None:
+                report.missing.append(game_file)
+            elif sha1 not in game_file.checksums:
+                report.corrupt.append(game_file)
+            if progress_callback:
+                progress_callback(done, total, report.bytes_checked)
+
+    report.elapsed = time.monotonic() - started
+    return report
+
+
+def repair_game_files(report, version, game_directory, engine):
+    """Apaga e baixa novamente apenas os arquivos ruins, depois atualiza o índice de instalação."""
+    bad_files = [f for f in report.bad_files if f.url]
+    for game_file in report.corrupt:
+        if engine.store is not None:
+            # O arquivo pode ser um hardlink do blob: sem isso o download religaria o mesmo conteúdo ruim
+            engine.store.invalidate(game_file.path, game_file.checksums)
+        try:
+            os.remove(game_file.path)
+        except OSError:
+            pass
+    failures = engine.download_all(bad_files)
+    failed_paths = {f.path for f, _error in failures}
+    report.repaired = [f for f in bad_files if f.path not in failed_paths]
+    report.repair_failures = failures + [(f, "sem URL de download") for f in report.bad_files if not f.url]
+
+    index = InstallIndex(game_directory, version)
+    index.load()
+    index.rebuild()
+    index.save()
+    return report
+
+
+def main(argv=None):
+    """Modo sem interface: python integrity.py --game-dir <pasta> [--repair] [--json]"""
+    parser = argparse.ArgumentParser(description="Verifica (e repara) os arquivos do jogo pelo SHA-1.")
+    parser.add_argument("--version", default="1.8.8-forge1.8.8-11.15.0.1655")
+    parser.add_argument("--game-dir", required=True)
+    parser.add_argument("--workers", type=int, default=None, help="Processos de hash (padrão: todos os núcleos)")
+    parser.add_argument("--repair", action="store_true", help="Baixa novamente os arquivos ausentes ou corrompidos")
+    parser.add_argument("--json", action="store_true", help="Imprime o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    report = verify_game_files(args.version, args.game_dir, workers=args.workers)
+    if args.repair and report.bad_files:
+        from downloader import DownloadEngine
+        engine = DownloadEngine()
+        try:
+            repair_game_files(report, args.version, args.game_dir, engine)
+        finally:
+            engine.close()
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(f"{report.files_checked} arquivos verificados, {report.bytes_checked / (1024 * 1024):.1f} MB "
+              f"em {report.elapsed:.2f}s ({report.throughput_mbps:.1f} MB/s)")
+        print(f"Ausentes: {len(report.missing)}  Corrompidos: {len(report.corrupt)}")
+        if args.repair:
+            print(f"Reparados: {len(report.repaired)}  Falhas: {len(report.repair_failures)}")
+
+    # 0 = tudo certo, 1 = há arquivos ruins que continuam sem reparo
+    unresolved = len(report.repair_failures) if args.repair else len(report.bad_files)
+    return 1 if unresolved else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
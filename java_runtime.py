@@ -0,0 +1,205 @@
+import os
+import re
+import sys
+import glob
+import subprocess
+
+from game_files import user_cache_path, read_json, write_json_atomic
+
+CACHE_FORMAT = 1
+JAVA_EXECUTABLE = "java.exe" if sys.platform == "win32" else "java"
+
+
+def _common_java_locations():
+    """Padrões glob de onde o Java costuma ser instalado em cada sistema."""
+    if sys.platform == "win32":
+        roots = [os.environ.get(v) for v in ("ProgramFiles", "ProgramFiles(x86)", "ProgramW6432")]
+        vendors = ["Java", "Eclipse Adoptium", "Eclipse Foundation", "AdoptOpenJDK", "Zulu",
+                   "Amazon Corretto", "Microsoft", "BellSoft", "Semeru"]
+        patterns = [os.path.join(root, vendor, "*", "bin", JAVA_EXECUTABLE)
+                    for root in roots if root for vendor in vendors]
+        appdata = os.environ.get("APPDATA")
+        if appdata:
+            # Runtimes baixados pelo launcher oficial da Mojang
+            patterns.append(os.path.join(appdata, ".minecraft", "runtime", "*", "*", "*", "bin", JAVA_EXECUTABLE))
+        return patterns
+    if sys.platform == "darwin":
+        return [
+            "/Library/Java/JavaVirtualMachines/*/Contents/Home/bin/java",
+            "/Library/Internet Plug-Ins/JavaAppletPlugin.plugin/Contents/Home/bin/java",
+            os.path.expanduser("~/Library/Java/JavaVirtualMachines/*/Contents/Home/bin/java"),
+        ]
+    return [
+        "/usr/lib/jvm/*/bin/java",
+        "/usr/lib/jvm/*/jre/bin/java",
+        "/usr/java/*/bin/java",
+        "/opt/java/*/bin/java",
+        "/opt/*/bin/java",
+        os.path.expanduser("~/.sdkman/candidates/java/*/bin/java"),
+    ]
+
+
+def parse_java_major(version):
+    """Versão principal do Java. Ex.: "1.8.0_372" -> 8, "17.0.2" -> 17."""
+    match = re.match(r"(\d+)(?:\.(\d+))?", version or "")
+    if not match:
+        return 0
+    major = int(match.group(1))
+    if major == 1 and match.group(2):
+        return int(match.group(2))
+    return major
+
+
+def _version_sort_key(version):
+    return [int(n) for n in re.findall(r"\d+", version or "")]
+
+
+class JavaRuntime:
+    def __init__(self, path, version, vendor, arch, bits):
+        self.path = path
+        self.version = version
+        self.vendor = vendor
+        self.arch = arch
+        self.bits = bits
+
+    @property
+    def major(self):
+        return parse_java_major(self.version)
+
+    def to_dict(self):
+        return {"path": self.path, "version": self.version, "vendor": self.vendor, "arch": self.arch, "bits": self.bits}
+
+    def __repr__(self):
+        return f"JavaRuntime({self.path!r}, {self.version}, {self.vendor}, {self.bits}-bit)"
+
+
+def probe_java(path, timeout=15):
+    """Executa o java uma vez para descobrir versão, arquitetura e fornecedor (sem shell)."""
+    creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+    result = subprocess.run(
+        [path, "-XshowSettings:properties", "-version"],
+        capture_output=True, text=True, errors="replace", timeout=timeout, creationflags=creationflags,
+    )
+    properties = {}
+    for line in result.stderr.splitlines():
+        key, sep, value = line.strip().partition(" = ")
+        if sep:
+            properties[key] = value
+    version = properties.get("java.version")
+    if not version:
+        # Fallback para JVMs que não entendem -XshowSettings: usa a primeira linha de "-version"
+        match = re.search(r'version "([^"]+)"', result.stderr)
+        if not match:
+            return None
+        version = match.group(1)
+    return JavaRuntime(
+        path,
+        version,
+        properties.get("java.vendor", "desconhecido"),
+        properties.get("os.arch", "desconhecido"),
+        int(properties.get("sun.arch.data.model", "64") or 64),
+    )
+
+
+class JavaRegistry:
+    """
+    Registro dos Java instalados na máquina.
+
+    Os candidatos vêm de JAVA_HOME, do PATH e de pastas de instalação comuns.
+    Cada binário é executado uma única vez; o resultado fica salvo no cache do
+    usuário indexado pelo caminho e mtime do binário. Nos lançamentos seguintes
+    o runtime escolhido é confirmado com um único os.stat().
+    """
+
+    def __init__(self, cache_path=None, read_only=False):
+        self.cache_path = cache_path or user_cache_path("java_runtimes.json")
+        self.read_only = read_only # Consulta o cache sem gravá-lo (ex.: cli.py --dry-run)
+        data = read_json(self.cache_path, {})
+        if data.get("format") != CACHE_FORMAT:
+            data = {"format": CACHE_FORMAT, "runtimes": {}, "selected": {}}
+        self.data = data
+
+    def _save(self):
+        if not self.read_only:
+            write_json_atomic(self.cache_path, self.data)
+
+    def candidates(self):
+        paths = []
+        java_home = os.environ.get("JAVA_HOME")
+        if java_home:
+            paths.append(os.path.join(java_home, "bin", JAVA_EXECUTABLE))
+        for directory in os.environ.get("PATH", "").split(os.pathsep):
+            if directory:
+                paths.append(os.path.join(directory, JAVA_EXECUTABLE))
+        for pattern in _common_java_locations():
+            paths.extend(glob.glob(pattern))
+        seen = []
+        for path in paths:
+            if not os.path.isfile(path):
+                continue
+            real_path = os.path.realpath(path)
+            if real_path not in seen:
+                seen.append(real_path)
+        return seen
+
+    def _cached_runtime(self, path):
+        entry = self.data["runtimes"].get(path)
+        if not entry:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if entry["mtime_ns"] != st.st_mtime_ns or entry["size"] != st.st_size:
+            return None
+        if entry.get("invalid"):
+            return False
+        return JavaRuntime(**entry["runtime"])
+
+    def discover(self):
+        """Varre os candidatos, executando somente os binários novos ou alterados."""
+        runtimes = []
+        changed = False
+        for path in self.candidates():
+            runtime = self._cached_runtime(path)
+            if runtime is None:
+                st = os.stat(path)
+                try:
+                    runtime = probe_java(path)
+                except (OSError, subprocess.SubprocessError):
+                    runtime = None
+                entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+                if runtime is None:
+                    entry["invalid"] = True
+                    runtime = False
+                else:
+                    entry["runtime"] = runtime.to_dict()
+                self.data["runtimes"][path] = entry
+                changed = True
+            if runtime:
+                runtimes.append(runtime)
+        if changed:
+            self._save()
+        return runtimes
+
+    def best(self, required_major=8):
+        """Melhor runtime compatível: a versão exigida, 64 bits, atualização mais recente."""
+        selected_path = self.data["selected"].get(str(required_major))
+        if selected_path:
+            runtime = self._cached_runtime(selected_path)
+            if runtime:
+                return runtime
+
+        compatible = [r for r in self.discover() if r.major == required_major]
+        if not compatible:
+            return None
+        compatible.sort(key=lambda r: (r.bits == 64, _version_sort_key(r.version)), reverse=True)
+        runtime = compatible[0]
+        self.data["selected"][str(required_major)] = runtime.path
+        self._save()
+        return runtime
+
+    def forget_selection(self):
+        self.data["selected"] = {}
+        self._save()
+
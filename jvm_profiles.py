@@ -0,0 +1,121 @@
+import os
+import sys
+import ctypes
+
+# Perfis de desempenho da JVM (chave -> nome exibido na interface)
+JVM_PROFILES = {
+    "g1_low_latency": "Baixa latência (G1)",
+    "throughput": "Desempenho máximo (Parallel GC)",
+    "low_memory": "Pouca memória (Serial GC)",
+}
+DEFAULT_PROFILE = "g1_low_latency"
+
+MIN_HEAP_MB = 1024
+# Memória deixada para o sistema operacional e para a própria JVM fora do heap
+MIN_SYSTEM_RESERVE_MB = 1536
+
+
+def system_memory_mb():
+    """Memória física total em MB (0 se não for possível detectar)."""
+    try:
+        if sys.platform == "win32":
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [
+                    ("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                    ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                    ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                    ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                    ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+                ]
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+            return status.ullTotalPhys // (1024 * 1024)
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def gc_thread_count(cores):
+    """Threads paralelas de GC: mesma fórmula da HotSpot, deixando um núcleo livre para o jogo."""
+    if cores <= 8:
+        threads = cores
+    else:
+        threads = 8 + (cores - 8) * 5 // 8
+    return max(1, min(threads, cores - 1))
+
+
+class JvmSettings:
+    """Resultado do cálculo de um perfil: tamanhos escolhidos e a lista de argumentos da JVM."""
+
+    def __init__(self, profile, heap_mb, initial_heap_mb, gc_threads, arguments, clamped):
+        self.profile = profile
+        self.heap_mb = heap_mb
+        self.initial_heap_mb = initial_heap_mb
+        self.gc_threads = gc_threads
+        self.arguments = arguments
+        self.clamped = clamped
+
+    def describe(self):
+        return (f"Perfil JVM: {JVM_PROFILES.get(self.profile, self.profile)} | heap {self.heap_mb} MB "
+                f"(inicial {self.initial_heap_mb} MB) | {self.gc_threads} threads de GC")
+
+
+def compute_jvm_settings(profile, requested_gb, total_memory_mb=None, cores=None):
+    """
+    Calcula os argumentos da JVM do perfil a partir da RAM pedida no slider,
+    da memória física e do número de núcleos, sempre dentro de limites seguros.
+    """
+    if profile not in JVM_PROFILES:
+        profile = DEFAULT_PROFILE
+    if total_memory_mb is None:
+        total_memory_mb = system_memory_mb()
+    if cores is None:
+        cores = os.cpu_count() or 2
+
+    requested_mb = int(requested_gb * 1024)
+    heap_mb = max(MIN_HEAP_MB, requested_mb)
+    if total_memory_mb:
+        reserve_mb = max(MIN_SYSTEM_RESERVE_MB, total_memory_mb // 4)
+        heap_mb = max(MIN_HEAP_MB, min(heap_mb, total_memory_mb - reserve_mb))
+    clamped = heap_mb != requested_mb
+    gc_threads = gc_thread_count(cores)
+
+    if profile == "g1_low_latency":
+        # Heap fixo evita redimensionamentos durante o jogo; pausas curtas e young gen maior
+        initial_heap_mb = heap_mb
+        region_mb = 32 if heap_mb >= 8192 else 16 if heap_mb >= 4096 else 8
+        arguments = [
+            "-XX:+UseG1GC",
+            "-XX:+UnlockExperimentalVMOptions",
+            "-XX:MaxGCPauseMillis=50",
+            "-XX:G1NewSizePercent=20",
+            "-XX:G1MaxNewSizePercent=40",
+            "-XX:G1ReservePercent=20",
+            f"-XX:G1HeapRegionSize={region_mb}M",
+            f"-XX:ParallelGCThreads={gc_threads}",
+            f"-XX:ConcGCThreads={max(1, gc_threads // 4)}",
+            "-XX:+DisableExplicitGC",
+        ]
+    elif profile == "throughput":
+        initial_heap_mb = max(MIN_HEAP_MB // 2, heap_mb // 2)
+        arguments = [
+            "-XX:+UseParallelGC",
+            f"-Xmn{heap_mb // 3}M",
+            f"-XX:ParallelGCThreads={gc_threads}",
+            "-XX:+UseAdaptiveSizePolicy",
+            "-XX:+DisableExplicitGC",
+        ]
+    else:
+        # Pouca memória: coletor serial, heap cresce aos poucos e devolve memória ao sistema
+        initial_heap_mb = min(512, heap_mb // 4)
+        arguments = [
+            "-XX:+UseSerialGC",
+            # Young gen como fração (1/4) do heap atual: um -Xmn fixo seria >= -Xms e a JVM o reduziria com aviso
+            "-XX:NewRatio=3",
+            "-XX:MinHeapFreeRatio=10",
+            "-XX:MaxHeapFreeRatio=30",
+        ]
+
+    arguments = [f"-Xmx{heap_mb}M", f"-Xms{initial_heap_mb}M"] + arguments + [f"-Dgrcraft.jvmProfile={profile}"]
+    return JvmSettings(profile, heap_mb, initial_heap_mb, gc_threads, arguments, clamped)
@@ -0,0 +1,470 @@
+import os
+import time
+import uuid
+import threading
+
+from game_files import version_json_path
+from jvm_profiles import DEFAULT_PROFILE, compute_jvm_settings
+
+DEFAULT_VERSION = "1.8.8-forge1.8.8-11.15.0.1655"
+AUTHLIB_RELATIVE_PATH = os.path.join("libraries", "com", "mojang", "authlib", "1.5.21", "authlib-1.5.21.jar")
+
+# Códigos de saída do modo sem interface (2 é o do argparse para argumentos inválidos)
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_INVALID_NICKNAME = 3
+EXIT_VERSION_NOT_FOUND = 4
+EXIT_JAVA_NOT_FOUND = 5
+EXIT_LIBRARIES_MISSING = 6
+EXIT_INSTALL_FAILED = 7
+EXIT_GAME_FAILED = 8
+EXIT_MODS_CONFLICT = 9
+EXIT_INTERRUPTED = 130
+
+
+class LaunchError(Exception):
+    """Falha em uma etapa do lançamento; exit_code é o código usado pelo modo sem interface."""
+
+    def __init__(self, message, exit_code=EXIT_ERROR):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+
+def default_game_directory():
+    """Diretório do jogo: variável GRCRAFT_GAME_DIR ou a pasta GRcraft na Área de Trabalho."""
+    return os.environ.get("GRCRAFT_GAME_DIR") or os.path.join(os.path.expanduser("~"), "Desktop", "GRcraft")
+
+
+# Uma preparação por vez no processo: a do clique em "Iniciar" espera a feita em segundo plano
+# (as duas extrairiam os natives e gravariam os mesmos caches ao mesmo tempo)
+_template_lock = threading.Lock()
+
+
+def is_valid_nickname(nickname):
+    return bool(nickname) and 3 <= len(nickname) <= 16
+
+
+# Etapas de cada execução, na ordem: usadas pelo trace (tracing.py) para calcular o progresso
+INSTALL_STAGES = ("index_check", "download", "install", "index_rebuild")
+LAUNCH_STAGES = ("nickname", "version_check", "java", "authlib", "jvm_settings", "natives", "launch_plan",
+                 "mods", "backup", "uuid", "command", "process_start")
+STAGE_LABELS = {
+    "index_check": "Verificando arquivos instalados",
+    "download": "Baixando arquivos do jogo",
+    "install": "Instalando bibliotecas",
+    "index_rebuild": "Atualizando índice de instalação",
+    "nickname": "Validando nickname",
+    "version_check": "Verificando a versão",
+    "java": "Verificando o Java",
+    "authlib": "Verificando authlib",
+    "mods": "Verificando mods",
+    "backup": "Fazendo backup dos mundos",
+    "uuid": "Gerando UUID offline",
+    "jvm_settings": "Calculando opções da JVM",
+    "natives": "Preparando natives",
+    "launch_plan": "Carregando plano de lançamento",
+    "command": "Gerando comando de lançamento",
+    "process_start": "Iniciando o processo do jogo",
+}
+
+
+def new_tracer(kind, game_directory, listener=None, **attrs):
+    """Trace de uma instalação ("install") ou de um lançamento ("launch") deste diretório do jogo."""
+    from tracing import Tracer, trace_path
+
+    stages = INSTALL_STAGES if kind == "install" else LAUNCH_STAGES
+    # Sem game_directory o trace fica só em memória (ex.: --dry-run não grava na pasta do jogo)
+    path = trace_path(game_directory) if game_directory else None
+    return Tracer(kind, stages, path=path, listener=listener, **attrs)
+
+
+def _ignore_status(_message):
+    pass
+
+
+def _null_tracer(kind):
+    from tracing import Tracer
+
+    return Tracer(kind)
+
+
+def install_version(version, game_directory, status_callback=None, progress=None, tracer=None, use_shared_store=True,
+                    url_rewrites=None):
+    """
+    Garante que a versão esteja instalada: confere o índice de instalação; se só alguns
+    arquivos estiverem faltando ou alterados, baixa apenas esses. Sem índice (ou com o JSON
+    da versão alterado), baixa tudo em paralelo e completa com o minecraft_launcher_lib.
+    Com use_shared_store, arquivos já baixados por outra instância são ligados do store
+    compartilhado (shared_store.py) em vez de baixados de novo.
+    progress (InstallProgress) recebe o andamento do download e dos callbacks do instalador.
+    url_rewrites aponta os downloads para um espelho (ver DownloadEngine), como no benchmarks.py.
+    Retorna a lista de arquivos que continuaram inválidos. Quem criou o tracer encerra a execução.
+    """
+    import minecraft_launcher_lib
+    from install_index import InstallIndex
+    from downloader import DownloadEngine, prefetch_version
+    from shared_store import default_store
+
+    status = status_callback or _ignore_status
+    tracer = tracer or _null_tracer("install")
+    # Inicialização quente: se o índice bate com os arquivos em disco, não reinstala nada
+    with tracer.span("index_check") as span:
+        status("Verificando arquivos instalados...")
+        index = InstallIndex(game_directory, version)
+        stale = index.stale_entries()
+        span.set(stale=None if stale is None else len(stale))
+    if stale == []:
+        status("Arquivos do jogo verificados pelo índice de instalação.")
+        return []
+    if stale:
+        # O índice vale para este JSON da versão: só os arquivos apontados são baixados de novo,
+        # sem a varredura completa do instalador (um arquivo sem download não força reinstalação)
+        status(f"{len(stale)} arquivo(s) ausente(s) ou alterado(s). Reparando...")
+        # Mesmas etapas do trace que a instalação completa (download e index_rebuild), com repair=True:
+        # a barra de progresso e as comparações do trace continuam valendo
+        with tracer.span("download") as span:
+            store = default_store() if use_shared_store else None
+            engine = DownloadEngine(progress_callback=progress.downloads if progress else None, store=store,
+                                    url_rewrites=url_rewrites)
+            try:
+                failures = engine.download_all(index.files_for(stale))
+            finally:
+                engine.close()
+            if progress:
+                progress.finish()
+            span.set(repair=True, files=len(stale), failures=len(failures))
+        with tracer.span("index_rebuild") as span:
+            invalid = index.rebuild()
+            index.save()
+            span.set(repair=True, invalid=len(invalid))
+        if invalid:
+            status(f"Aviso: {len(invalid)} arquivo(s) não puderam ser reparados.")
+        else:
+            status("Arquivos do jogo reparados.")
+        return invalid
+
+    # Download paralelo (pool limitado, keep-alive, retomada) antes da instalação.
+    # Assim o install_minecraft_version só encontra arquivos prontos e extrai os natives.
+    with tracer.span("download") as span:
+        status("Baixando arquivos do jogo...")
+        store = default_store() if use_shared_store else None
+        engine = DownloadEngine(progress_callback=progress.downloads if progress else None, store=store,
+                                url_rewrites=url_rewrites)
+        try:
+            failures = prefetch_version(version, game_directory, engine, status)
+        finally:
+            engine.close()
+        span.set(failures=len(failures))
+        if store is not None:
+            span.set(store=store.root, **store.stats)
+    if failures:
+        status(f"Aviso: {len(failures)} arquivo(s) não puderam ser baixados em paralelo.")
+
+    with tracer.span("install"):
+        status("Verificando e instalando bibliotecas necessárias...")
+        callbacks = progress.installer_callbacks() if progress else {}
+        minecraft_launcher_lib.install.install_minecraft_version(version, game_directory, callback=callbacks)
+        if progress:
+            progress.finish()
+
+    # Registra o estado instalado para as próximas inicializações
+    with tracer.span("index_rebuild") as span:
+        status("Atualizando índice de instalação...")
+        invalid = index.rebuild()
+        index.save()
+        span.set(invalid=len(invalid))
+    if invalid:
+        status(f"Aviso: {len(invalid)} arquivo(s) não puderam ser verificados.")
+    status("Bibliotecas instaladas com sucesso!")
+    return invalid
+
+
+def find_java(status_callback=None, required_major=8, read_only=False):
+    """Java exigido pelo Forge 1.8.8, escolhido pelo registro (cada binário é executado uma vez só)."""
+    from java_runtime import JavaRegistry
+
+    status = status_callback or _ignore_status
+    status("Verificando instalação do Java...")
+    java_registry = JavaRegistry(read_only=read_only)
+    java_runtime = java_registry.best(required_major=required_major)
+    if java_runtime is None:
+        found = ", ".join(sorted({r.version for r in java_registry.discover()})) or "nenhum"
+        status(f"Erro: Java {required_major} não encontrado (versões encontradas: {found}).")
+        raise LaunchError(f"Java {required_major} não foi encontrado. O Forge 1.8.8 exige o Java {required_major}; "
+                          "por favor, instale-o.", EXIT_JAVA_NOT_FOUND)
+    status(f"Java encontrado: {java_runtime.version} ({java_runtime.vendor}, {java_runtime.bits} bits) em {java_runtime.path}")
+    return java_runtime
+
+
+class PreparedLaunch:
+    """Tudo o que foi resolvido para um lançamento: comando final, Java, JVM e diretórios."""
+
+    def __init__(self, version, game_directory, nickname, offline_uuid, java_runtime, jvm_settings,
+                 natives_directory, launch_plan, command):
+        self.version = version
+        self.game_directory = game_directory
+        self.nickname = nickname
+        self.offline_uuid = offline_uuid
+        self.java_runtime = java_runtime
+        self.jvm_settings = jvm_settings
+        self.natives_directory = natives_directory
+        self.launch_plan = launch_plan
+        self.command = command
+
+    def to_dict(self):
+        return {
+            "version": self.version,
+            "game_directory": self.game_directory,
+            "nickname": self.nickname,
+            "uuid": self.offline_uuid,
+            "java": self.java_runtime.to_dict(),
+            "jvm_profile": self.jvm_settings.profile,
+            "heap_mb": self.jvm_settings.heap_mb,
+            "main_class": self.launch_plan.main_class,
+            "natives_directory": self.natives_directory,
+            "command": self.command,
+        }
+
+
+class LaunchTemplate:
+    """
+    A parte do lançamento que não depende do jogador: versão conferida, Java escolhido, opções
+    da JVM, natives, plano de lançamento e AppCDS. Pode ser preparada antes do clique em
+    "Iniciar" (prepare_template) e vale enquanto key() não mudar.
+    """
+
+    def __init__(self, key, java_runtime, jvm_settings, jvm_arguments, natives_directory, launch_plan, startup_flags):
+        self.key = key
+        self.java_runtime = java_runtime
+        self.jvm_settings = jvm_settings
+        self.jvm_arguments = jvm_arguments
+        self.natives_directory = natives_directory
+        self.launch_plan = launch_plan
+        self.startup_flags = startup_flags
+        self.created_at = time.time()
+
+    @staticmethod
+    def make_key(version, game_directory, ram_allocation, jvm_profile, extra_jvm_arguments=(), gc_log_path=None):
+        return (version, os.path.abspath(game_directory), int(ram_allocation), jvm_profile,
+                tuple(extra_jvm_arguments), gc_log_path)
+
+    def is_usable(self, key):
+        """Mesmas configurações e os arquivos de que o comando depende ainda existem."""
+        version, game_directory = key[0], key[1]
+        return (key == self.key and os.path.exists(self.java_runtime.path)
+                and os.path.exists(os.path.join(game_directory, AUTHLIB_RELATIVE_PATH))
+                and os.path.exists(version_json_path(game_directory, version)))
+
+
+def prepare_template(version, game_directory, ram_allocation, jvm_profile=DEFAULT_PROFILE, status_callback=None,
+                     tracer=None, extra_jvm_arguments=(), gc_log_path=None, read_only=False):
+    """
+    Etapas do lançamento que não dependem do nickname: versão, Java, authlib, JVM, natives,
+    plano e AppCDS. Lança LaunchError como o prepare_launch.
+    Com read_only nada é gravado: os natives não são extraídos (o diretório no comando pode
+    ainda não existir) e os caches de plano e do Java não são atualizados.
+    """
+    with _template_lock:
+        return _prepare_template(version, game_directory, ram_allocation, jvm_profile, status_callback, tracer,
+                                 extra_jvm_arguments, gc_log_path, read_only)
+
+
+def _prepare_template(version, game_directory, ram_allocation, jvm_profile, status_callback, tracer,
+                      extra_jvm_arguments, gc_log_path, read_only):
+    import minecraft_launcher_lib
+    from natives_cache import NativesCache
+    from launch_plan import LaunchPlanCache
+    from appcds import StartupArchive
+
+    status = status_callback or _ignore_status
+    tracer = tracer or _null_tracer("launch")
+    key = LaunchTemplate.make_key(version, game_directory, ram_allocation, jvm_profile, extra_jvm_arguments, gc_log_path)
+
+    # Verificar se a versão existe
+    with tracer.span("version_check", version=version):
+        status("Verificando se a versão existe...")
+        if not minecraft_launcher_lib.utils.is_version_valid(version, game_directory):
+            status(f"Erro: Versão {version} não encontrada em {game_directory}")
+            raise LaunchError(f"Versão {version} não encontrada.", EXIT_VERSION_NOT_FOUND)
+        status("Versão encontrada.")
+
+    with tracer.span("java") as span:
+        java_runtime = find_java(status, read_only=read_only)
+        span.set(java=java_runtime.version, vendor=java_runtime.vendor)
+
+    # Verificar arquivo authlib
+    with tracer.span("authlib"):
+        authlib_path = os.path.join(game_directory, AUTHLIB_RELATIVE_PATH)
+        status(f"Verificando authlib em: {authlib_path}")
+        if not os.path.exists(authlib_path):
+            status(f"Erro: authlib-1.5.21.jar não encontrado em {authlib_path}")
+            raise LaunchError("authlib-1.5.21.jar não encontrado. Garanta que as bibliotecas estão instaladas corretamente.",
+                              EXIT_LIBRARIES_MISSING)
+        status("authlib-1.5.21.jar encontrado.")
+
+    # Heap, young gen, pausas e threads de GC calculados pelo perfil a partir da RAM e dos núcleos da máquina
+    with tracer.span("jvm_settings") as span:
+        status("Preparando opções de lançamento...")
+        jvm_settings = compute_jvm_settings(jvm_profile, ram_allocation)
+        if jvm_settings.clamped:
+            status(f"Aviso: RAM ajustada para {jvm_settings.heap_mb} MB para caber na memória do sistema.")
+        status(jvm_settings.describe())
+        jvm_arguments = jvm_settings.arguments
+        if gc_log_path:
+            from resource_monitor import gc_log_arguments
+            jvm_arguments = jvm_arguments + gc_log_arguments(java_runtime.major, gc_log_path)
+        if extra_jvm_arguments:
+            jvm_arguments = jvm_arguments + list(extra_jvm_arguments)
+            status(f"Argumentos extras da JVM: {' '.join(extra_jvm_arguments)}")
+        span.set(profile=jvm_settings.profile, heap_mb=jvm_settings.heap_mb, extra_arguments=len(extra_jvm_arguments))
+
+    # O plano (classpath, classe principal, natives) vem do cache e só é regenerado
+    # quando os JSONs da versão ou as bibliotecas mudam
+    status("Gerando comando de lançamento...")
+    with tracer.span("natives"):
+        natives_directory = NativesCache(game_directory, version).prepare(read_only)
+    with tracer.span("launch_plan"):
+        launch_plan = LaunchPlanCache(game_directory, version).get(natives_directory, read_only)
+        # Arquivo AppCDS gerado por "Otimizar Inicialização" (só é usado se bater com o classpath atual)
+        startup_flags = StartupArchive(game_directory).launch_flags(java_runtime, launch_plan.classpath)
+        if startup_flags:
+            status("Usando arquivo de classes compartilhadas (AppCDS).")
+    return LaunchTemplate(key, java_runtime, jvm_settings, jvm_arguments + startup_flags, natives_directory,
+                          launch_plan, startup_flags)
+
+
+def prepare_launch(version, game_directory, nickname, ram_allocation, jvm_profile=DEFAULT_PROFILE, status_callback=None,
+                   tracer=None, check_mods=True, extra_jvm_arguments=(), gc_log_path=None, backup_worlds=False,
+                   backup_interval_hours=0, server_address=None, template=None, read_only=False):
+    """
+    Valida a instalação e resolve o comando de lançamento sem iniciar o jogo.
+    Lança LaunchError (com o código de saída correspondente) na primeira etapa que falhar.
+    extra_jvm_arguments (do perfil da instância) entram depois das opções calculadas, então têm prioridade.
+    gc_log_path ativa o log de GC lido pelo ResourceMonitor (%p no nome vira o PID).
+    backup_worlds faz um backup incremental de saves/ (world_backup.py) antes de abrir o jogo; falhas viram aviso.
+    server_address ("host[:porta]") faz o jogo entrar direto no servidor ao abrir.
+    template é um LaunchTemplate preparado antes (prepare_template); só é usado se ainda valer
+    para estas configurações, senão as etapas são refeitas aqui.
+    read_only resolve o comando sem gravar nada (caches, natives, índice de mods, backup); usado pelo --dry-run.
+    """
+    status = status_callback or _ignore_status
+    tracer = tracer or _null_tracer("launch")
+    with tracer.span("nickname"):
+        if not is_valid_nickname(nickname):
+            status("Erro: Nickname deve ter entre 3 e 16 caracteres.")
+            raise LaunchError("Nickname inválido.", EXIT_INVALID_NICKNAME)
+
+    game_arguments = []
+    if server_address:
+        from server_status import parse_address
+        try:
+            host, port = parse_address(server_address)
+        except ValueError as e:
+            status(f"Erro: {e}")
+            raise LaunchError(str(e), EXIT_USAGE)
+        game_arguments = ["--server", host, "--port", str(port)]
+
+    status(f"Tentando iniciar Minecraft com o nickname: {nickname}")
+    status(f"Alocação de RAM: {ram_allocation}GB")
+
+    key = LaunchTemplate.make_key(version, game_directory, ram_allocation, jvm_profile, extra_jvm_arguments, gc_log_path)
+    if template is not None and template.is_usable(key):
+        status(f"Usando a preparação feita em segundo plano há {time.time() - template.created_at:.0f}s.")
+        tracer.event("template_reused", age_seconds=round(time.time() - template.created_at, 1))
+    else:
+        template = prepare_template(version, game_directory, ram_allocation, jvm_profile, status, tracer,
+                                    extra_jvm_arguments, gc_log_path, read_only)
+
+    # Conflitos de mods derrubam o Forge só depois de ~1 minuto de carregamento; o índice
+    # (mods_index.py) aponta os mesmos problemas em milissegundos (e pega mods trocados depois da preparação)
+    if check_mods:
+        with tracer.span("mods") as span:
+            from mods_index import ModsIndex
+            status("Verificando mods...")
+            report = ModsIndex(game_directory).check(read_only=read_only)
+            span.set(mods=len(report.mods), errors=len(report.errors), warnings=len(report.warnings),
+                     jars_scanned=report.jars_scanned)
+            for problem in report.warnings:
+                status(f"Aviso: {problem['message']}")
+            if report.errors:
+                for problem in report.errors:
+                    status(f"Erro: {problem['message']}")
+                raise LaunchError("O Forge não vai iniciar com estes mods:\n" +
+                                  "\n".join(problem["message"] for problem in report.errors), EXIT_MODS_CONFLICT)
+            status(report.summary())
+
+    # O jogo só grava os mundos depois de aberto: o backup fica antes do processo iniciar
+    if backup_worlds and not read_only:
+        with tracer.span("backup") as span:
+            from world_backup import backup_worlds as run_backup
+            try:
+                snapshots = run_backup(game_directory, min_interval_hours=backup_interval_hours, status_callback=status)
+            except OSError as e:
+                status(f"Aviso: não foi possível fazer o backup dos mundos: {e}")
+                span.set(error=str(e))
+            else:
+                span.set(worlds=len(snapshots), bytes_written=sum(s["stats"]["bytes_written"] for s in snapshots))
+                if not snapshots:
+                    status("Backup dos mundos: nada a fazer.")
+
+    # Gerar UUID para modo offline
+    with tracer.span("uuid"):
+        status("Gerando UUID para o modo offline...")
+        offline_uuid = str(uuid.uuid4())
+        status(f"UUID Gerado: {offline_uuid}")
+
+    with tracer.span("command") as span:
+        if game_arguments:
+            status(f"Conectando direto ao servidor {game_arguments[1]}:{game_arguments[3]}.")
+        command = template.launch_plan.build_command(
+            nickname, offline_uuid, token="0", # Token dummy para modo offline
+            jvm_arguments=template.jvm_arguments, java_executable=template.java_runtime.path,
+            game_arguments=game_arguments
+        )
+        span.set(appcds=bool(template.startup_flags), classpath_entries=len(template.launch_plan.classpath),
+                 server=server_address or "")
+    status(f"Comando de lançamento: {' '.join(command)}")
+    return PreparedLaunch(version, game_directory, nickname, offline_uuid, template.java_runtime, template.jvm_settings,
+                          template.natives_directory, template.launch_plan, command)
+
+
+def start_game(prepared, on_launched=None, on_output=None, on_exit=None, tracer=None, log_path=None):
+    """
+    Inicia o jogo sem bloquear: a saída é acompanhada pelo GameProcess e gravada em log_path
+    (padrão: logs/launcher-output.log; o GameSupervisor dá um log próprio para cada jogo aberto).
+    A execução do tracer é encerrada quando a janela do jogo aparece (ou quando o jogo falha antes disso).
+    """
+    from game_process import GameProcess
+
+    tracer = tracer or _null_tracer("launch")
+    game_process = None
+
+    def launched():
+        # Sem marcador no log até o launch_timeout o jogo é só considerado aberto: evento próprio,
+        # para que esse tempo não se misture com o da janela nas comparações de trace
+        event = "launch_assumed" if game_process.launch_assumed else "window_shown"
+        tracer.event(event, seconds=round(game_process.launch_seconds, 3))
+        tracer.finish("ok", pid=game_process.pid, launch_assumed=game_process.launch_assumed)
+        if on_launched:
+            on_launched()
+
+    def exited(returncode, was_launched):
+        tracer.event("game_exit", returncode=returncode, launched=was_launched)
+        if not was_launched:
+            tracer.finish("error", returncode=returncode)
+        if on_exit:
+            on_exit(returncode, was_launched)
+
+    with tracer.span("process_start") as span:
+        game_process = GameProcess(
+            prepared.command,
+            cwd=prepared.game_directory,
+            log_path=log_path or os.path.join(prepared.game_directory, "logs", "launcher-output.log"),
+            on_launched=launched,
+            on_output=on_output,
+            on_exit=exited,
+        )
+        game_process.start()
+        span.set(pid=game_process.pid)
+    return game_process
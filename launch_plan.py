@@ -0,0 +1,141 @@
+import os
+
+from game_files import (
+    launcher_data_path, load_version_chain, version_chain_hash, merge_version_chain,
+    library_files, read_json, write_json_atomic,
+)
+
+PLAN_FORMAT = 1
+
+# Marcadores usados no lugar dos valores de cada usuário ao gerar o modelo do comando
+JAVA_PLACEHOLDER = "${grcraft_java}"
+JVM_ARGUMENTS_PLACEHOLDER = "${grcraft_jvm_arguments}"
+USERNAME_PLACEHOLDER = "${grcraft_username}"
+UUID_PLACEHOLDER = "${grcraft_uuid}"
+TOKEN_PLACEHOLDER = "${grcraft_token}"
+
+# Cache em memória: lançamentos repetidos na mesma sessão nem releem o plano do disco
+_memory_cache = {}
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class LaunchPlan:
+    """
+    Tudo o que o comando de lançamento precisa e que não depende do jogador:
+    classpath resolvido, classe principal, natives e o modelo de argumentos.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.template = data["template"]
+        self.classpath = data["classpath"]
+        self.main_class = data["main_class"]
+        self.natives = data["natives"]
+        self.natives_directory = data["natives_directory"]
+
+    def build_command(self, username, uuid, token="0", jvm_arguments=(), java_executable="java", game_arguments=()):
+        """
+        Substitui os valores do jogador (nome, UUID, RAM/JVM, java) no modelo do comando.
+        game_arguments (ex.: --server/--port) entram no fim, depois dos argumentos do jogo.
+        """
+        command = []
+        for arg in self.template:
+            if arg == JVM_ARGUMENTS_PLACEHOLDER:
+                command.extend(jvm_arguments)
+                continue
+            if "${grcraft_" in arg:
+                arg = (arg.replace(JAVA_PLACEHOLDER, java_executable)
+                          .replace(USERNAME_PLACEHOLDER, username)
+                          .replace(UUID_PLACEHOLDER, uuid)
+                          .replace(TOKEN_PLACEHOLDER, token))
+            command.append(arg)
+        command.extend(game_arguments)
+        return command
+
+
+class LaunchPlanCache:
+    """
+    Guarda o LaunchPlan em <game_dir>/.grcraft/launch_plan/<versão>.json.
+
+    A chave é o hash dos JSONs da cadeia de herança (Forge -> 1.8.8) mais o
+    tamanho/mtime de cada entrada do classpath e de cada jar de natives. Se
+    qualquer um mudar, o plano é descartado e gerado de novo pelo
+    minecraft_launcher_lib.
+    """
+
+    def __init__(self, game_directory, version):
+        self.game_directory = game_directory
+        self.version = version
+        self.path = launcher_data_path(game_directory, "launch_plan", version + ".json")
+
+    def _library_state(self, paths):
+        return {path: _stat_key(path) for path in paths}
+
+    def _is_valid(self, data, chain_hash):
+        if not data or data.get("format") != PLAN_FORMAT or data.get("version_hash") != chain_hash:
+            return False
+        return data.get("library_state") == self._library_state(data["classpath"] + data["natives"])
+
+    def get(self, natives_directory=None, read_only=False):
+        """
+        Retorna o plano em cache ou gera um novo se a versão ou as bibliotecas mudaram.
+        Com read_only, um plano novo não é gravado em disco.
+        """
+        chain = load_version_chain(self.version, self.game_directory)
+        chain_hash = version_chain_hash(chain)
+        memory_key = (self.path, natives_directory)
+
+        data = _memory_cache.get(memory_key)
+        if not self._is_valid(data, chain_hash):
+            data = read_json(self.path)
+            if not self._is_valid(data, chain_hash) or data.get("natives_directory") != natives_directory:
+                data = self._build(chain, chain_hash, natives_directory)
+                if not read_only:
+                    write_json_atomic(self.path, data)
+            _memory_cache[memory_key] = data
+        return LaunchPlan(data)
+
+    def invalidate(self):
+        for key in [k for k in _memory_cache if k[0] == self.path]:
+            del _memory_cache[key]
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _build(self, chain, chain_hash, natives_directory):
+        import minecraft_launcher_lib
+
+        options = {
+            "username": USERNAME_PLACEHOLDER,
+            "uuid": UUID_PLACEHOLDER,
+            "token": TOKEN_PLACEHOLDER,
+            "executablePath": JAVA_PLACEHOLDER,
+            "jvmArguments": [JVM_ARGUMENTS_PLACEHOLDER],
+            "gameDirectory": self.game_directory,
+        }
+        if natives_directory:
+            options["nativesDirectory"] = natives_directory
+        template = minecraft_launcher_lib.command.get_minecraft_command(self.version, self.game_directory, options)
+
+        merged = merge_version_chain(chain)
+        classpath = template[template.index("-cp") + 1].split(os.pathsep) if "-cp" in template else []
+        natives = [f.path for f in library_files(merged, self.game_directory) if f.kind == "native"]
+        return {
+            "format": PLAN_FORMAT,
+            "version": self.version,
+            "version_hash": chain_hash,
+            "template": template,
+            "classpath": classpath,
+            "main_class": merged["mainClass"],
+            "natives": natives,
+            "natives_directory": natives_directory,
+            "library_state": self._library_state(classpath + natives),
+        }
@@ -0,0 +1,413 @@
+import os
+import re
+import sys
+import gzip
+import mmap
+import glob
+import shutil
+import hashlib
+import argparse
+
+import numpy as np
+
+from game_files import launcher_data_path, user_cache_path, read_json, write_json_atomic
+
+LOG_PATTERNS = ("logs/*.log", "logs/*.log.[0-9]*", "logs/*.log.gz", "crash-reports/*.txt")
+SCAN_CHUNK = 16 * 1024 * 1024 # Bytes por bloco ao procurar quebras de linha
+INDEX_FORMAT = 1
+
+# Pacotes do Minecraft, do Forge e de bibliotecas: nunca são o "culpado" de um crash
+FRAMEWORK_PACKAGES = (
+    "java.", "javax.", "sun.", "jdk.", "com.sun.", "net.minecraft.", "net.minecraftforge.", "cpw.mods.",
+    "com.mojang.", "com.google.", "org.apache.", "io.netty.", "org.lwjgl.", "paulscode.", "joptsimple.",
+    "LZMA.", "oshi.", "scala.", "akka.", "org.objectweb.asm.",
+)
+# "UCHIJAAAE	examplemod{1.0} [Example Mod] (examplemod-1.0.jar)" na lista de mods do crash report
+MOD_STATE_LINE = re.compile(r"^\s*([ULCHIJADE]+)\s+(\S+?)\{([^}]*)\}\s+\[([^\]]*)\]\s+\(([^)]*)\)")
+STACK_FRAME = re.compile(r"^\s+at ([\w$.]+)\.([\w$<>]+)\(([^)]*)\)")
+
+
+def _scan_newlines(buffer, start, end):
+    """Posições de todos os '\\n' em buffer[start:end], em blocos para não copiar o arquivo inteiro."""
+    parts = []
+    for offset in range(start, end, SCAN_CHUNK):
+        block = np.frombuffer(buffer, dtype=np.uint8, count=min(SCAN_CHUNK, end - offset), offset=offset)
+        parts.append(np.flatnonzero(block == 10).astype(np.int64) + offset)
+        del block # Libera a referência ao mmap (senão ele não pode ser fechado)
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+class SearchHit:
+    def __init__(self, path, line_number, text, start, end):
+        self.path = path
+        self.line_number = line_number # A partir de 1
+        self.text = text
+        self.start = start # Posição do trecho encontrado dentro da linha
+        self.end = end
+
+    def __repr__(self):
+        return f"{os.path.basename(self.path)}:{self.line_number}: {self.text}"
+
+
+class LogFile:
+    """
+    Um arquivo de log com índice de linhas (posição de cada '\\n').
+
+    O conteúdo é lido por mmap; o índice fica em <game_dir>/.grcraft/log_index e só a parte
+    nova do arquivo é varrida quando ele cresce. Arquivos .gz são descompactados uma vez
+    para a pasta de cache e lidos a partir dela.
+    """
+
+    def __init__(self, path, index_directory):
+        self.path = path
+        key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+        self._meta_path = os.path.join(index_directory, f"{key}.json")
+        self._offsets_path = os.path.join(index_directory, f"{key}.npy")
+        self.data_path = user_cache_path("logs", f"{key}.log") if path.endswith(".gz") else path
+        self.newlines = None
+        self.size = 0
+        self._tail_position = None
+        self._source_key = None # Stat do .gz já descompactado nesta sessão
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    @property
+    def is_archive(self):
+        """Log compactado (.gz): não cresce, então não há o que acompanhar."""
+        return self.data_path != self.path
+
+    def _stat_key(self):
+        st = os.stat(self.path)
+        return [st.st_size, st.st_mtime_ns]
+
+    def _prepare_data(self):
+        """Para .gz: descompacta para o cache se o arquivo mudou. Retorna o tamanho dos dados."""
+        if self.data_path == self.path:
+            return os.path.getsize(self.path)
+        source = self._stat_key()
+        if self._source_key != source or not os.path.exists(self.data_path):
+            if read_json(self._meta_path, {}).get("source") != source or not os.path.exists(self.data_path):
+                os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+                tmp_path = self.data_path + ".tmp"
+                with gzip.open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                os.replace(tmp_path, self.data_path)
+                self.newlines = None # O índice antigo era de outro conteúdo
+                if os.path.exists(self._offsets_path):
+                    os.remove(self._offsets_path)
+                # Registra a origem já aqui (sem índice ainda): tail() sozinho não descompacta de novo
+                write_json_atomic(self._meta_path, {"path": self.path, "source": source})
+            self._source_key = source
+        return os.path.getsize(self.data_path)
+
+    def _head_hash(self, mm):
+        return hashlib.sha1(mm[:256]).hexdigest()
+
+    def refresh(self):
+        """Atualiza o índice de linhas. Retorna quantas linhas novas foram indexadas."""
+        size = self._prepare_data()
+        if self.newlines is None:
+            meta = read_json(self._meta_path, {})
+            if meta.get("format") == INDEX_FORMAT and os.path.exists(self._offsets_path):
+                self.newlines = np.load(self._offsets_path)
+                self.size = meta["size"]
+                self._head = meta["head"]
+            else:
+                self.newlines = np.empty(0, dtype=np.int64)
+                self.size = 0
+                self._head = None
+        if size == 0:
+            self.newlines, self.size = np.empty(0, dtype=np.int64), 0
+            return 0
+
+        before = len(self.newlines)
+        with open(self.data_path, "rb") as f, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            head = self._head_hash(mm)
+            if size < self.size or (self.size and head != self._head and self.size >= 256):
+                # Arquivo truncado ou trocado (ex.: latest.log de uma nova sessão): indexa do zero
+                self.newlines, self.size, before = np.empty(0, dtype=np.int64), 0, 0
+            if size > self.size:
+                self.newlines = np.concatenate((self.newlines, _scan_newlines(mm, self.size, size)))
+                self.size = size
+            self._head = head
+        if len(self.newlines) != before or not os.path.exists(self._meta_path):
+            self._save()
+        return len(self.newlines) - before
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self._offsets_path), exist_ok=True)
+        with open(self._offsets_path + ".tmp", "wb") as f:
+            np.save(f, self.newlines)
+        os.replace(self._offsets_path + ".tmp", self._offsets_path)
+        meta = {"format": INDEX_FORMAT, "path": self.path, "size": self.size, "head": self._head}
+        if self.data_path != self.path:
+            meta["source"] = self._stat_key()
+        write_json_atomic(self._meta_path, meta)
+
+    @property
+    def line_count(self):
+        if self.newlines is None:
+            return 0
+        partial = 1 if self.size and (not len(self.newlines) or self.newlines[-1] != self.size - 1) else 0
+        return len(self.newlines) + partial
+
+    def _line_bounds(self, index):
+        start = int(self.newlines[index - 1]) + 1 if index > 0 else 0
+        end = int(self.newlines[index]) if index < len(self.newlines) else self.size
+        return start, end
+
+    def lines(self, first, count):
+        """Linhas [first, first + count) (índices a partir de 0), já decodificadas."""
+        if self.newlines is None:
+            self.refresh()
+        last = min(first + count, self.line_count)
+        if first >= last:
+            return []
+        start, _ = self._line_bounds(first)
+        _, end = self._line_bounds(last - 1)
+        with open(self.data_path, "rb") as f:
+            f.seek(start)
+            chunk = f.read(end - start)
+        return chunk.decode("utf-8", errors="replace").replace("\r", "").split("\n")
+
+    def tail(self, count=200):
+        """
+        Últimas linhas completas, lidas de trás para frente sem precisar do índice. Uma linha
+        ainda sendo escrita fica para o read_new_lines().
+        """
+        size = self._prepare_data()
+        self._tail_position = 0
+        if size == 0:
+            return []
+        with open(self.data_path, "rb") as f, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            position = mm.rfind(b"\n")
+            if position < 0:
+                return []
+            self._tail_position = position + 1
+            start = position
+            for _ in range(count):
+                start = mm.rfind(b"\n", 0, start)
+                if start < 0:
+                    break
+            text = mm[start + 1:position]
+        return text.decode("utf-8", errors="replace").replace("\r", "").split("\n")
+
+    def read_new_lines(self):
+        """Linhas completas escritas desde a última chamada (ou desde tail()), para acompanhar o log."""
+        size = self._prepare_data()
+        if self._tail_position is None or size < self._tail_position:
+            self._tail_position = 0 if self._tail_position is not None else size
+        if size <= self._tail_position:
+            return []
+        with open(self.data_path, "rb") as f:
+            f.seek(self._tail_position)
+            chunk = f.read(size - self._tail_position)
+        complete = chunk.rfind(b"\n")
+        if complete < 0:
+            return [] # Linha ainda sendo escrita
+        self._tail_position += complete + 1
+        return chunk[:complete].decode("utf-8", errors="replace").replace("\r", "").split("\n")
+
+    def search(self, regex, max_results=1000):
+        """Linhas que casam com a expressão compilada (bytes). No máximo uma ocorrência por linha."""
+        self.refresh()
+        hits = []
+        if self.size == 0:
+            return hits
+        with open(self.data_path, "rb") as f, mmap.mmap(f.fileno(), self.size, access=mmap.ACCESS_READ) as mm:
+            position = 0
+            while len(hits) < max_results:
+                match = regex.search(mm, position)
+                if match is None:
+                    break
+                index = int(np.searchsorted(self.newlines, match.start()))
+                start, end = self._line_bounds(index)
+                text = mm[start:end].decode("utf-8", errors="replace").rstrip("\r")
+                hits.append(SearchHit(self.path, index + 1, text, match.start() - start, min(match.end(), end) - start))
+                position = end + 1
+                if position >= self.size:
+                    break
+        return hits
+
+
+class LogIndex:
+    """Logs (logs/*.log, *.log.gz) e crash reports de uma pasta do jogo, com busca por regex."""
+
+    def __init__(self, game_directory):
+        self.game_directory = game_directory
+        self.index_directory = launcher_data_path(game_directory, "log_index")
+        self._files = {}
+
+    def paths(self):
+        """Arquivos de log, do mais recente para o mais antigo."""
+        found = set()
+        for pattern in LOG_PATTERNS:
+            found.update(glob.glob(os.path.join(self.game_directory, *pattern.split("/"))))
+        return sorted(found, key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0, reverse=True)
+
+    def file(self, path):
+        if path not in self._files:
+            self._files[path] = LogFile(path, self.index_directory)
+        return self._files[path]
+
+    def files(self):
+        return [self.file(path) for path in self.paths()]
+
+    def refresh(self):
+        """Indexa a parte nova de todos os arquivos. Retorna o total de linhas novas."""
+        return sum(log_file.refresh() for log_file in self.files())
+
+    def search(self, pattern, paths=None, ignore_case=False, max_results=1000):
+        """Busca uma expressão regular em todos os logs (ou só em paths). Lança re.error se for inválida."""
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        regex = re.compile(pattern.encode("utf-8"), flags)
+        hits = []
+        for path in paths or self.paths():
+            hits.extend(self.file(path).search(regex, max_results - len(hits)))
+            if len(hits) >= max_results:
+                break
+        return hits
+
+    def crash_reports(self):
+        return [p for p in self.paths() if os.path.basename(os.path.dirname(p)) == "crash-reports"]
+
+    def latest_crash_report(self, since=None):
+        """CrashReport mais recente (opcionalmente só os criados depois do timestamp since)."""
+        for path in self.crash_reports():
+            if since is not None and os.path.getmtime(path) < since:
+                break
+            return parse_crash_report(path, self.game_directory)
+        return None
+
+
+class CrashReport:
+    def __init__(self, path):
+        self.path = path
+        self.time = ""
+        self.description = ""
+        self.exception = ""
+        self.frames = [] # "classe.método(arquivo:linha)"
+        self.errored_mods = [] # Mods no estado 'E' na lista do FML
+        self.culprit_mod = None
+        self.culprit_frame = None
+
+    def summary(self):
+        cause = self.exception or self.description or "erro desconhecido"
+        if self.culprit_mod:
+            return f"{cause} — provável causa: {self.culprit_mod}"
+        if self.culprit_frame:
+            return f"{cause} — em {self.culprit_frame}"
+        return cause
+
+    def to_dict(self):
+        return {
+            "path": self.path, "time": self.time, "description": self.description, "exception": self.exception,
+            "frames": self.frames[:20], "errored_mods": self.errored_mods,
+            "culprit_mod": self.culprit_mod, "culprit_frame": self.culprit_frame,
+        }
+
+
+def _mod_packages(game_directory):
+    """{pacote: "modid (arquivo.jar)"} a partir do índice da pasta mods."""
+    from mods_index import ModsIndex
+    packages = {}
+    for jar_path, entry in ModsIndex(game_directory).scan().items():
+        label = ", ".join(mod["modid"] for mod in entry["mods"]) or os.path.basename(jar_path)
+        label = f"{label} ({os.path.basename(jar_path)})"
+        for package in entry.get("packages", ()):
+            packages.setdefault(package, label)
+    return packages
+
+
+def parse_crash_report(path, game_directory=None):
+    """
+    Lê um crash report do Forge: exceção, stack trace, mods com erro e o provável culpado.
+    O culpado é o mod em estado 'E' (Errored) ou, se não houver, o mod dono da primeira linha
+    do stack trace fora do Minecraft/Forge/Java (pelos pacotes do índice de mods).
+    """
+    report = CrashReport(path)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        lines = f.read().splitlines()
+
+    in_trace = False
+    for index, line in enumerate(lines):
+        if line.startswith("Time: ") and not report.time:
+            report.time = line[len("Time: "):].strip()
+        elif line.startswith("Description: ") and not report.description:
+            report.description = line[len("Description: "):].strip()
+            # A exceção é a primeira linha não vazia depois da descrição
+            for candidate in lines[index + 1:]:
+                if candidate.strip():
+                    report.exception = candidate.strip()
+                    in_trace = True
+                    break
+        elif in_trace:
+            frame = STACK_FRAME.match(line)
+            if frame:
+                report.frames.append(f"{frame.group(1)}.{frame.group(2)}({frame.group(3)})")
+            elif report.frames and not line.strip():
+                in_trace = False # Fim do primeiro stack trace
+        state = MOD_STATE_LINE.match(line)
+        if state and "E" in state.group(1):
+            report.errored_mods.append(f"{state.group(2)} ({state.group(5)})")
+
+    for frame in report.frames:
+        if not frame.startswith(FRAMEWORK_PACKAGES):
+            report.culprit_frame = frame
+            break
+    if report.errored_mods:
+        report.culprit_mod = report.errored_mods[0]
+    elif report.culprit_frame and game_directory:
+        class_name = report.culprit_frame.split("(")[0].rsplit(".", 1)[0]
+        package = class_name.rsplit(".", 1)[0]
+        packages = _mod_packages(game_directory)
+        while package and report.culprit_mod is None:
+            report.culprit_mod = packages.get(package)
+            package = package.rpartition(".")[0]
+    return report
+
+
+def main(argv=None):
+    """Modo sem interface: python log_index.py {search,crash,files} [...] [--game-dir <pasta>]"""
+    from launch_pipeline import default_game_directory
+
+    parser = argparse.ArgumentParser(description="Busca nos logs e crash reports do jogo.")
+    parser.add_argument("command", choices=["search", "crash", "files"])
+    parser.add_argument("pattern", nargs="?", help="Expressão regular (comando search)")
+    parser.add_argument("--game-dir", default=default_game_directory())
+    parser.add_argument("-i", "--ignore-case", action="store_true")
+    parser.add_argument("--max", type=int, default=200, help="Máximo de resultados")
+    args = parser.parse_args(argv)
+
+    index = LogIndex(args.game_dir)
+    if args.command == "files":
+        for log_file in index.files():
+            log_file.refresh()
+            print(f"{log_file.line_count:>10} linhas  {os.path.relpath(log_file.path, args.game_dir)}")
+    elif args.command == "search":
+        if not args.pattern:
+            parser.error("search precisa de uma expressão")
+        try:
+            hits = index.search(args.pattern, ignore_case=args.ignore_case, max_results=args.max)
+        except re.error as e:
+            print(f"Erro: expressão inválida: {e}", file=sys.stderr)
+            return 2
+        for hit in hits:
+            print(f"{os.path.relpath(hit.path, args.game_dir)}:{hit.line_number}: {hit.text}")
+        return 0 if hits else 1
+    else:
+        report = index.latest_crash_report()
+        if report is None:
+            print("Nenhum crash report encontrado.")
+            return 1
+        print(os.path.relpath(report.path, args.game_dir))
+        print(report.summary())
+        for frame in report.frames[:10]:
+            print(f"    at {frame}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,75 @@
+import time
+_startup_started = time.perf_counter() # Início do processo, usado pelo --profile-startup
 import sys
 import os
 import uuid
-import minecraft_launcher_lib
 import subprocess
-import configparser # Importa o módulo para salvar/carregar configurações
+import multiprocessing
+import shlex
+import threading
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLineEdit, QLabel, QMessageBox, QFrame, QSlider, QFileDialog,
-    QStackedWidget, QProgressBar
+    QStackedWidget, QProgressBar, QComboBox, QInputDialog, QScrollArea, QDialog, QCheckBox,
+    QListWidget, QListWidgetItem, QPlainTextEdit, QSplitter, QTableWidget, QTableWidgetItem, QHeaderView,
+    QAbstractItemView
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QPixmap, QPalette, QBrush, QColor, QPainter, QPen, QImage
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QByteArray, QPropertyAnimation, QEasingCurve, QPointF, QRectF
+from PyQt5.QtGui import QPixmap, QPalette, QBrush, QColor, QPainter, QPen, QImage, QPolygonF, QTextCursor, QFont
 from datetime import datetime
 import random
+import numpy as np
+from jvm_profiles import JVM_PROFILES, DEFAULT_PROFILE, compute_jvm_settings
+from launch_pipeline import DEFAULT_VERSION, default_game_directory
+from profiles import BACKUP_INTERVALS, ProfileStore, InstanceProfile
+from settings_store import PARTICLE_LEVELS, SettingsStore
+from supervisor import GameSupervisor
+# Os demais módulos do launcher (minecraft_launcher_lib, downloads, verificação, cache de
+# lançamento...) são importados dentro das threads que os usam, para não atrasar a primeira tela.
+_imports_finished = time.perf_counter()
+
+# Medição de tempo de inicialização (python main.py --profile-startup)
+class StartupProfiler:
+    def __init__(self, started, imports_finished):
+        self.started = started
+        self.marks = [("Importações", imports_finished)]
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+
+    def report(self):
+        lines = ["Tempo de inicialização:"]
+        previous = self.started
+        for name, timestamp in self.marks:
+            lines.append(f"  {name:<28}{(timestamp - previous) * 1000:8.1f} ms")
+            previous = timestamp
+        lines.append(f"  {'Total até a primeira pintura':<28}{(previous - self.started) * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+# Thread que decodifica e redimensiona a imagem de fundo fora da thread da interface
+class BackgroundImageLoader(QThread):
+    image_loaded = pyqtSignal(QImage)
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, path, size):
+        super().__init__()
+        self.path = path
+        self.size = size
+
+    def run(self):
+        # QImage (ao contrário de QPixmap) pode ser usada fora da thread principal
+        image = QImage(self.path)
+        if image.isNull():
+            self.load_failed.emit(self.path)
+            return
+        self.image_loaded.emit(image.scaled(self.size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
 
 # Thread para instalação de bibliotecas para não travar a UI
 class LibraryInstallerThread(QThread):
     installation_finished = pyqtSignal(bool, str) # Sinal (sucesso, mensagem de erro)
     status_message = pyqtSignal(str) # Sinal para enviar mensagens de status para a UI
+    install_progress = pyqtSignal(dict) # Snapshot do InstallProgress (arquivos, bytes, vazão, tempo restante), até 10x por segundo
+    trace_event = pyqtSignal(dict) # Início/fim de cada etapa (ver tracing.py)
 
     def __init__(self, version, game_directory):
         super().__init__()
@@ -25,165 +77,849 @@ class LibraryInstallerThread(QThread):
         self.game_directory = game_directory
 
     def run(self):
+        from launch_pipeline import install_version, new_tracer
+        from install_progress import InstallProgress
+        tracer = new_tracer("install", self.game_directory, listener=self.trace_event.emit, version=self.version)
+        progress = InstallProgress(self.install_progress.emit)
         try:
-            self.status_message.emit("Verificando e instalando bibliotecas necessárias...")
-            minecraft_launcher_lib.install.install_minecraft_version(self.version, self.game_directory)
-            self.status_message.emit("Bibliotecas instaladas com sucesso!")
+            install_version(self.version, self.game_directory, status_callback=self.status_message.emit,
+                            progress=progress, tracer=tracer)
+            tracer.finish("ok")
             self.installation_finished.emit(True, "")
         except Exception as e:
+            tracer.finish("error", error=str(e))
             self.status_message.emit(f"Erro: Falha ao instalar bibliotecas: {str(e)}")
             self.installation_finished.emit(False, str(e))
 
-# Thread para o lançamento do jogo para não travar a UI
-class GameLauncherThread(QThread):
-    launch_finished = pyqtSignal(bool, str, str) # Sinal (sucesso, mensagem, nickname)
-    status_message = pyqtSignal(str) # Sinal para enviar mensagens de status para a UI
+# Thread que adianta, enquanto o jogador está na página do launcher, tudo o que não depende do
+# nickname (versão, Java, JVM, natives, plano e AppCDS); o clique em "Iniciar" só completa o comando
+class LaunchTemplateThread(QThread):
+    template_ready = pyqtSignal(object, str) # (LaunchTemplate ou None, mensagem de erro)
 
-    def __init__(self, version, game_directory, nickname, ram_allocation):
+    def __init__(self, version, game_directory, ram_allocation, jvm_profile, extra_jvm_arguments):
         super().__init__()
         self.version = version
         self.game_directory = game_directory
-        self.nickname = nickname
         self.ram_allocation = ram_allocation
+        self.jvm_profile = jvm_profile
+        self.extra_jvm_arguments = list(extra_jvm_arguments)
+        self.template = None # Resultado, lido também pela GameLauncherThread que esperou esta thread
 
     def run(self):
+        from launch_pipeline import prepare_template
+        from resource_monitor import gc_log_template
         try:
-            # Validação de nickname já feita na UI, mas pode ser reforçada aqui se necessário
-            if not self.nickname or len(self.nickname) < 3 or len(self.nickname) > 16:
-                self.status_message.emit("Erro: Nickname deve ter entre 3 e 16 caracteres.")
-                self.launch_finished.emit(False, "Nickname inválido.", self.nickname)
-                return
+            template = prepare_template(self.version, self.game_directory, self.ram_allocation, self.jvm_profile,
+                                        extra_jvm_arguments=self.extra_jvm_arguments,
+                                        gc_log_path=gc_log_template(self.game_directory))
+            self.template = template
+            self.template_ready.emit(template, "")
+        except Exception as e: # O lançamento de verdade refaz as etapas e mostra o erro
+            self.template_ready.emit(None, str(e))
+
+# Thread para verificar (e reparar) os arquivos do jogo pelo SHA-1 sem travar a UI
+class IntegrityCheckThread(QThread):
+    check_finished = pyqtSignal(bool, str) # Sinal (tudo íntegro, resumo)
+    status_message = pyqtSignal(str)
+    verify_progress = pyqtSignal(int, int) # (arquivos verificados, total)
 
-            self.status_message.emit(f"Tentando iniciar Minecraft com o nickname: {self.nickname}")
-            self.status_message.emit(f"Alocação de RAM: {self.ram_allocation}GB")
+    def __init__(self, version, game_directory):
+        super().__init__()
+        self.version = version
+        self.game_directory = game_directory
 
-            # Verificar se a versão existe
-            self.status_message.emit("Verificando se a versão existe...")
-            if not minecraft_launcher_lib.utils.is_version_valid(self.version, self.game_directory):
-                self.status_message.emit(f"Erro: Versão {self.version} não encontrada em {self.game_directory}")
-                self.launch_finished.emit(False, f"Versão {self.version} não encontrada.", self.nickname)
-                return
-            self.status_message.emit("Versão encontrada.")
+    def run(self):
+        from integrity import verify_game_files, repair_game_files
+        from downloader import DownloadEngine
+        try:
+            self.status_message.emit("Verificando integridade dos arquivos do jogo...")
+            report = verify_game_files(self.version, self.game_directory, progress_callback=self._on_progress)
+            summary = (f"{report.files_checked} arquivos ({report.bytes_checked / (1024 * 1024):.0f} MB) "
+                       f"verificados a {report.throughput_mbps:.0f} MB/s.")
+            if report.bad_files:
+                self.status_message.emit(f"{len(report.bad_files)} arquivo(s) ausente(s) ou corrompido(s). Reparando...")
+                engine = DownloadEngine()
+                try:
+                    repair_game_files(report, self.version, self.game_directory, engine)
+                finally:
+                    engine.close()
+                summary += f" Reparados: {len(report.repaired)}. Falhas: {len(report.repair_failures)}."
+            self.status_message.emit(summary)
+            self.check_finished.emit(not report.repair_failures, summary)
+        except Exception as e:
+            self.status_message.emit(f"Erro: Falha ao verificar arquivos: {str(e)}")
+            self.check_finished.emit(False, str(e))
+
+    def _on_progress(self, done, total, _bytes_checked):
+        # Milhares de assets: só avisa a UI a cada 100 arquivos
+        if done % 100 == 0 or done == total:
+            self.verify_progress.emit(done, total)
+
+# Thread do "Otimizar Inicialização": lançamento de treino + geração do arquivo AppCDS
+class StartupOptimizerThread(QThread):
+    optimization_finished = pyqtSignal(bool, str) # Sinal (sucesso, mensagem)
+    status_message = pyqtSignal(str)
+
+    def __init__(self, version, game_directory, ram_allocation, jvm_profile, menu_timeout=180):
+        super().__init__()
+        self.version = version
+        self.game_directory = game_directory
+        self.ram_allocation = ram_allocation
+        self.jvm_profile = jvm_profile
+        self.menu_timeout = menu_timeout
 
-            # Verificar instalação do Java
-            self.status_message.emit("Verificando instalação do Java...")
+    def run(self):
+        from launch_pipeline import LaunchError, find_java
+        from natives_cache import NativesCache
+        from launch_plan import LaunchPlanCache
+        from appcds import StartupArchive, MAIN_MENU_MARKERS
+        from game_process import GameProcess
+        try:
             try:
-                subprocess.check_output(["java", "-version"], stderr=subprocess.STDOUT, shell=True)
-                self.status_message.emit("Java encontrado.")
-            except subprocess.CalledProcessError:
-                self.status_message.emit("Erro: Java não encontrado ou não instalado corretamente.")
-                self.launch_finished.emit(False, "Java não está instalado ou não está no PATH. Por favor, instale o Java 8.", self.nickname)
+                java_runtime = find_java()
+            except LaunchError as e:
+                self.optimization_finished.emit(False, str(e))
                 return
-
-            # Verificar arquivo authlib
-            authlib_path = os.path.join(self.game_directory, "libraries", "com", "mojang", "authlib", "1.5.21", "authlib-1.5.21.jar")
-            self.status_message.emit(f"Verificando authlib em: {authlib_path}")
-            if not os.path.exists(authlib_path):
-                self.status_message.emit(f"Erro: authlib-1.5.21.jar não encontrado em {authlib_path}")
-                self.launch_finished.emit(False, f"authlib-1.5.21.jar não encontrado. Garanta que as bibliotecas estão instaladas corretamente.", self.nickname)
+            natives_directory = NativesCache(self.game_directory, self.version).prepare()
+            launch_plan = LaunchPlanCache(self.game_directory, self.version).get(natives_directory)
+            archive = StartupArchive(self.game_directory)
+            training_flags = archive.training_flags(java_runtime, launch_plan.classpath)
+            if training_flags is None:
+                self.optimization_finished.emit(False, f"O Java {java_runtime.version} ({java_runtime.vendor}) não suporta AppCDS.")
                 return
-            self.status_message.emit("authlib-1.5.21.jar encontrado.")
-
-            # Gerar UUID para modo offline
-            self.status_message.emit("Gerando UUID para o modo offline...")
-            offline_uuid = str(uuid.uuid4())
-            self.status_message.emit(f"UUID Gerado: {offline_uuid}")
-
-            # Definir opções de lançamento offline
-            self.status_message.emit("Preparando opções de lançamento...")
-            jvm_arguments = [f"-Xmx{self.ram_allocation}G", f"-Xms{int(self.ram_allocation/2)}G"] # Define Xms como metade de Xmx
-            options = {
-                "username": self.nickname,
-                "uuid": offline_uuid,
-                "token": "0",  # Token dummy para modo offline
-                "gameDirectory": self.game_directory,
-                "version": self.version,
-                "jvmArguments": jvm_arguments
-            }
-
-            # Obter comando de lançamento
-            self.status_message.emit("Gerando comando de lançamento...")
-            minecraft_command = minecraft_launcher_lib.command.get_minecraft_command(
-                self.version, self.game_directory, options
-            )
-            self.status_message.emit(f"Comando de lançamento: {' '.join(minecraft_command)}")
 
-            # Iniciar o jogo
-            self.status_message.emit("Iniciando Minecraft...")
-            process = subprocess.run(minecraft_command, shell=True, capture_output=True, text=True)
+            # Lançamento de treino: registra as classes carregadas até o menu principal
+            self.status_message.emit("Iniciando lançamento de treino (o jogo fechará sozinho no menu principal)...")
+            jvm_arguments = compute_jvm_settings(self.jvm_profile, self.ram_allocation).arguments + training_flags
+            command = launch_plan.build_command("Otimizador", str(uuid.uuid4()), jvm_arguments=jvm_arguments,
+                                                java_executable=java_runtime.path)
+            menu_reached = threading.Event()
+
+            def watch_output(lines):
+                if any(marker in line for line in lines for marker in MAIN_MENU_MARKERS):
+                    menu_reached.set()
+
+            started = time.monotonic()
+            game_process = GameProcess(command, cwd=self.game_directory, on_output=watch_output,
+                                       on_exit=lambda _code, _launched: menu_reached.set())
+            game_process.start()
+            menu_reached.wait(self.menu_timeout)
+            time_to_menu = time.monotonic() - started
+            # Fechamento normal: a JVM só termina de gravar a lista de classes ao sair por conta própria
+            if not game_process.request_exit(timeout=60):
+                game_process.stop()
+            self.status_message.emit(f"Treino concluído: menu principal em {time_to_menu:.1f}s. Gerando arquivo de classes...")
+
+            archive.build(java_runtime, launch_plan.classpath, time_to_menu=time_to_menu)
+            self.optimization_finished.emit(True, f"Inicialização otimizada. Tempo até o menu no treino: {time_to_menu:.1f}s.")
+        except Exception as e:
+            self.status_message.emit(f"Erro: Falha ao otimizar a inicialização: {str(e)}")
+            self.optimization_finished.emit(False, str(e))
 
-            if process.returncode == 0:
-                self.status_message.emit("Minecraft iniciado com sucesso!")
-                self.launch_finished.emit(True, f"Minecraft iniciado no modo offline como {self.nickname}!", self.nickname)
-            else:
-                self.status_message.emit(f"Erro: Processo do Minecraft falhou com código de saída {process.returncode}")
-                self.status_message.emit(f"Saída do processo: {process.stderr}")
-                self.launch_finished.emit(False, f"Falha ao iniciar Minecraft. Verifique os logs para detalhes.", self.nickname)
+# Thread para o lançamento do jogo para não travar a UI
+class GameLauncherThread(QThread):
+    launch_finished = pyqtSignal(bool, str, str) # Sinal (sucesso, mensagem, nickname)
+    status_message = pyqtSignal(str) # Sinal para enviar mensagens de status para a UI
+    game_output = pyqtSignal(list) # Lote de linhas da saída do jogo (limitado a ~4 por segundo)
+    game_exited = pyqtSignal(int) # Código de saída do processo do jogo
+    trace_event = pyqtSignal(dict) # Início/fim de cada etapa (ver tracing.py)
 
+    def __init__(self, version, game_directory, nickname, ram_allocation, supervisor, jvm_profile=DEFAULT_PROFILE,
+                 extra_jvm_arguments=(), profile_name="", backup_worlds=False, server_address=None, template=None,
+                 template_thread=None, backup_interval_hours=0):
+        super().__init__()
+        self.version = version
+        self.game_directory = game_directory
+        self.nickname = nickname
+        self.ram_allocation = ram_allocation
+        self.supervisor = supervisor
+        self.jvm_profile = jvm_profile
+        self.extra_jvm_arguments = list(extra_jvm_arguments)
+        self.profile_name = profile_name
+        self.backup_worlds = backup_worlds
+        self.backup_interval_hours = backup_interval_hours
+        self.server_address = server_address
+        self.template = template # LaunchTemplate adiantado pela LaunchTemplateThread (ou None)
+        self.template_thread = template_thread # Preparação ainda em andamento no momento do clique (ou None)
+        self.game_process = None
+        self.running_game = None
+        self.started_at = None
+
+    def run(self):
+        from launch_pipeline import LaunchError, new_tracer, prepare_launch
+        from resource_monitor import gc_log_template
+        self.started_at = time.time()
+        tracer = new_tracer("launch", self.game_directory, listener=self.trace_event.emit, profile=self.profile_name,
+                            version=self.version, ram_gb=self.ram_allocation, jvm_profile=self.jvm_profile)
+        backup_worlds = self.backup_worlds
+        if backup_worlds and self.supervisor.running_in(self.game_directory):
+            # Um jogo aberto nesta pasta está gravando os mundos: o backup sairia inconsistente
+            self.status_message.emit("Backup dos mundos pulado: já há um jogo aberto nesta pasta.")
+            backup_worlds = False
+        template = self.template
+        if template is None and self.template_thread is not None and self.template_thread.isRunning():
+            # Espera a preparação em segundo plano em vez de refazer as mesmas etapas ao mesmo tempo
+            self.status_message.emit("Aguardando a preparação em segundo plano...")
+            self.template_thread.wait()
+            template = self.template_thread.template
+        try:
+            # Validação, Java, authlib, JVM e comando: mesmo pipeline do modo sem interface (cli.py)
+            prepared = prepare_launch(self.version, self.game_directory, self.nickname, self.ram_allocation,
+                                      self.jvm_profile, status_callback=self.status_message.emit, tracer=tracer,
+                                      extra_jvm_arguments=self.extra_jvm_arguments,
+                                      gc_log_path=gc_log_template(self.game_directory),
+                                      backup_worlds=backup_worlds, backup_interval_hours=self.backup_interval_hours,
+                                      server_address=self.server_address, template=template)
+
+            # Iniciar o jogo sem bloquear a thread: o supervisor acompanha este e os outros jogos abertos
+            self.status_message.emit("Iniciando Minecraft...")
+            running_game = self.supervisor.launch(
+                prepared,
+                self.profile_name,
+                on_launched=self._on_game_window_up,
+                on_output=self.game_output.emit,
+                on_exit=self._on_game_exit,
+                tracer=tracer,
+                gc_log_path=gc_log_template(self.game_directory),
+            )
+            self.running_game = running_game
+            self.game_process = running_game.game_process
+            self.status_message.emit(f"Processo do Minecraft iniciado (PID {self.game_process.pid}). Aguardando a janela do jogo...")
+
+        except LaunchError as e:
+            tracer.finish("error", error=str(e))
+            self.launch_finished.emit(False, str(e), self.nickname)
         except Exception as e:
+            tracer.finish("error", error=str(e))
             self.status_message.emit(f"Erro: Falha ao iniciar Minecraft: {str(e)}")
             self.launch_finished.emit(False, f"Falha ao iniciar Minecraft: {str(e)}", self.nickname)
 
+    def _on_game_window_up(self):
+        """Chamado pelo GameProcess quando a janela do jogo aparece (ou após o launch_timeout sem marcador)."""
+        if self.game_process.launch_assumed:
+            self.status_message.emit(f"Minecraft em execução, mas nenhuma janela foi detectada no log em "
+                                     f"{self.game_process.launch_seconds:.0f}s; considerando o jogo aberto.")
+        else:
+            self.status_message.emit(f"Minecraft iniciado com sucesso! (janela em {self.game_process.launch_seconds:.1f}s)")
+        self.launch_finished.emit(True, f"Minecraft iniciado no modo offline como {self.nickname}!", self.nickname)
+
+    def _on_game_exit(self, returncode, launched):
+        """Chamado pelo GameProcess quando o processo do jogo termina."""
+        if not launched:
+            self.status_message.emit(f"Erro: Processo do Minecraft falhou com código de saída {returncode}")
+            message = "Falha ao iniciar Minecraft."
+            crash_report = self._find_crash_report()
+            if crash_report is not None:
+                self.status_message.emit(f"Erro: {crash_report.summary()}")
+                message += (f"\n\n{crash_report.summary()}\n\nCrash report: "
+                            f"{os.path.relpath(crash_report.path, self.game_directory)} (veja em \"Ver Logs\").")
+            else:
+                message += " Veja a saída completa do jogo em \"Ver Logs\"."
+            self.launch_finished.emit(False, message, self.nickname)
+        self.game_exited.emit(returncode)
+
+    def _find_crash_report(self):
+        """Crash report gerado por este lançamento, já com o provável culpado (ou None)."""
+        from log_index import LogIndex
+        try:
+            return LogIndex(self.game_directory).latest_crash_report(since=self.started_at)
+        except (OSError, ValueError) as e:
+            self.status_message.emit(f"Aviso: não foi possível ler o crash report: {str(e)}")
+            return None
+
+# Thread para a busca nos logs (centenas de MB não podem travar a interface)
+class LogSearchThread(QThread):
+    search_finished = pyqtSignal(list, str) # (resultados, mensagem de erro)
+
+    def __init__(self, game_directory, pattern, paths, ignore_case):
+        super().__init__()
+        self.game_directory = game_directory
+        self.pattern = pattern
+        self.paths = paths
+        self.ignore_case = ignore_case
+
+    def run(self):
+        import re
+        from log_index import LogIndex
+        try:
+            hits = LogIndex(self.game_directory).search(self.pattern, self.paths, self.ignore_case, LogViewerDialog.MAX_RESULTS)
+            self.search_finished.emit(hits, "")
+        except re.error as e:
+            self.search_finished.emit([], f"Expressão inválida: {str(e)}")
+        except OSError as e:
+            self.search_finished.emit([], f"Erro ao ler os logs: {str(e)}")
+
+
+# Janela de logs: arquivos de logs/ e crash-reports/, busca por regex e acompanhamento ao vivo
+class LogViewerDialog(QDialog):
+    """
+    Mostra o fim do log escolhido (e as linhas novas a cada segundo), busca em todos os logs
+    pelo índice de linhas do log_index.py e resume o crash report mais recente.
+    """
+    TAIL_LINES = 500
+    CONTEXT_LINES = 100
+    MAX_RESULTS = 1000
+
+    def __init__(self, game_directory, parent=None):
+        super().__init__(parent)
+        from log_index import LogIndex
+        self.setWindowTitle("Logs do Jogo")
+        self.resize(1100, 650)
+        self.game_directory = game_directory
+        self.log_index = LogIndex(game_directory)
+        self.current_file = None
+        self.search_thread = None
+
+        layout = QVBoxLayout(self)
+        self.crash_label = QLabel()
+        self.crash_label.setObjectName("inputLabel")
+        self.crash_label.setWordWrap(True)
+        layout.addWidget(self.crash_label)
+
+        file_layout = QHBoxLayout()
+        self.file_combo = QComboBox()
+        self.file_combo.setObjectName("jvmProfileCombo")
+        self.file_combo.currentIndexChanged.connect(self.show_selected_file)
+        file_layout.addWidget(self.file_combo, 1)
+        self.follow_check = QCheckBox("Acompanhar")
+        self.follow_check.setChecked(True)
+        file_layout.addWidget(self.follow_check)
+        reload_button = QPushButton("Atualizar")
+        reload_button.setObjectName("modsButton")
+        reload_button.clicked.connect(self.reload_files)
+        file_layout.addWidget(reload_button)
+        layout.addLayout(file_layout)
+
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setObjectName("nicknameInput")
+        self.search_input.setPlaceholderText("Expressão regular (ex.: Exception|ERROR)")
+        self.search_input.returnPressed.connect(self.start_search)
+        search_layout.addWidget(self.search_input, 1)
+        self.ignore_case_check = QCheckBox("Ignorar maiúsculas")
+        search_layout.addWidget(self.ignore_case_check)
+        self.all_files_check = QCheckBox("Todos os arquivos")
+        self.all_files_check.setChecked(True)
+        search_layout.addWidget(self.all_files_check)
+        self.search_button = QPushButton("Buscar")
+        self.search_button.setObjectName("modsButton")
+        self.search_button.clicked.connect(self.start_search)
+        search_layout.addWidget(self.search_button)
+        layout.addLayout(search_layout)
+
+        splitter = QSplitter(Qt.Vertical)
+        self.results_list = QListWidget()
+        self.results_list.currentItemChanged.connect(self.show_hit)
+        splitter.addWidget(self.results_list)
+        self.text_view = QPlainTextEdit()
+        self.text_view.setReadOnly(True)
+        self.text_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.text_view.setMaximumBlockCount(20000) # Acompanhando um log enorme, só as últimas linhas ficam na tela
+        self.text_view.setFont(QFont("Monospace", 9))
+        splitter.addWidget(self.text_view)
+        splitter.setSizes([150, 450])
+        layout.addWidget(splitter, 1)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.tail_timer = QTimer(self)
+        self.tail_timer.setInterval(1000)
+        self.tail_timer.timeout.connect(self.follow_tail)
+        self.reload_files()
+
+    def reload_files(self):
+        """Lista os logs e crash reports (mais recentes primeiro) e resume o último crash."""
+        self.file_combo.blockSignals(True)
+        self.file_combo.clear()
+        for path in self.log_index.paths():
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            self.file_combo.addItem(f"{os.path.relpath(path, self.game_directory)} ({size_mb:.1f} MB)", path)
+        self.file_combo.blockSignals(False)
+        try:
+            crash_report = self.log_index.latest_crash_report()
+        except (OSError, ValueError):
+            crash_report = None
+        if crash_report is not None:
+            self.crash_label.setText(f"Último crash ({os.path.basename(crash_report.path)}): {crash_report.summary()}")
+        else:
+            self.crash_label.setText("Nenhum crash report encontrado.")
+        if self.file_combo.count():
+            self.show_selected_file(0)
+        else:
+            self.text_view.setPlainText("Nenhum log encontrado em logs/ ou crash-reports/.")
+
+    def show_selected_file(self, index):
+        path = self.file_combo.itemData(index)
+        if not path:
+            return
+        self.current_file = self.log_index.file(path)
+        self.text_view.setPlainText("\n".join(self.current_file.tail(self.TAIL_LINES)))
+        self.text_view.moveCursor(QTextCursor.End)
+        if self.current_file.is_archive:
+            self.follow_check.setChecked(False) # .gz não muda: nada a acompanhar
+            self.tail_timer.stop()
+        else:
+            self.follow_check.setChecked(True)
+            self.tail_timer.start()
+
+    def follow_tail(self):
+        """Acrescenta as linhas novas do arquivo aberto (só a parte que cresceu é lida)."""
+        if self.current_file is None or not self.follow_check.isChecked():
+            return
+        try:
+            new_lines = self.current_file.read_new_lines()
+        except OSError:
+            return # Arquivo rotacionado ou apagado; "Atualizar" recarrega a lista
+        if new_lines:
+            self.text_view.appendPlainText("\n".join(new_lines))
+
+    def start_search(self):
+        pattern = self.search_input.text()
+        if not pattern or (self.search_thread is not None and self.search_thread.isRunning()):
+            return
+        paths = None if self.all_files_check.isChecked() or self.current_file is None else [self.current_file.path]
+        self.search_button.setEnabled(False)
+        self.status_label.setText("Buscando...")
+        self.search_started = time.perf_counter()
+        self.search_thread = LogSearchThread(self.game_directory, pattern, paths, self.ignore_case_check.isChecked())
+        self.search_thread.search_finished.connect(self.on_search_finished)
+        self.search_thread.start()
+
+    def on_search_finished(self, hits, error):
+        self.search_button.setEnabled(True)
+        self.results_list.clear()
+        if error:
+            self.status_label.setText(error)
+            return
+        for hit in hits:
+            item = QListWidgetItem(f"{os.path.relpath(hit.path, self.game_directory)}:{hit.line_number}: {hit.text[:300]}")
+            item.setData(Qt.UserRole, (hit.path, hit.line_number))
+            self.results_list.addItem(item)
+        limit = f" (limite de {self.MAX_RESULTS})" if len(hits) >= self.MAX_RESULTS else ""
+        self.status_label.setText(f"{len(hits)} resultado(s){limit} em {time.perf_counter() - self.search_started:.2f}s")
+
+    def show_hit(self, item, _previous=None):
+        """Mostra as linhas em volta de um resultado, com a linha encontrada selecionada."""
+        if item is None:
+            return
+        path, line_number = item.data(Qt.UserRole)
+        self.follow_check.setChecked(False)
+        log_file = self.log_index.file(path)
+        log_file.refresh()
+        first = max(0, line_number - 1 - self.CONTEXT_LINES)
+        self.text_view.setPlainText("\n".join(log_file.lines(first, 2 * self.CONTEXT_LINES + 1)))
+        block = self.text_view.document().findBlockByNumber(line_number - 1 - first)
+        cursor = QTextCursor(block)
+        cursor.select(QTextCursor.LineUnderCursor)
+        self.text_view.setTextCursor(cursor)
+        self.text_view.centerCursor()
+        self.status_label.setText(f"{os.path.basename(path)}, linha {line_number}")
+
+    def closeEvent(self, event):
+        self.tail_timer.stop()
+        super().closeEvent(event)
+
+class ServerStatusThread(QThread):
+    status_ready = pyqtSignal(dict) # ServerStatus.to_dict() de cada servidor, assim que ele responde
+
+    def __init__(self, cache, addresses, force=False):
+        super().__init__()
+        self.cache = cache
+        self.addresses = addresses
+        self.force = force
+        self.error = "" # Falha da atualização como um todo (ex.: cache sem permissão de gravação)
+
+    def run(self):
+        import asyncio
+        # Um loop asyncio próprio nesta thread: todas as consultas correm juntas sem travar a interface
+        try:
+            asyncio.run(self.cache.refresh(self.addresses, force=self.force,
+                                           on_result=lambda status: self.status_ready.emit(status.to_dict())))
+        except Exception as e: # Exceção solta numa QThread encerra o launcher inteiro
+            self.error = str(e) or type(e).__name__
+
+
+# Lista de servidores: status (MOTD, jogadores, versão, ping) atualizado em segundo plano e conexão direta
+class ServerBrowserDialog(QDialog):
+    COLUMNS = ("Nome", "Endereço", "MOTD", "Jogadores", "Versão", "Ping")
+
+    def __init__(self, launcher, parent=None):
+        super().__init__(parent)
+        from server_status import ServerList, StatusCache
+        self.setWindowTitle("Servidores")
+        self.resize(900, 450)
+        self.launcher = launcher
+        self.server_list = ServerList()
+        self.cache = StatusCache()
+        self.status_thread = None
+
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.cellDoubleClicked.connect(lambda row, _column: self.connect_selected())
+        layout.addWidget(self.table, 1)
+
+        buttons_layout = QHBoxLayout()
+        for text, slot in (("Adicionar", self.add_server), ("Remover", self.remove_server),
+                           ("Atualizar", lambda: self.refresh(force=True)), ("Conectar", self.connect_selected)):
+            button = QPushButton(text)
+            button.setObjectName("modsButton")
+            button.clicked.connect(slot)
+            buttons_layout.addWidget(button)
+        layout.addLayout(buttons_layout)
+
+        direct_layout = QHBoxLayout()
+        self.direct_input = QLineEdit()
+        self.direct_input.setObjectName("nicknameInput")
+        self.direct_input.setPlaceholderText("Conexão direta: host[:porta]")
+        self.direct_input.returnPressed.connect(self.connect_direct)
+        direct_layout.addWidget(self.direct_input, 1)
+        direct_button = QPushButton("Conectar Direto")
+        direct_button.setObjectName("modsButton")
+        direct_button.clicked.connect(self.connect_direct)
+        direct_layout.addWidget(direct_button)
+        layout.addLayout(direct_layout)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        # Enquanto a janela está aberta, os status vencidos (TTL do cache) são consultados de novo
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(int(self.cache.ttl * 1000))
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.reload_table()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def closeEvent(self, event):
+        self.refresh_timer.stop()
+        super().closeEvent(event)
+
+    def reload_table(self):
+        """Preenche a tabela com a lista salva e o último status conhecido de cada servidor."""
+        self.table.setRowCount(len(self.server_list.servers))
+        for row, entry in enumerate(self.server_list.servers):
+            self.table.setItem(row, 0, QTableWidgetItem(entry["name"]))
+            self.table.setItem(row, 1, QTableWidgetItem(entry["address"]))
+            status = self.cache.get(entry["address"])
+            self.show_status(row, status.to_dict() if status else None)
+        if not self.server_list.servers:
+            self.status_label.setText("Nenhum servidor salvo. Use \"Adicionar\" ou a conexão direta.")
+
+    def show_status(self, row, status):
+        from server_status import PROTOCOL_VERSION
+        if status is None:
+            cells = ("Consultando...", "", "", "")
+        elif not status["online"]:
+            cells = (f"Offline ({status['error']})", "", "", "")
+        else:
+            version = status["version"] if status["protocol"] in (None, PROTOCOL_VERSION) else f"{status['version']} (incompatível)"
+            cells = (status["motd"], f"{status['players_online']}/{status['players_max']}", version,
+                     f"{status['latency_ms']:.0f} ms")
+        for column, text in enumerate(cells, start=2):
+            self.table.setItem(row, column, QTableWidgetItem(text))
+
+    def on_status_ready(self, status):
+        for row, entry in enumerate(self.server_list.servers):
+            if entry["address"] == status["address"]:
+                self.show_status(row, status)
+
+    def refresh(self, force=False):
+        """Consulta em segundo plano os servidores sem status atual (ou todos, com force)."""
+        if self.status_thread is not None and self.status_thread.isRunning():
+            return
+        addresses = self.server_list.addresses()
+        if not addresses or not (force or self.cache.stale(addresses)):
+            return
+        self.status_label.setText("Atualizando status dos servidores...")
+        self.status_thread = ServerStatusThread(self.cache, addresses, force)
+        self.status_thread.status_ready.connect(self.on_status_ready)
+        self.status_thread.finished.connect(self.on_refresh_finished)
+        self.status_thread.start()
+
+    def on_refresh_finished(self):
+        if self.status_thread.error:
+            self.status_label.setText(f"Falha ao atualizar: {self.status_thread.error}")
+        else:
+            self.status_label.setText(f"Atualizado às {datetime.now().strftime('%H:%M:%S')}.")
+
+    def selected_address(self):
+        row = self.table.currentRow()
+        return self.server_list.servers[row]["address"] if 0 <= row < len(self.server_list.servers) else None
+
+    def add_server(self):
+        name, ok = QInputDialog.getText(self, "Adicionar Servidor", "Nome do servidor:")
+        if not ok or not name.strip():
+            return
+        address, ok = QInputDialog.getText(self, "Adicionar Servidor", "Endereço (host[:porta]):")
+        if not ok or not address.strip():
+            return
+        try:
+            self.server_list.add(name.strip(), address.strip())
+        except ValueError as e:
+            QMessageBox.critical(self, "Erro", str(e))
+            return
+        self.reload_table()
+        self.refresh()
+
+    def remove_server(self):
+        address = self.selected_address()
+        if address is not None:
+            self.server_list.remove(address)
+            self.reload_table()
+
+    def connect_selected(self):
+        address = self.selected_address()
+        if address is None:
+            self.status_label.setText("Selecione um servidor.")
+            return
+        self.connect_to(address)
+
+    def connect_direct(self):
+        from server_status import parse_address
+        address = self.direct_input.text().strip()
+        try:
+            parse_address(address)
+        except ValueError as e:
+            self.status_label.setText(str(e))
+            return
+        self.connect_to(address)
+
+    def connect_to(self, address):
+        """Abre o jogo com o perfil atual entrando direto no servidor."""
+        if self.launcher.start_game_launch(server_address=address):
+            self.close()
+
+
 # Widget para a animação de partículas
 class ParticleWidget(QWidget):
-    def __init__(self, parent=None):
+    """
+    Partículas de fundo guardadas em arrays NumPy e atualizadas em um único passo vetorizado.
+    Cada partícula é um recorte de um atlas de sprites pré-renderizado, desenhado em lote
+    com drawPixmapFragments. A animação para sozinha quando o widget está oculto, a janela
+    está minimizada/coberta ou o jogo está em primeiro plano.
+    """
+    frame_stats = pyqtSignal(float, float) # (ms médios de atualização, ms médios de desenho), a cada segundo; ver --profile-frames
+
+    PALETTE_SIZE = 8
+    SIZES = (2, 3, 4, 5)
+    CELL = 6 # Tamanho de cada célula do atlas (maior sprite + 1 px)
+
+    def __init__(self, parent=None, num_particles=50, interval_ms=30):
         super().__init__(parent)
-        self.particles = []
-        self.num_particles = 50
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.num_particles = num_particles
+        self.rng = np.random.default_rng()
+        self.game_running = False
+        self.update_ms = 0.0
+        self.paint_ms = 0.0
+        self._stats_frames = 0
+        self._stats_update = 0.0
+        self._stats_paint = 0.0
+        self._stats_started = time.perf_counter()
+        self.atlas = self._build_atlas()
+        self._allocate(num_particles)
+
         self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms) # Atualiza a cada 30 ms
         self.timer.timeout.connect(self.update_particles)
-        self.timer.start(30) # Atualiza a cada 30 ms
-
-    def add_particle(self):
-        size = random.randint(2, 5)
-        x = random.randint(0, self.width())
-        y = random.randint(0, self.height())
-        speed_x = random.uniform(-0.5, 0.5)
-        speed_y = random.uniform(-0.5, 0.5)
-        alpha = random.randint(100, 200) # Transparência inicial
-        color = QColor(random.randint(100, 200), random.randint(100, 200), random.randint(200, 255), alpha) # Tons de azul/verde
-        self.particles.append({'x': x, 'y': y, 'size': size, 'speed_x': speed_x, 'speed_y': speed_y, 'color': color, 'alpha': alpha}) # Adiciona 'alpha' ao dicionário
+        QApplication.instance().applicationStateChanged.connect(self._refresh_running)
+
+    def _build_atlas(self):
+        """Pré-renderiza um círculo para cada combinação de cor (tons de azul/verde) e tamanho."""
+        colors = [QColor(random.randint(100, 200), random.randint(100, 200), random.randint(200, 255))
+                  for _ in range(self.PALETTE_SIZE)]
+        atlas = QPixmap(self.CELL * len(self.SIZES), self.CELL * self.PALETTE_SIZE)
+        atlas.fill(Qt.transparent)
+        painter = QPainter(atlas)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        for row, color in enumerate(colors):
+            painter.setBrush(QBrush(color))
+            for column, size in enumerate(self.SIZES):
+                painter.drawEllipse(column * self.CELL, row * self.CELL, size, size)
+        painter.end()
+        return atlas
+
+    def _allocate(self, count):
+        self.pos = np.zeros((count, 2), dtype=np.float32)
+        self.vel = np.zeros((count, 2), dtype=np.float32)
+        self.alpha = np.zeros(count, dtype=np.float32)
+        self.sprite = np.zeros((count, 2), dtype=np.int32) # (coluna do tamanho, linha da cor)
+        self.fragments = [QPainter.PixmapFragment.create(QPointF(), QRectF()) for _ in range(count)]
+        self._respawn(np.ones(count, dtype=bool))
+
+    def set_particle_count(self, count):
+        """Altera a quantidade de partículas."""
+        self.num_particles = max(0, int(count))
+        self._allocate(self.num_particles)
+        self.update()
+
+    def _respawn(self, mask):
+        count = int(mask.sum())
+        if count == 0:
+            return
+        width, height = max(1, self.width()), max(1, self.height())
+        self.pos[mask] = self.rng.uniform((0, 0), (width, height), size=(count, 2))
+        self.vel[mask] = self.rng.uniform(-0.5, 0.5, size=(count, 2))
+        self.alpha[mask] = self.rng.integers(100, 201, size=count) # Transparência inicial
+        self.sprite[mask, 0] = self.rng.integers(0, len(self.SIZES), size=count)
+        self.sprite[mask, 1] = self.rng.integers(0, self.PALETTE_SIZE, size=count)
+        for i in np.flatnonzero(mask).tolist():
+            column, row = self.sprite[i].tolist()
+            size = self.SIZES[column]
+            fragment = self.fragments[i]
+            fragment.sourceLeft = column * self.CELL
+            fragment.sourceTop = row * self.CELL
+            fragment.width = fragment.height = size
+
+    def set_game_running(self, running):
+        """Informa se o jogo está aberto (a animação para enquanto o jogo estiver em primeiro plano)."""
+        self.game_running = running
+        self._refresh_running()
+
+    def _should_animate(self):
+        if not self.isVisible() or self.num_particles == 0:
+            return False
+        window = self.window()
+        if window.isMinimized():
+            return False
+        handle = window.windowHandle()
+        if handle is not None and not handle.isExposed():
+            return False
+        if self.game_running and QApplication.applicationState() != Qt.ApplicationActive:
+            return False
+        return True
+
+    def _refresh_running(self, *_args):
+        if self._should_animate():
+            if not self.timer.isActive():
+                self.timer.start()
+        elif self.timer.isActive():
+            self.timer.stop()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._refresh_running()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
 
     def update_particles(self):
-        for p in self.particles:
-            p['x'] += p['speed_x']
-            p['y'] += p['speed_y']
-            p['alpha'] -= 1 # Fading out
-
-            # Reinicia a partícula se sair da tela ou desaparecer
-            if not (0 <= p['x'] <= self.width() and 0 <= p['y'] <= self.height()) or p['alpha'] <= 0:
-                # Reinicia as propriedades da partícula em vez de removê-la
-                p['x'] = random.randint(0, self.width())
-                p['y'] = random.randint(0, self.height())
-                p['speed_x'] = random.uniform(-0.5, 0.5)
-                p['speed_y'] = random.uniform(-0.5, 0.5)
-                p['alpha'] = random.randint(100, 200)
-                p['size'] = random.randint(2, 5)
-                p['color'] = QColor(random.randint(100, 200), random.randint(100, 200), random.randint(200, 255), p['alpha'])
-
-
-        # Garante que sempre haja o número desejado de partículas
-        while len(self.particles) < self.num_particles:
-            self.add_particle()
-
+        if not self._should_animate():
+            self.timer.stop()
+            return
+        started = time.perf_counter()
+        self.pos += self.vel
+        self.alpha -= 1 # Fading out
+
+        # Reinicia as partículas que saíram da tela ou desapareceram
+        width, height = self.width(), self.height()
+        x, y = self.pos[:, 0], self.pos[:, 1]
+        dead = (x < 0) | (x > width) | (y < 0) | (y > height) | (self.alpha <= 0)
+        self._respawn(dead)
+        self.update_ms = (time.perf_counter() - started) * 1000
         self.update() # Redesenha o widget
 
     def paintEvent(self, event):
+        if not self.timer.isActive():
+            # Janela voltou a ficar visível (ex.: deixou de estar coberta): retoma a animação
+            self._refresh_running()
+        started = time.perf_counter()
+        xs = self.pos[:, 0].tolist()
+        ys = self.pos[:, 1].tolist()
+        opacities = (np.clip(self.alpha, 0, 255) / 255.0).tolist()
+        for fragment, x, y, opacity in zip(self.fragments, xs, ys, opacities):
+            fragment.x = x
+            fragment.y = y
+            fragment.opacity = opacity
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        painter.drawPixmapFragments(self.fragments, self.atlas)
+        painter.end()
+        self.paint_ms = (time.perf_counter() - started) * 1000
+        self._record_frame()
+
+    def _record_frame(self):
+        self._stats_frames += 1
+        self._stats_update += self.update_ms
+        self._stats_paint += self.paint_ms
+        now = time.perf_counter()
+        if now - self._stats_started >= 1.0:
+            self.frame_stats.emit(self._stats_update / self._stats_frames, self._stats_paint / self._stats_frames)
+            self._stats_frames = 0
+            self._stats_update = self._stats_paint = 0.0
+            self._stats_started = now
+
+
+# Gráfico de memória do jogo em execução (amostras do ResourceMonitor)
+class ResourceChartWidget(QWidget):
+    """
+    Desenha a memória do processo (RSS) e o heap ocupado após cada GC dos últimos minutos.
+    Só lê o buffer do monitor quando refresh() é chamado (a cada 2 s enquanto há jogo aberto).
+    """
+    WINDOW_SECONDS = 300
 
-        for p in self.particles:
-            color = p['color']
-            # Garante que o valor de alpha seja válido (entre 0 e 255)
-            current_alpha = max(0, min(255, p['alpha']))
-            color.setAlpha(current_alpha)
-            painter.setBrush(QBrush(color))
-            painter.setPen(Qt.NoPen)
-            painter.drawEllipse(int(p['x']), int(p['y']), p['size'], p['size'])
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(110)
+        self.samples = None
+        self.caption = ""
+
+    def refresh(self, monitor):
+        if monitor is None:
+            self.samples = None
+            self.caption = ""
+        else:
+            samples = monitor.buffer.samples()
+            self.samples = samples[samples["time"] >= samples["time"][-1] - self.WINDOW_SECONDS] if len(samples) else None
+            if self.samples is not None:
+                last = self.samples[-1]
+                heap = "" if np.isnan(last["heap_used_mb"]) else f" · heap {last['heap_used_mb']:.0f} MB"
+                threads = f" · {last['threads']} threads" if last["threads"] else ""
+                self.caption = f"RSS {last['rss_mb']:.0f} MB{heap} · CPU {last['cpu']:.0f}%{threads}"
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, 90))
+        if self.samples is None or len(self.samples) < 2:
+            painter.setPen(QColor("#a0a0a0"))
+            painter.drawText(self.rect(), Qt.AlignCenter, "Sem dados de memória")
+            return
+        chart = QRectF(self.rect()).adjusted(4, 4, -4, -22)
+        times = self.samples["time"]
+        rss = self.samples["rss_mb"]
+        heap = self.samples["heap_used_mb"]
+        top = max(float(np.nanmax(np.concatenate((rss, heap)))), 1.0) * 1.1
+        span = max(float(times[-1] - times[0]), 1.0)
+
+        def line(values, color):
+            points = [QPointF(chart.left() + (t - times[0]) / span * chart.width(),
+                              chart.bottom() - v / top * chart.height())
+                      for t, v in zip(times.tolist(), values.tolist()) if v == v] # v == v descarta NaN
+            if len(points) > 1:
+                painter.setPen(QPen(color, 1.5))
+                painter.drawPolyline(QPolygonF(points))
+
+        line(rss, QColor("#4CAF50"))
+        line(heap, QColor("#FF9800"))
+        painter.setPen(QColor("#e0e0e0"))
+        painter.drawText(QRectF(4, chart.bottom() + 2, self.width() - 8, 18), Qt.AlignLeft | Qt.AlignVCenter, self.caption)
 
 
 class MinecraftOfflineLauncher(QMainWindow):
-    CONFIG_FILE = "launcher_settings.ini" # Nome do arquivo de configuração
+    SETTINGS_SAVE_DELAY = 0.5 # Segundos sem mudanças antes de gravar configurações e perfis
 
     def __init__(self):
         super().__init__()
@@ -191,9 +927,27 @@ class MinecraftOfflineLauncher(QMainWindow):
         self.setFixedSize(1280, 720) # Define o tamanho fixo da janela
 
         # Definir diretório do jogo e versão
-        self.game_directory = r"C:\Users\Gu\Desktop\GRcraft" # Altere para o seu diretório
-        self.version = "1.8.8-forge1.8.8-11.15.0.1655" # Altere para a sua versão
+        self.game_directory = default_game_directory() # Defina GRCRAFT_GAME_DIR para usar outra pasta
+        self.version = DEFAULT_VERSION # Altere para a sua versão
         self.ram_allocation = 2 # RAM padrão em GB (será sobrescrito se houver configurações salvas)
+        self.jvm_profile = DEFAULT_PROFILE # Perfil de desempenho da JVM
+        self.saved_nickname = "" # Nickname salvo, aplicado quando a página do launcher for criada
+        self.skin_path = "" # Skin PNG escolhida (a miniatura vem do cache do skin_assets.py)
+        self.launcher_page_built = False
+        self.installer_thread = None
+        self._reinstall_pending = False # Perfil trocado durante uma instalação
+        self.launcher_threads = set() # Threads de lançamento com jogo em preparação ou aberto
+        self.supervisor = GameSupervisor()
+        self.log_viewer = None
+        self.server_browser = None
+        self.launch_template = None # Preparação adiantada do lançamento (LaunchTemplateThread)
+        self.template_thread = None
+        self.template_timer = QTimer(self) # Espera as configurações pararem de mudar antes de preparar
+        self.template_timer.setSingleShot(True)
+        self.template_timer.setInterval(400)
+        self.template_timer.timeout.connect(self.start_template_preparation)
+        self.startup_profiler = None
+        self._first_paint_done = False
 
         # Inicializar QStackedWidget
         self.stacked_widget = QStackedWidget()
@@ -204,63 +958,170 @@ class MinecraftOfflineLauncher(QMainWindow):
         self.particle_widget.setGeometry(self.rect())
         self.particle_widget.lower() # Envia para o fundo
 
-        # Criar as páginas do menu e do launcher
+        # Criar apenas a página do menu; a página do launcher (e a barra lateral de configurações)
+        # só é construída quando o usuário clica em "Iniciar GRcraft"
         self.create_menu_page()
-        self.create_launcher_page() # Este método agora cria a página principal do launcher E a barra lateral de configurações
 
         # Aplicar tema escuro e imagem de fundo (aplicado à QMainWindow)
         self.apply_dark_theme()
 
-        # Carregar configurações salvas
+        # Carregar configurações salvas (settings.json na pasta de configuração do usuário)
+        self.settings = SettingsStore(delay=self.SETTINGS_SAVE_DELAY)
         self.load_settings()
 
-        # Iniciar a instalação das bibliotecas apenas quando o launcher for exibido
+        # Perfis de instância (versão, pasta do jogo, RAM e JVM); na primeira execução o perfil
+        # padrão herda a RAM e o perfil de JVM das configurações
+        self.profiles = ProfileStore(default_ram_gb=self.ram_allocation, default_jvm_profile=self.jvm_profile,
+                                     delay=self.SETTINGS_SAVE_DELAY)
+        self.apply_profile(self.profiles.selected)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_paint_done:
+            self._first_paint_done = True
+            if self.startup_profiler is not None:
+                self.startup_profiler.mark("Primeira pintura")
+                print(self.startup_profiler.report(), file=sys.stderr)
+
+    def ensure_launcher_page(self):
+        """Cria a página do launcher na primeira vez em que é necessária."""
+        if self.launcher_page_built:
+            return
+        self.launcher_page_built = True
+        self.create_launcher_page() # Este método cria a página principal do launcher E a barra lateral de configurações
+        self.apply_settings_to_widgets()
+
+    def start_installer(self):
+        """Instala/verifica as bibliotecas do perfil atual (uma instalação por vez)."""
+        if self.is_installing():
+            self._reinstall_pending = True # Refeita para o novo perfil quando a atual terminar
+            return
+        self.launch_button.setEnabled(False)
         self.installer_thread = LibraryInstallerThread(self.version, self.game_directory)
         self.installer_thread.installation_finished.connect(self.on_libraries_installed)
         self.installer_thread.status_message.connect(self.update_status_bar) # Conecta ao novo slot
-        
-        # Thread do GameLauncher
-        self.launcher_thread = GameLauncherThread(self.version, self.game_directory, "", self.ram_allocation)
-        self.launcher_thread.launch_finished.connect(self.on_game_launched)
-        self.launcher_thread.status_message.connect(self.update_status_bar) # Conecta ao novo slot
+        self.installer_thread.install_progress.connect(self.on_install_progress)
+        self.installer_thread.trace_event.connect(self.on_trace_event)
+        self.installer_thread.start()
+
+    def is_installing(self):
+        return self.installer_thread is not None and self.installer_thread.isRunning()
 
     def closeEvent(self, event):
         """Sobrescreve o evento de fechamento da janela para salvar as configurações."""
         self.save_settings()
+        self.settings.set(window_geometry=bytes(self.saveGeometry().toBase64()).decode("ascii"))
+        # O que ainda estava esperando a pausa é gravado agora, antes de a janela fechar.
+        # Uma falha de gravação (disco cheio, pasta sem permissão) não pode impedir o fechamento
+        for name, store in (("configurações", self.settings), ("perfis", self.profiles)):
+            try:
+                store.flush()
+            except OSError as e:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] Erro ao salvar {name} em {store.path}: {e}",
+                      file=sys.stderr)
         event.accept()
 
     def load_settings(self):
-        """Carrega as configurações salvas do arquivo INI."""
-        config = configparser.ConfigParser()
-        if os.path.exists(self.CONFIG_FILE):
-            config.read(self.CONFIG_FILE)
-            if 'LauncherSettings' in config:
-                settings = config['LauncherSettings']
-                last_nickname = settings.get('last_nickname', '')
-                last_ram = settings.getint('last_ram_gb', self.ram_allocation)
-
-                self.nickname_input.setText(last_nickname)
-                self.ram_allocation = last_ram
-                self.ram_slider.setValue(last_ram)
-                self.update_status_bar("Configurações carregadas.")
-            else:
-                self.update_status_bar("Arquivo de configurações encontrado, mas sem seção 'LauncherSettings'. Usando padrões.")
+        """Carrega as configurações salvas (ou importadas do launcher_settings.ini antigo)."""
+        self.saved_nickname = self.settings.get("nickname")
+        self.ram_allocation = self.settings.get("ram_gb")
+        self.jvm_profile = self.settings.get("jvm_profile")
+        self.skin_path = self.settings.get("skin_path")
+        self.particle_widget.set_particle_count(self.settings.get("particle_count"))
+        geometry = self.settings.get("window_geometry")
+        if geometry:
+            self.restoreGeometry(QByteArray.fromBase64(geometry.encode("ascii")))
+        if self.settings.migrated_from:
+            self.update_status_bar(f"Configurações importadas de {self.settings.migrated_from}.")
+        elif self.settings.exists():
+            self.update_status_bar("Configurações carregadas.")
         else:
             self.update_status_bar("Arquivo de configurações não encontrado. Usando configurações padrão.")
 
+    def apply_settings_to_widgets(self):
+        """Mostra as configurações carregadas nos widgets da página do launcher."""
+        self.nickname_input.setText(self.saved_nickname)
+        self.apply_profile_to_widgets()
+        self.update_skin_thumbnail()
+
+    def apply_profile(self, profile):
+        """Passa a usar a versão, a pasta do jogo, a RAM e a JVM de um perfil."""
+        self.version = profile.version
+        self.game_directory = profile.game_directory
+        self.ram_allocation = profile.ram_gb
+        self.jvm_profile = profile.jvm_profile
+        self.extra_jvm_arguments = list(profile.extra_jvm_arguments)
+        self.backup_worlds = profile.backup_worlds
+        self.backup_interval_hours = profile.backup_interval_hours
+
+    def apply_profile_to_widgets(self):
+        """Mostra o perfil selecionado na barra lateral."""
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.clear()
+        self.profile_combo.addItems(self.profiles.names())
+        self.profile_combo.setCurrentIndex(self.profiles.names().index(self.profiles.selected_name))
+        self.profile_combo.blockSignals(False)
+        self.profile_directory_label.setText(f"{self.version}\n{self.game_directory}")
+        self.delete_profile_button.setEnabled(len(self.profiles.names()) > 1)
+        self.ram_slider.setValue(self.ram_allocation)
+        self.jvm_profile_combo.setCurrentIndex(list(JVM_PROFILES).index(self.jvm_profile))
+        self.extra_jvm_input.setText(" ".join(shlex.quote(argument) for argument in self.extra_jvm_arguments))
+        self.backup_checkbox.blockSignals(True)
+        self.backup_checkbox.setChecked(self.backup_worlds)
+        self.backup_checkbox.blockSignals(False)
+        self.select_backup_interval()
+
     def save_settings(self):
-        """Salva as configurações atuais no arquivo INI."""
-        config = configparser.ConfigParser()
-        config['LauncherSettings'] = {
-            'last_nickname': self.nickname_input.text(),
-            'last_ram_gb': str(self.ram_allocation)
-        }
-        try:
-            with open(self.CONFIG_FILE, 'w') as configfile:
-                config.write(configfile)
-            self.update_status_bar("Configurações salvas!")
-        except Exception as e:
-            self.update_status_bar(f"Erro ao salvar configurações: {str(e)}")
+        """
+        Guarda as configurações atuais e as do perfil selecionado. Só atualiza a memória: a
+        gravação em disco acontece numa thread, depois de uma pausa sem mudanças (settings_store.py).
+        """
+        if self.launcher_page_built:
+            self.saved_nickname = self.nickname_input.text()
+        profile = self.profiles.selected
+        profile.ram_gb = self.ram_allocation
+        profile.jvm_profile = self.jvm_profile
+        profile.extra_jvm_arguments = list(self.extra_jvm_arguments)
+        profile.backup_worlds = self.backup_worlds
+        profile.backup_interval_hours = self.backup_interval_hours
+        self.settings.set(nickname=self.saved_nickname, ram_gb=self.ram_allocation, jvm_profile=self.jvm_profile,
+                          skin_path=self.skin_path)
+        self.profiles.save()
+        self.schedule_template_preparation()
+
+    def current_template_key(self):
+        from launch_pipeline import LaunchTemplate
+        from resource_monitor import gc_log_template
+        return LaunchTemplate.make_key(self.version, self.game_directory, self.ram_allocation, self.jvm_profile,
+                                       self.extra_jvm_arguments, gc_log_template(self.game_directory))
+
+    def schedule_template_preparation(self, force=False):
+        """Descarta a preparação adiantada se as configurações mudaram e agenda uma nova."""
+        if not self.launcher_page_built:
+            return
+        if not force and self.launch_template is not None and self.launch_template.key == self.current_template_key():
+            return
+        self.launch_template = None
+        self.template_timer.start()
+
+    def start_template_preparation(self):
+        if self.is_installing():
+            return # on_libraries_installed agenda de novo quando a instalação terminar
+        if self.template_thread is not None and self.template_thread.isRunning():
+            self.template_timer.start() # Tenta de novo quando a preparação atual terminar
+            return
+        self.template_thread = LaunchTemplateThread(self.version, self.game_directory, self.ram_allocation,
+                                                    self.jvm_profile, self.extra_jvm_arguments)
+        self.template_thread.template_ready.connect(self.on_template_ready)
+        self.template_thread.start()
+
+    def on_template_ready(self, template, error_message):
+        if template is None:
+            self.launch_template = None # O erro aparece (com o status detalhado) ao clicar em "Iniciar"
+        elif template.key == self.current_template_key():
+            self.launch_template = template
+        else:
+            self.schedule_template_preparation() # As configurações mudaram durante a preparação
 
 
     def create_menu_page(self):
@@ -301,6 +1162,16 @@ class MinecraftOfflineLauncher(QMainWindow):
         self.mods_button.clicked.connect(self.open_mods_folder)
         top_bar_layout.addWidget(self.mods_button)
 
+        self.logs_button = QPushButton("Ver Logs")
+        self.logs_button.setObjectName("modsButton")
+        self.logs_button.clicked.connect(self.open_log_viewer)
+        top_bar_layout.addWidget(self.logs_button)
+
+        self.servers_button = QPushButton("Servidores")
+        self.servers_button.setObjectName("modsButton")
+        self.servers_button.clicked.connect(self.open_server_browser)
+        top_bar_layout.addWidget(self.servers_button)
+
         self.settings_button = QPushButton("⚙️") # Ícone de engrenagem Unicode
         self.settings_button.setObjectName("settingsButton")
         self.settings_button.setFixedSize(40, 40) # Tamanho fixo para o botão de ícone
@@ -335,7 +1206,7 @@ class MinecraftOfflineLauncher(QMainWindow):
         # Botão de Lançamento
         self.launch_button = QPushButton("Iniciar Minecraft (Offline)")
         self.launch_button.setObjectName("launchButton")
-        self.launch_button.clicked.connect(self.start_game_launch)
+        self.launch_button.clicked.connect(lambda: self.start_game_launch())
         control_layout.addWidget(self.launch_button)
 
         main_content_v_layout.addWidget(control_frame)
@@ -360,7 +1231,20 @@ class MinecraftOfflineLauncher(QMainWindow):
         self.settings_sidebar.setFixedWidth(0) # Inicialmente oculto/colapsado
         self.settings_sidebar.setVisible(False) # Garante que não esteja visível inicialmente
 
-        self.settings_sidebar_layout = QVBoxLayout(self.settings_sidebar)
+        # O conteúdo fica em uma área com rolagem: perfis, JVM e o gráfico de memória não cabem nos 720 px
+        sidebar_outer_layout = QVBoxLayout(self.settings_sidebar)
+        sidebar_outer_layout.setContentsMargins(0, 0, 0, 0)
+        sidebar_scroll = QScrollArea()
+        sidebar_scroll.setObjectName("settingsScroll")
+        sidebar_scroll.setWidgetResizable(True)
+        sidebar_scroll.setFrameShape(QFrame.NoFrame)
+        sidebar_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        sidebar_content = QWidget()
+        sidebar_content.setObjectName("settingsSidebarContent")
+        sidebar_scroll.setWidget(sidebar_content)
+        sidebar_outer_layout.addWidget(sidebar_scroll)
+
+        self.settings_sidebar_layout = QVBoxLayout(sidebar_content)
         self.settings_sidebar_layout.setContentsMargins(15, 15, 15, 15) # Margens internas para a sidebar
         self.settings_sidebar_layout.setSpacing(10)
         self.settings_sidebar_layout.setAlignment(Qt.AlignTop)
@@ -380,6 +1264,43 @@ class MinecraftOfflineLauncher(QMainWindow):
         settings_title_label.setObjectName("settingsTitleLabel")
         self.settings_sidebar_layout.addWidget(settings_title_label)
 
+        # Skin: miniatura da frente, desenhada uma vez e guardada no cache pelo hash do arquivo
+        skin_layout = QHBoxLayout()
+        self.skin_thumbnail_label = QLabel()
+        self.skin_thumbnail_label.setFixedSize(32, 64)
+        skin_layout.addWidget(self.skin_thumbnail_label)
+        skin_button = QPushButton("Escolher Skin")
+        skin_button.setObjectName("modsButton")
+        skin_button.clicked.connect(self.choose_skin)
+        skin_layout.addWidget(skin_button, 1)
+        self.settings_sidebar_layout.addLayout(skin_layout)
+
+        # Perfil da instância (cada perfil tem a sua versão, pasta do jogo, RAM e JVM)
+        profile_label = QLabel("Perfil:")
+        profile_label.setObjectName("inputLabel")
+        self.settings_sidebar_layout.addWidget(profile_label)
+
+        self.profile_combo = QComboBox()
+        self.profile_combo.setObjectName("jvmProfileCombo")
+        self.profile_combo.currentIndexChanged.connect(self.on_profile_selected)
+        self.settings_sidebar_layout.addWidget(self.profile_combo)
+
+        self.profile_directory_label = QLabel()
+        self.profile_directory_label.setObjectName("ramValueLabel")
+        self.profile_directory_label.setWordWrap(True)
+        self.settings_sidebar_layout.addWidget(self.profile_directory_label)
+
+        profile_buttons_layout = QHBoxLayout()
+        new_profile_button = QPushButton("Novo Perfil")
+        new_profile_button.setObjectName("modsButton")
+        new_profile_button.clicked.connect(self.create_profile)
+        profile_buttons_layout.addWidget(new_profile_button)
+        self.delete_profile_button = QPushButton("Excluir")
+        self.delete_profile_button.setObjectName("modsButton")
+        self.delete_profile_button.clicked.connect(self.delete_profile)
+        profile_buttons_layout.addWidget(self.delete_profile_button)
+        self.settings_sidebar_layout.addLayout(profile_buttons_layout)
+
         # Configuração de RAM (movida para cá)
         ram_label = QLabel("Alocação de RAM:")
         ram_label.setObjectName("inputLabel")
@@ -398,6 +1319,95 @@ class MinecraftOfflineLauncher(QMainWindow):
         self.ram_value_label.setObjectName("ramValueLabel")
         self.settings_sidebar_layout.addWidget(self.ram_value_label)
 
+        # Perfil de desempenho da JVM (GC, heap e threads calculados para esta máquina)
+        jvm_profile_label = QLabel("Perfil da JVM:")
+        jvm_profile_label.setObjectName("inputLabel")
+        self.settings_sidebar_layout.addWidget(jvm_profile_label)
+
+        self.jvm_profile_combo = QComboBox()
+        self.jvm_profile_combo.setObjectName("jvmProfileCombo")
+        for profile_key, profile_name in JVM_PROFILES.items():
+            self.jvm_profile_combo.addItem(profile_name, profile_key)
+        self.jvm_profile_combo.setCurrentIndex(list(JVM_PROFILES).index(self.jvm_profile))
+        self.jvm_profile_combo.currentIndexChanged.connect(self.update_jvm_profile)
+        self.settings_sidebar_layout.addWidget(self.jvm_profile_combo)
+
+        extra_jvm_label = QLabel("Argumentos extras da JVM:")
+        extra_jvm_label.setObjectName("inputLabel")
+        self.settings_sidebar_layout.addWidget(extra_jvm_label)
+
+        self.extra_jvm_input = QLineEdit()
+        self.extra_jvm_input.setObjectName("nicknameInput")
+        self.extra_jvm_input.setPlaceholderText("Ex.: -Dfml.ignorePatchDiscrepancies=true")
+        self.extra_jvm_input.editingFinished.connect(self.update_extra_jvm_arguments)
+        self.settings_sidebar_layout.addWidget(self.extra_jvm_input)
+
+        # Backup incremental de saves/ antes de cada lançamento (world_backup.py)
+        self.backup_checkbox = QCheckBox("Backup dos mundos antes de jogar")
+        self.backup_checkbox.setObjectName("inputLabel")
+        self.backup_checkbox.setChecked(self.backup_worlds)
+        self.backup_checkbox.toggled.connect(self.update_backup_worlds)
+        self.settings_sidebar_layout.addWidget(self.backup_checkbox)
+
+        # Intervalo mínimo entre backups: com vários lançamentos seguidos, só o primeiro faz backup
+        self.backup_interval_combo = QComboBox()
+        self.backup_interval_combo.setObjectName("jvmProfileCombo")
+        for hours, label in BACKUP_INTERVALS:
+            self.backup_interval_combo.addItem(label, hours)
+        self.select_backup_interval()
+        self.backup_interval_combo.currentIndexChanged.connect(self.update_backup_interval)
+        self.settings_sidebar_layout.addWidget(self.backup_interval_combo)
+
+        # Quantidade de partículas da animação de fundo (salva em settings.json)
+        particles_label = QLabel("Animação de fundo:")
+        particles_label.setObjectName("inputLabel")
+        self.settings_sidebar_layout.addWidget(particles_label)
+
+        self.particles_combo = QComboBox()
+        self.particles_combo.setObjectName("jvmProfileCombo")
+        for count, label in PARTICLE_LEVELS:
+            self.particles_combo.addItem(label, count)
+        index = self.particles_combo.findData(self.particle_widget.num_particles)
+        if index < 0:
+            # Valor editado à mão no settings.json: aparece como item próprio
+            self.particles_combo.addItem(f"{self.particle_widget.num_particles} partículas",
+                                         self.particle_widget.num_particles)
+            index = self.particles_combo.count() - 1
+        self.particles_combo.setCurrentIndex(index)
+        self.particles_combo.currentIndexChanged.connect(self.update_particle_count)
+        self.settings_sidebar_layout.addWidget(self.particles_combo)
+
+        # Verificação de integridade (SHA-1 de bibliotecas e assets)
+        self.verify_button = QPushButton("Verificar Arquivos do Jogo")
+        self.verify_button.setObjectName("modsButton")
+        self.verify_button.clicked.connect(self.start_integrity_check)
+        self.settings_sidebar_layout.addWidget(self.verify_button)
+
+        # Otimização de inicialização (AppCDS)
+        self.optimize_button = QPushButton("Otimizar Inicialização")
+        self.optimize_button.setObjectName("modsButton")
+        self.optimize_button.clicked.connect(self.start_startup_optimization)
+        self.settings_sidebar_layout.addWidget(self.optimize_button)
+
+        # Jogos abertos pelo launcher (podem ser vários ao mesmo tempo, de perfis diferentes)
+        self.running_games_label = QLabel("Nenhum jogo em execução")
+        self.running_games_label.setObjectName("ramValueLabel")
+        self.running_games_label.setWordWrap(True)
+        self.settings_sidebar_layout.addWidget(self.running_games_label)
+
+        self.resource_chart = ResourceChartWidget()
+        self.resource_chart.setVisible(False)
+        self.settings_sidebar_layout.addWidget(self.resource_chart)
+        self.resource_timer = QTimer(self)
+        self.resource_timer.setInterval(2000)
+        self.resource_timer.timeout.connect(self.refresh_resource_chart)
+
+        self.stop_games_button = QPushButton("Fechar Todos os Jogos")
+        self.stop_games_button.setObjectName("modsButton")
+        self.stop_games_button.setEnabled(False)
+        self.stop_games_button.clicked.connect(self.stop_all_games)
+        self.settings_sidebar_layout.addWidget(self.stop_games_button)
+
         self.settings_sidebar_layout.addStretch() # Empurra o conteúdo para o topo
 
         # Adiciona a barra lateral de configurações ao QHBoxLayout principal
@@ -407,13 +1417,14 @@ class MinecraftOfflineLauncher(QMainWindow):
         self.stacked_widget.addWidget(launcher_widget)
 
     def show_launcher_page(self):
+        self.ensure_launcher_page()
         self.stacked_widget.setCurrentIndex(1) # Muda para a página do launcher
         # Inicia a instalação das bibliotecas apenas quando o launcher é exibido
-        self.installer_thread.start()
+        self.start_installer()
 
     def toggle_settings_sidebar(self):
         # Define a largura desejada da barra lateral quando expandida
-        sidebar_width = 300
+        sidebar_width = 400 # Cabe o texto dos botões e a barra de rolagem
 
         # Animação para expandir/colapsar a barra lateral
         self.animation = QPropertyAnimation(self.settings_sidebar, b"minimumWidth")
@@ -433,26 +1444,22 @@ class MinecraftOfflineLauncher(QMainWindow):
 
 
     def apply_dark_theme(self):
-        # Carregar imagem de fundo
-        try:
-            # Substitua 'Image_fx.jpg' pelo caminho real da sua imagem
-            # Certifique-se de que a imagem está no mesmo diretório do script ou forneça o caminho completo
-            background_image_path = "Image_fx.jpg" # Caminho para a imagem de fundo
-            pixmap = QPixmap(background_image_path)
-            if pixmap.isNull():
-                self.update_status_bar(f"Aviso: Não foi possível carregar a imagem de fundo: {background_image_path}. Usando cor sólida.")
-                background_style = "background-color: #2e2e2e;"
-            else:
-                # Redimensionar a imagem para caber na janela
-                scaled_pixmap = pixmap.scaled(self.size(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
-                palette = self.palette()
-                palette.setBrush(QPalette.Window, QBrush(scaled_pixmap))
-                self.setPalette(palette)
-                background_style = "" # A imagem de fundo é definida pela paleta
-        except Exception as e:
-            self.update_status_bar(f"Erro ao carregar imagem de fundo: {str(e)}. Usando cor sólida.")
-            background_style = "background-color: #2e2e2e;"
-
+        # Cor sólida até a imagem de fundo terminar de carregar (o fundo é definido pela paleta)
+        palette = self.palette()
+        palette.setColor(QPalette.Window, QColor("#2e2e2e"))
+        self.setPalette(palette)
+        background_style = ""
+
+        # Carregar imagem de fundo em outra thread: decodificar e redimensionar o JPEG é lento
+        # Substitua 'Image_fx.jpg' pelo caminho real da sua imagem
+        # Certifique-se de que a imagem está no mesmo diretório do script ou forneça o caminho completo
+        background_image_path = "Image_fx.jpg" # Caminho para a imagem de fundo
+        self.background_loader = BackgroundImageLoader(background_image_path, self.size())
+        self.background_loader.image_loaded.connect(self.on_background_loaded)
+        self.background_loader.load_failed.connect(
+            lambda path: self.update_status_bar(f"Aviso: Não foi possível carregar a imagem de fundo: {path}. Usando cor sólida.")
+        )
+        self.background_loader.start()
 
         # Estilos CSS para um tema escuro e moderno
         self.setStyleSheet(f"""
@@ -511,6 +1518,10 @@ class MinecraftOfflineLauncher(QMainWindow):
                 padding: 15px;
             }}
 
+            #settingsScroll, #settingsScroll > QWidget, #settingsSidebarContent {{
+                background: transparent;
+            }}
+
             #closeSettingsButton {{
                 background-color: #FF5733; /* Vermelho para o botão de fechar */
                 color: white;
@@ -564,6 +1575,15 @@ class MinecraftOfflineLauncher(QMainWindow):
                 border: 1px solid #4CAF50; /* Borda verde ao focar */
             }}
 
+            #jvmProfileCombo {{
+                background-color: #4a4a4a;
+                border: 1px solid #666666;
+                border-radius: 5px;
+                padding: 6px;
+                color: #ffffff;
+                font-size: 14px;
+            }}
+
             #ramValueLabel {{
                 color: #e0e0e0;
                 font-size: 15px;
@@ -648,30 +1668,111 @@ class MinecraftOfflineLauncher(QMainWindow):
             }}
         """)
 
+    def on_background_loaded(self, image):
+        """Aplica a imagem de fundo já redimensionada (conversão para QPixmap na thread da interface)."""
+        palette = self.palette()
+        palette.setBrush(QPalette.Window, QBrush(QPixmap.fromImage(image)))
+        self.setPalette(palette)
+
     def update_status_bar(self, message):
         """Atualiza o texto da barra de progresso."""
         if hasattr(self, 'progress_bar') and self.progress_bar is not None:
+            # Só o texto: o modo e o valor da barra vêm das etapas (on_trace_event)
             self.progress_bar.setFormat(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
-            # Se a mensagem indica um processo ativo, coloque a barra em modo indeterminado
-            if "Verificando" in message or "instalando" in message or "Iniciando" in message or "Gerando" in message:
-                self.progress_bar.setRange(0, 0) # Modo indeterminado
-            else:
-                self.progress_bar.setRange(0, 100)
-                self.progress_bar.setValue(100) # Completo
         else:
             print(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
 
+    def on_trace_event(self, record):
+        """Atualiza a barra de progresso pela etapa atual da instalação/lançamento."""
+        from launch_pipeline import STAGE_LABELS
+        if record["type"] == "start" and "index" in record:
+            self.progress_bar.setRange(0, record["total"])
+            self.progress_bar.setValue(record["index"])
+            label = STAGE_LABELS.get(record["name"], record["name"])
+            self.progress_bar.setFormat(f"{label}... ({record['index'] + 1}/{record['total']})")
+        elif record["type"] == "end" and "index" in record and record["outcome"] == "ok":
+            self.progress_bar.setValue(record["index"] + 1)
+        elif record["type"] == "run_end" and record["outcome"] == "ok":
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(100) # Completo
 
     def on_libraries_installed(self, success, error_message):
         """Slot chamado quando a instalação das bibliotecas termina."""
+        if self._reinstall_pending:
+            # O perfil mudou durante a instalação: instala agora o perfil selecionado
+            self._reinstall_pending = False
+            self.start_installer()
+            return
         if success:
             self.update_status_bar("Instalação de bibliotecas concluída. Pronto para iniciar o jogo.")
             self.launch_button.setEnabled(True) # Habilitar botão após a instalação
+            self.schedule_template_preparation(force=True) # Arquivos podem ter mudado na instalação
         else:
             self.update_status_bar(f"Erro crítico na instalação das bibliotecas: {error_message}")
             QMessageBox.critical(self, "Erro", f"Falha crítica ao instalar bibliotecas: {error_message}")
             self.launch_button.setEnabled(False) # Manter desabilitado se houver erro
 
+    def start_integrity_check(self):
+        """Inicia a verificação dos arquivos do jogo em uma thread separada."""
+        if self.is_installing():
+            self.update_status_bar("Aguarde o fim da instalação antes de verificar os arquivos.")
+            return
+        self.verify_button.setEnabled(False)
+        self.launch_button.setEnabled(False)
+        self.integrity_thread = IntegrityCheckThread(self.version, self.game_directory)
+        self.integrity_thread.status_message.connect(self.update_status_bar)
+        self.integrity_thread.verify_progress.connect(self.on_verify_progress)
+        self.integrity_thread.check_finished.connect(self.on_integrity_checked)
+        self.integrity_thread.start()
+
+    def start_startup_optimization(self):
+        """Faz um lançamento de treino e gera o arquivo AppCDS para os próximos lançamentos."""
+        if self.is_installing():
+            self.update_status_bar("Aguarde o fim da instalação antes de otimizar a inicialização.")
+            return
+        self.optimize_button.setEnabled(False)
+        self.launch_button.setEnabled(False)
+        self.optimizer_thread = StartupOptimizerThread(self.version, self.game_directory, self.ram_allocation, self.jvm_profile)
+        self.optimizer_thread.status_message.connect(self.update_status_bar)
+        self.optimizer_thread.optimization_finished.connect(self.on_startup_optimized)
+        self.optimizer_thread.start()
+
+    def on_startup_optimized(self, success, message):
+        """Slot chamado quando a otimização de inicialização termina."""
+        self.optimize_button.setEnabled(True)
+        self.validate_nickname()
+        self.update_status_bar(message)
+        self.schedule_template_preparation(force=True) # Passa a usar o novo arquivo AppCDS
+        if success:
+            QMessageBox.information(self, "Otimização concluída", message)
+        else:
+            QMessageBox.critical(self, "Erro", f"Não foi possível otimizar a inicialização: {message}")
+
+    def on_verify_progress(self, done, total):
+        if total > 0:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)
+            self.progress_bar.setFormat(f"Verificando: {done}/{total} arquivos")
+
+    def on_integrity_checked(self, success, summary):
+        """Slot chamado quando a verificação de integridade termina."""
+        self.verify_button.setEnabled(True)
+        self.validate_nickname()
+        self.schedule_template_preparation(force=True) # Arquivos reparados podem mudar o plano
+        if success:
+            QMessageBox.information(self, "Verificação concluída", summary)
+        else:
+            QMessageBox.critical(self, "Erro", f"Alguns arquivos não puderam ser reparados: {summary}")
+
+    def on_install_progress(self, snapshot):
+        """Slot chamado com o progresso da instalação (já limitado a ~10 atualizações por segundo)."""
+        from install_progress import describe_progress
+        if snapshot["total"] <= 0:
+            return
+        self.progress_bar.setRange(0, snapshot["total"])
+        self.progress_bar.setValue(min(snapshot["done"], snapshot["total"]))
+        self.progress_bar.setFormat(describe_progress(snapshot))
+
     def validate_nickname(self):
         """Valida o nickname em tempo real e atualiza o estilo do input."""
         nickname = self.nickname_input.text().strip()
@@ -679,7 +1780,7 @@ class MinecraftOfflineLauncher(QMainWindow):
             self.nickname_input.setStyleSheet("border: 1px solid #4CAF50;") # Borda verde para válido
             # Habilitar o botão de lançamento apenas se o nickname for válido E as libs estiverem instaladas
             # Verifica se a thread de instalação já terminou ou não está rodando
-            if not self.installer_thread.isRunning():
+            if not self.is_installing():
                  self.launch_button.setEnabled(True)
             else:
                 self.launch_button.setEnabled(False)
@@ -691,25 +1792,204 @@ class MinecraftOfflineLauncher(QMainWindow):
         """Atualiza o label de exibição da RAM alocada."""
         self.ram_allocation = value
         self.ram_value_label.setText(f"{value} GB")
-        self.save_settings() # Salva as configurações imediatamente ao mudar a RAM
+        self.save_settings() # Só em memória: o arraste do slider vira uma gravação quando parar
+
+    def update_jvm_profile(self, index):
+        """Atualiza o perfil da JVM escolhido na barra lateral."""
+        self.jvm_profile = self.jvm_profile_combo.itemData(index)
+        self.update_status_bar(compute_jvm_settings(self.jvm_profile, self.ram_allocation).describe())
+        self.save_settings()
+
+    def update_extra_jvm_arguments(self):
+        """Salva os argumentos extras da JVM do perfil (separados como no shell)."""
+        try:
+            self.extra_jvm_arguments = shlex.split(self.extra_jvm_input.text())
+        except ValueError as e:
+            self.update_status_bar(f"Argumentos da JVM inválidos: {str(e)}")
+            return
+        self.save_settings()
 
-    def start_game_launch(self):
-        """Inicia o processo de lançamento do jogo em uma thread separada."""
+    def choose_skin(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Escolher Skin", os.path.dirname(self.skin_path) or os.path.expanduser("~"),
+                                              "Skins (*.png)")
+        if path:
+            self.skin_path = path
+            self.update_skin_thumbnail()
+            self.save_settings()
+
+    def update_skin_thumbnail(self):
+        """Mostra a miniatura da skin escolhida (gerada só na primeira vez que a skin aparece)."""
+        if not self.skin_path or not os.path.isfile(self.skin_path):
+            self.skin_thumbnail_label.clear()
+            return
+        from skin_assets import skin_thumbnail
+        try:
+            self.skin_thumbnail_label.setPixmap(QPixmap(skin_thumbnail(self.skin_path)))
+        except (OSError, ValueError) as e:
+            self.skin_thumbnail_label.clear()
+            self.update_status_bar(f"Skin inválida: {str(e)}")
+
+    def update_backup_worlds(self, checked):
+        """Liga/desliga o backup dos mundos antes de jogar no perfil selecionado."""
+        self.backup_worlds = checked
+        self.save_settings()
+
+    def update_particle_count(self, index):
+        """Aplica e salva a quantidade de partículas do fundo."""
+        count = self.particles_combo.itemData(index)
+        self.particle_widget.set_particle_count(count)
+        self.settings.set(particle_count=count)
+
+    def select_backup_interval(self):
+        """Mostra o intervalo de backup do perfil (um valor fora da lista, vindo do profiles.json, vira item novo)."""
+        self.backup_interval_combo.blockSignals(True)
+        index = self.backup_interval_combo.findData(self.backup_interval_hours)
+        if index < 0:
+            self.backup_interval_combo.addItem(f"No máximo um backup a cada {self.backup_interval_hours:g} h",
+                                               self.backup_interval_hours)
+            index = self.backup_interval_combo.count() - 1
+        self.backup_interval_combo.setCurrentIndex(index)
+        self.backup_interval_combo.blockSignals(False)
+
+    def update_backup_interval(self, index):
+        """Atualiza o intervalo mínimo entre backups do perfil selecionado."""
+        self.backup_interval_hours = self.backup_interval_combo.itemData(index)
+        self.save_settings()
+
+    def on_profile_selected(self, index):
+        """Troca o perfil da instância e instala/verifica as bibliotecas dele."""
+        name = self.profile_combo.itemText(index)
+        if not name or name == self.profiles.selected_name:
+            return
+        self.save_settings() # Guarda a RAM/JVM no perfil anterior antes de trocar
+        self.profiles.select(name)
+        self.apply_profile(self.profiles.selected)
+        self.apply_profile_to_widgets()
+        self.update_status_bar(f"Perfil '{name}' selecionado ({self.version} em {self.game_directory}).")
+        self.start_installer()
+
+    def create_profile(self):
+        """Cria um perfil novo a partir das configurações atuais, com outra pasta do jogo."""
+        name, ok = QInputDialog.getText(self, "Novo Perfil", "Nome do perfil:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        if self.profiles.get(name) is not None:
+            QMessageBox.critical(self, "Erro", f"Já existe um perfil chamado '{name}'.")
+            return
+        directory = QFileDialog.getExistingDirectory(self, "Pasta do jogo do perfil", os.path.dirname(self.game_directory))
+        if not directory:
+            return
+        self.profiles.add(InstanceProfile(name, self.version, directory, self.ram_allocation, self.jvm_profile,
+                                          self.extra_jvm_arguments, self.backup_worlds, self.backup_interval_hours))
+        self.profile_combo.addItem(name)
+        self.profile_combo.setCurrentIndex(self.profile_combo.count() - 1) # Dispara on_profile_selected
+
+    def delete_profile(self):
+        """Exclui o perfil selecionado (os arquivos do jogo ficam no disco)."""
+        name = self.profiles.selected_name
+        if any(game.profile_name == name for game in self.supervisor.running()):
+            QMessageBox.critical(self, "Erro", f"Feche os jogos do perfil '{name}' antes de excluí-lo.")
+            return
+        reply = QMessageBox.question(self, "Excluir Perfil",
+                                     f"Excluir o perfil '{name}'? Os arquivos em {self.game_directory} não serão apagados.")
+        if reply != QMessageBox.Yes:
+            return
+        try:
+            self.profiles.delete(name)
+        except ValueError as e:
+            QMessageBox.critical(self, "Erro", str(e))
+            return
+        self.apply_profile(self.profiles.selected)
+        self.apply_profile_to_widgets()
+        self.update_status_bar(f"Perfil '{name}' excluído.")
+        self.start_installer()
+
+    def update_running_games(self):
+        """Atualiza a contagem de jogos abertos na barra lateral."""
+        running = self.supervisor.running()
+        if running:
+            details = ", ".join(f"{game.profile_name} (PID {game.pid})" for game in running)
+            self.running_games_label.setText(f"{len(running)} jogo(s) em execução: {details}")
+        else:
+            self.running_games_label.setText("Nenhum jogo em execução")
+        self.stop_games_button.setEnabled(bool(running))
+        self.particle_widget.set_game_running(bool(running))
+        self.resource_chart.setVisible(bool(running))
+        if running:
+            self.resource_timer.start()
+        else:
+            self.resource_timer.stop()
+        self.refresh_resource_chart()
+
+    def refresh_resource_chart(self):
+        """Mostra no gráfico o jogo aberto mais recentemente."""
+        running = [game for game in self.supervisor.running() if game.monitor is not None]
+        self.resource_chart.refresh(running[-1].monitor if running else None)
+
+    def suggest_ram(self, running_game):
+        """Depois de uma sessão, sugere o -Xmx do perfil a partir do heap observado."""
+        profile = self.profiles.get(running_game.profile_name)
+        if running_game.monitor is None or profile is None:
+            return
+        recommendation = running_game.monitor.recommendation(current_heap_mb=profile.ram_gb * 1024)
+        if recommendation is None or recommendation.ram_gb == profile.ram_gb:
+            return
+        reply = QMessageBox.question(
+            self, "Memória do jogo",
+            f"Pela última sessão do perfil '{profile.name}', o ideal é -Xmx{recommendation.ram_gb}G "
+            f"(atual: {profile.ram_gb} GB).\n\n{recommendation.reason}.\n\nAplicar ao perfil?")
+        if reply != QMessageBox.Yes:
+            return
+        if profile.name == self.profiles.selected_name:
+            self.ram_slider.setValue(recommendation.ram_gb) # Salva pelo update_ram_label
+        else:
+            profile.ram_gb = recommendation.ram_gb
+            self.profiles.save()
+
+    def stop_all_games(self):
+        """Fecha todos os jogos abertos pelo launcher sem travar a interface."""
+        self.stop_games_button.setEnabled(False)
+        self.update_status_bar("Fechando os jogos abertos...")
+        threading.Thread(target=self.supervisor.stop_all, name="stop-games", daemon=True).start()
+
+    def start_game_launch(self, server_address=None):
+        """
+        Inicia o processo de lançamento do jogo em uma thread separada (entrando direto em
+        server_address, se informado). Retorna False se o nickname for inválido.
+        """
         nickname = self.nickname_input.text().strip()
 
         if not nickname or len(nickname) < 3 or len(nickname) > 16:
             self.update_status_bar("Erro: Nickname deve ter entre 3 e 16 caracteres.")
             QMessageBox.critical(self, "Erro", "Por favor, digite um nickname válido (3-16 caracteres).")
-            return
+            return False
 
         self.launch_button.setEnabled(False) # Desabilitar botão durante o lançamento
         self.launch_button.setText("Iniciando...") # Feedback visual
         
-        # Cria uma nova instância da thread de lançamento do jogo com os parâmetros corretos
-        self.launcher_thread = GameLauncherThread(self.version, self.game_directory, nickname, self.ram_allocation)
-        self.launcher_thread.launch_finished.connect(self.on_game_launched)
-        self.launcher_thread.status_message.connect(self.update_status_bar)
-        self.launcher_thread.start()
+        # Uma thread por lançamento; a referência fica em launcher_threads enquanto o jogo estiver aberto,
+        # então um segundo lançamento não perde o acompanhamento do primeiro
+        launcher_thread = GameLauncherThread(self.version, self.game_directory, nickname, self.ram_allocation,
+                                             self.supervisor, self.jvm_profile, self.extra_jvm_arguments,
+                                             self.profiles.selected_name, self.backup_worlds, server_address,
+                                             self.launch_template, self.template_thread, self.backup_interval_hours)
+        launcher_thread.launch_finished.connect(self.on_game_launched)
+        launcher_thread.status_message.connect(self.update_status_bar)
+        launcher_thread.trace_event.connect(self.on_trace_event)
+        launcher_thread.game_output.connect(self.on_game_output)
+        launcher_thread.game_exited.connect(self.on_game_exited)
+        launcher_thread.finished.connect(self.release_launcher_thread)
+        self.launcher_threads.add(launcher_thread)
+        launcher_thread.start()
+        return True
+
+    def release_launcher_thread(self, *_args):
+        """Solta a thread de lançamento quando ela não tem mais jogo para acompanhar."""
+        launcher_thread = self.sender()
+        game_process = launcher_thread.game_process
+        if game_process is None or game_process.returncode is not None:
+            self.launcher_threads.discard(launcher_thread)
 
 
     def on_game_launched(self, success, message, nickname):
@@ -718,12 +1998,45 @@ class MinecraftOfflineLauncher(QMainWindow):
         self.launch_button.setText("Iniciar Minecraft (Offline)") # Resetar texto do botão
 
         if success:
+            self.update_running_games() # Pausa as partículas enquanto houver jogo aberto
             self.update_status_bar(f"Minecraft iniciado com sucesso como {nickname}!")
             QMessageBox.information(self, "Sucesso", message)
         else:
             self.update_status_bar(f"Falha ao iniciar Minecraft: {message}")
             QMessageBox.critical(self, "Erro", message)
 
+    def on_game_output(self, lines):
+        """Slot chamado com lotes de linhas da saída do jogo (já limitados em frequência)."""
+        if lines:
+            self.progress_bar.setFormat(f"[{self.sender().profile_name}] {lines[-1][:120]}")
+
+    def on_game_exited(self, returncode):
+        """Slot chamado quando o processo de um dos jogos termina."""
+        launcher_thread = self.sender()
+        self.release_launcher_thread()
+        self.update_running_games()
+        self.update_status_bar(f"Minecraft ({launcher_thread.profile_name}) encerrado (código de saída {returncode}).")
+        if launcher_thread.running_game is not None and launcher_thread.game_process.launched:
+            self.suggest_ram(launcher_thread.running_game)
+
+    def open_log_viewer(self):
+        """Abre a janela de logs do perfil atual (reaproveitada enquanto a pasta do jogo não mudar)."""
+        if self.log_viewer is None or self.log_viewer.game_directory != self.game_directory:
+            if self.log_viewer is not None:
+                self.log_viewer.close()
+            self.log_viewer = LogViewerDialog(self.game_directory, self)
+        else:
+            self.log_viewer.reload_files()
+        self.log_viewer.show()
+        self.log_viewer.raise_()
+
+    def open_server_browser(self):
+        """Abre a lista de servidores (a mesma janela é reaproveitada)."""
+        if self.server_browser is None:
+            self.server_browser = ServerBrowserDialog(self, self)
+        self.server_browser.show()
+        self.server_browser.raise_()
+
     def open_mods_folder(self):
         """Abre a pasta de mods do Minecraft."""
         mods_path = os.path.join(self.game_directory, "mods")
@@ -745,8 +2058,21 @@ class MinecraftOfflineLauncher(QMainWindow):
 
 
 def main():
+    multiprocessing.freeze_support() # Necessário para o pool de processos em executáveis congelados
     app = QApplication(sys.argv)
+    profiler = None
+    if "--profile-startup" in sys.argv:
+        profiler = StartupProfiler(_startup_started, _imports_finished)
+        profiler.mark("QApplication")
     launcher = MinecraftOfflineLauncher()
+    if profiler is not None:
+        profiler.mark("Construção dos widgets")
+        launcher.startup_profiler = profiler
+    if "--profile-frames" in sys.argv:
+        # Custo por quadro das partículas, uma linha por segundo no stderr (também medido pelo benchmarks.py)
+        launcher.particle_widget.frame_stats.connect(
+            lambda update_ms, paint_ms: print(f"Partículas: {update_ms:.3f} ms atualização, {paint_ms:.3f} ms desenho "
+                                              "por quadro", file=sys.stderr, flush=True))
     launcher.show()
     sys.exit(app.exec_())
 
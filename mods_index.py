@@ -0,0 +1,420 @@
+import os
+import re
+import sys
+import json
+import struct
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from game_files import launcher_data_path, read_json, write_json_atomic
+
+INDEX_FORMAT = 2
+MOD_EXTENSIONS = (".jar", ".zip")
+MOD_ANNOTATION = b"Lnet/minecraftforge/fml/common/Mod;"
+# Mods escritos para o FML do 1.7.10 ou anterior ainda usam o pacote cpw.mods
+LEGACY_MOD_ANNOTATION = b"Lcpw/mods/fml/common/Mod;"
+
+MINECRAFT_VERSION = "1.8.8"
+FORGE_VERSION = "11.15.0.1655"
+# Mods que o próprio Forge 1.8.8 fornece (podem aparecer como dependência)
+BUILTIN_MODS = {"Minecraft": MINECRAFT_VERSION, "mcp": "9.19", "FML": "8.0.99.99", "Forge": FORGE_VERSION}
+# A partir deste número de jars novos a leitura é feita em um pool de processos
+POOL_THRESHOLD = 8
+
+
+class _ClassReader:
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def u1(self):
+        self.offset += 1
+        return self.data[self.offset - 1]
+
+    def u2(self):
+        self.offset += 2
+        return struct.unpack_from(">H", self.data, self.offset - 2)[0]
+
+    def u4(self):
+        self.offset += 4
+        return struct.unpack_from(">I", self.data, self.offset - 4)[0]
+
+    def skip(self, count):
+        self.offset += count
+
+
+# Tamanho fixo de cada tipo do constant pool (exceto Utf8, que tem tamanho variável)
+_CONSTANT_SIZES = {3: 4, 4: 4, 5: 8, 6: 8, 7: 2, 8: 2, 9: 4, 10: 4, 11: 4, 12: 4, 15: 3, 16: 2, 17: 4, 18: 4, 19: 2, 20: 2}
+
+
+def _read_element_value(reader, pool):
+    tag = chr(reader.u1())
+    if tag in "BCDFIJSZs":
+        return pool.get(reader.u2())
+    if tag == "e":
+        reader.skip(2)
+        return pool.get(reader.u2())
+    if tag == "c":
+        return pool.get(reader.u2())
+    if tag == "@":
+        return _read_annotation(reader, pool)[1]
+    if tag == "[":
+        return [_read_element_value(reader, pool) for _ in range(reader.u2())]
+    raise ValueError(f"element_value desconhecido: {tag!r}")
+
+
+def _read_annotation(reader, pool):
+    type_name = pool.get(reader.u2())
+    values = {}
+    for _ in range(reader.u2()):
+        name = pool.get(reader.u2())
+        values[name] = _read_element_value(reader, pool)
+    return type_name, values
+
+
+def read_mod_annotation(data):
+    """
+    Procura a anotação @Mod de uma classe compilada e retorna (descritor, valores),
+    ou None. Só o constant pool e os atributos da classe são lidos; campos e métodos são pulados.
+    """
+    reader = _ClassReader(data)
+    if reader.u4() != 0xCAFEBABE:
+        return None
+    reader.skip(4) # minor/major
+    pool = {}
+    count = reader.u2()
+    index = 1
+    while index < count:
+        tag = reader.u1()
+        if tag == 1:
+            length = reader.u2()
+            pool[index] = data[reader.offset:reader.offset + length].decode("utf-8", errors="replace")
+            reader.skip(length)
+        elif tag in (3, 4):
+            pool[index] = struct.unpack_from(">i" if tag == 3 else ">f", data, reader.offset)[0]
+            reader.skip(4)
+        elif tag in _CONSTANT_SIZES:
+            reader.skip(_CONSTANT_SIZES[tag])
+        else:
+            raise ValueError(f"constante desconhecida: {tag}")
+        # long/double ocupam duas posições do pool
+        index += 2 if tag in (5, 6) else 1
+
+    reader.skip(6) # access_flags, this_class, super_class
+    reader.skip(2 * reader.u2()) # interfaces
+    for _ in range(2): # campos e métodos
+        for _ in range(reader.u2()):
+            reader.skip(6)
+            for _ in range(reader.u2()):
+                reader.skip(2)
+                reader.skip(reader.u4())
+    for _ in range(reader.u2()):
+        name = pool.get(reader.u2())
+        length = reader.u4()
+        end = reader.offset + length
+        if name == "RuntimeVisibleAnnotations":
+            for _ in range(reader.u2()):
+                type_name, values = _read_annotation(reader, pool)
+                if type_name in (MOD_ANNOTATION.decode(), LEGACY_MOD_ANNOTATION.decode()):
+                    return type_name, values
+        reader.offset = end
+    return None
+
+
+def _parse_mcmod_info(text):
+    """mcmod.info: lista de mods ou {"modList": [...]}. Muitos arquivos têm JSON inválido; tenta corrigir."""
+    try:
+        data = json.loads(text, strict=False)
+    except ValueError:
+        # Vírgulas sobrando antes de ] ou } são o erro mais comum
+        data = json.loads(re.sub(r",\s*([\]}])", r"\1", text), strict=False)
+    if isinstance(data, dict):
+        data = data.get("modList") or data.get("modlist") or []
+    return [entry for entry in data if isinstance(entry, dict)]
+
+
+def _version_key(version):
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.findall(r"\d+|[A-Za-z]+", version)]
+
+
+def is_soft_requirement(spec):
+    """Versão sem colchetes/parênteses ("1.8.9"): requisito "suave" do Maven, que aceita qualquer versão."""
+    spec = (spec or "").strip()
+    return bool(spec) and spec != "*" and spec[0] not in "[("
+
+
+def version_in_range(version, spec):
+    """
+    Confere uma versão contra uma faixa no formato do FML/Maven: "[1.8.8]", "[11.15,)",
+    "(1.0,2.0]", várias faixas separadas por vírgula. Uma versão solta ("1.2") é só uma
+    recomendação no Maven e o FML aceita qualquer versão (ver is_soft_requirement).
+    """
+    spec = (spec or "").strip()
+    if not spec or spec == "*" or is_soft_requirement(spec):
+        return True
+    key = _version_key(version)
+    for restriction in re.findall(r"[\[(][^\])]*[\])]", spec):
+        body = restriction[1:-1]
+        if "," not in body:
+            # "[1.8.8]": versão exata
+            if key == _version_key(body.strip()):
+                return True
+            continue
+        low, high = (part.strip() for part in body.split(",", 1))
+        if low and (key < _version_key(low) or (restriction[0] == "(" and key == _version_key(low))):
+            continue
+        if high and (key > _version_key(high) or (restriction[-1] == ")" and key == _version_key(high))):
+            continue
+        return True
+    return False
+
+
+def parse_dependencies(spec):
+    """
+    "required-after:Forge@[11.15.0.1655,);after:JEI" ->
+    [{"modid": "Forge", "version": "[11.15.0.1655,)", "required": True}, {"modid": "JEI", ...}]
+    """
+    dependencies = []
+    for entry in (spec or "").split(";"):
+        entry = entry.strip()
+        if ":" not in entry:
+            continue
+        kind, _, target = entry.partition(":")
+        modid, _, version = target.partition("@")
+        if not modid or modid == "*":
+            continue
+        dependencies.append({"modid": modid.strip(), "version": version.strip(), "required": kind.strip().startswith("required")})
+    return dependencies
+
+
+def read_mod_jar(path):
+    """
+    Lê os mods de um jar (executado nos processos do pool). Retorna (caminho, mods, pacotes, erro);
+    os pacotes das classes do jar permitem achar o mod de uma linha de stack trace (log_index.py).
+    """
+    try:
+        mods = {}
+        packages = set()
+        legacy = False
+        with zipfile.ZipFile(path) as zf:
+            for name in zf.namelist():
+                if not name.endswith(".class"):
+                    continue
+                packages.add(name.rpartition("/")[0].replace("/", "."))
+                data = zf.read(name)
+                # Filtro barato: só classes que citam a anotação são analisadas
+                if MOD_ANNOTATION not in data and LEGACY_MOD_ANNOTATION not in data:
+                    continue
+                annotation = read_mod_annotation(data)
+                if annotation is None:
+                    continue
+                type_name, values = annotation
+                legacy = legacy or type_name == LEGACY_MOD_ANNOTATION.decode()
+                modid = values.get("modid")
+                if modid:
+                    mods[modid] = {
+                        "modid": modid,
+                        "name": values.get("name") or modid,
+                        "version": values.get("version") or "",
+                        "minecraft": values.get("acceptedMinecraftVersions") or "",
+                        "dependencies": parse_dependencies(values.get("dependencies")),
+                        "legacy": type_name == LEGACY_MOD_ANNOTATION.decode(),
+                        "class": name[:-len(".class")].replace("/", "."),
+                    }
+
+            info = []
+            if "mcmod.info" in zf.namelist():
+                try:
+                    info = _parse_mcmod_info(zf.read("mcmod.info").decode("utf-8", errors="replace"))
+                except ValueError:
+                    info = []
+        for entry in info:
+            modid = entry.get("modid")
+            if not modid:
+                continue
+            mod = mods.setdefault(modid, {"modid": modid, "name": modid, "version": "", "minecraft": "",
+                                          "dependencies": [], "legacy": legacy})
+            mod["name"] = entry.get("name") or mod["name"]
+            # A versão do @Mod pode ser um marcador como "${version}"; o mcmod.info costuma ter a real
+            if not mod["version"] or "${" in mod["version"]:
+                mod["version"] = str(entry.get("version") or mod["version"])
+            mod["mcversion"] = str(entry.get("mcversion") or "")
+            if entry.get("useDependencyInformation"):
+                known = {d["modid"] for d in mod["dependencies"]}
+                for requirement in entry.get("requiredMods") or []:
+                    dep_id, _, dep_version = str(requirement).partition("@")
+                    if dep_id not in known:
+                        mod["dependencies"].append({"modid": dep_id, "version": dep_version, "required": True})
+        return path, list(mods.values()), sorted(packages), None
+    except (OSError, zipfile.BadZipFile, ValueError, struct.error, IndexError) as e:
+        return path, [], [], str(e)
+
+
+class ModsReport:
+    """Mods encontrados e problemas que fariam o Forge falhar (errors) ou que merecem aviso (warnings)."""
+
+    def __init__(self):
+        self.mods = [] # (caminho do jar, mod)
+        self.errors = []
+        self.warnings = []
+        self.jars_scanned = 0
+        self.jars_cached = 0
+
+    def add(self, severity, kind, message, modid=None, jars=()):
+        problem = {"kind": kind, "modid": modid, "jars": [os.path.basename(j) for j in jars], "message": message}
+        (self.errors if severity == "error" else self.warnings).append(problem)
+
+    def summary(self):
+        return (f"{len(self.mods)} mods em {self.jars_scanned + self.jars_cached} arquivos, "
+                f"{len(self.errors)} erro(s), {len(self.warnings)} aviso(s).")
+
+    def to_dict(self):
+        return {
+            "mods": [dict(mod, jar=os.path.basename(jar)) for jar, mod in self.mods],
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "jars_scanned": self.jars_scanned,
+            "jars_cached": self.jars_cached,
+        }
+
+
+class ModsIndex:
+    """
+    Índice da pasta mods em <game_dir>/.grcraft/mods_index.json.
+
+    Cada jar é lido uma única vez (mcmod.info + anotações @Mod das classes) e o
+    resultado fica guardado pelo caminho, tamanho e mtime. Nas varreduras seguintes
+    só os jars novos ou alterados são abertos; se forem muitos, a leitura é feita
+    em um pool de processos.
+    """
+
+    def __init__(self, game_directory):
+        self.game_directory = game_directory
+        self.mods_directory = os.path.join(game_directory, "mods")
+        self.path = launcher_data_path(game_directory, "mods_index.json")
+        self.last_read = 0 # Jars abertos na última varredura (os demais vieram do cache)
+
+    def jars(self):
+        try:
+            entries = list(os.scandir(self.mods_directory))
+        except FileNotFoundError:
+            return []
+        return sorted(e.path for e in entries if e.is_file() and e.name.lower().endswith(MOD_EXTENSIONS))
+
+    def scan(self, workers=None, read_only=False):
+        """
+        Atualiza o índice e retorna {caminho: {"mods": [...], "packages": [...], "error": ...}} dos jars atuais.
+        Com read_only, os jars novos são lidos neste processo e o índice não é gravado.
+        """
+        data = read_json(self.path, {})
+        cached = data.get("jars", {}) if data.get("format") == INDEX_FORMAT else {}
+        current = {}
+        stats = {}
+        to_read = []
+        for path in self.jars():
+            st = os.stat(path)
+            stats[path] = [st.st_size, st.st_mtime_ns]
+            entry = cached.get(path)
+            if entry and entry["stat"] == stats[path]:
+                current[path] = entry
+            else:
+                to_read.append(path)
+
+        if len(to_read) >= POOL_THRESHOLD and not read_only:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(read_mod_jar, to_read))
+        else:
+            results = [read_mod_jar(path) for path in to_read]
+        for path, mods, packages, error in results:
+            current[path] = {"stat": stats[path], "mods": mods, "packages": packages, "error": error}
+
+        if not read_only and (to_read or set(current) != set(cached)):
+            write_json_atomic(self.path, {"format": INDEX_FORMAT, "jars": current})
+        self.last_read = len(to_read)
+        return current
+
+    def check(self, workers=None, read_only=False):
+        """Varre a pasta e aponta IDs duplicados, versões incompatíveis e dependências ausentes."""
+        jars = self.scan(workers, read_only)
+        report = ModsReport()
+        report.jars_scanned = self.last_read
+        report.jars_cached = len(jars) - self.last_read
+
+        by_id = {}
+        for path, entry in jars.items():
+            if entry["error"]:
+                report.add("warning", "unreadable", f"Não foi possível ler {os.path.basename(path)}: {entry['error']}", jars=[path])
+            for mod in entry["mods"]:
+                report.mods.append((path, mod))
+                by_id.setdefault(mod["modid"], []).append((path, mod))
+
+        available = dict(BUILTIN_MODS)
+        for modid, entries in by_id.items():
+            available[modid] = entries[0][1]["version"]
+            paths = sorted({path for path, _mod in entries})
+            if len(paths) > 1:
+                report.add("error", "duplicate", f"O mod '{modid}' aparece em {len(paths)} arquivos.", modid, paths)
+
+        for path, mod in report.mods:
+            name = f"{mod['name']} ({os.path.basename(path)})"
+            if mod["legacy"]:
+                report.add("error", "minecraft_version", f"{name} foi feito para o Minecraft 1.7.10 ou anterior.", mod["modid"], [path])
+            elif mod["minecraft"] and not version_in_range(MINECRAFT_VERSION, mod["minecraft"]):
+                report.add("error", "minecraft_version", f"{name} aceita o Minecraft {mod['minecraft']}, não o {MINECRAFT_VERSION}.",
+                           mod["modid"], [path])
+            elif is_soft_requirement(mod["minecraft"]) and mod["minecraft"] != MINECRAFT_VERSION:
+                # O Forge carrega o mod mesmo assim; fica só o aviso
+                report.add("warning", "minecraft_version", f"{name} foi feito para o Minecraft {mod['minecraft']}.",
+                           mod["modid"], [path])
+            elif mod.get("mcversion") and mod["mcversion"] != MINECRAFT_VERSION and not mod["minecraft"]:
+                report.add("warning", "minecraft_version", f"{name} declara o Minecraft {mod['mcversion']} no mcmod.info.",
+                           mod["modid"], [path])
+
+            for dependency in mod["dependencies"]:
+                dep_id = dependency["modid"]
+                if dep_id not in available:
+                    if dependency["required"]:
+                        report.add("error", "missing_dependency", f"{name} precisa do mod '{dep_id}', que não está instalado.",
+                                   mod["modid"], [path])
+                    continue
+                dep_version = available[dep_id]
+                if not dep_version or "${" in dep_version:
+                    continue
+                if is_soft_requirement(dependency["version"]) \
+                        and _version_key(dep_version) < _version_key(dependency["version"]):
+                    report.add("warning", "dependency_version",
+                               f"{name} recomenda {dep_id} {dependency['version']}, instalado: {dep_version}.",
+                               mod["modid"], [path])
+                elif dependency["version"] and not version_in_range(dep_version, dependency["version"]):
+                    kind = "forge_version" if dep_id in ("Forge", "FML") else "dependency_version"
+                    severity = "error" if dependency["required"] else "warning"
+                    report.add(severity, kind, f"{name} exige {dep_id} {dependency['version']}, instalado: {dep_version}.",
+                               mod["modid"], [path])
+        return report
+
+
+def main(argv=None):
+    """Modo sem interface: python mods_index.py --game-dir <pasta> [--json]"""
+    parser = argparse.ArgumentParser(description="Lista os mods e aponta conflitos antes de iniciar o Forge.")
+    parser.add_argument("--game-dir", required=True)
+    parser.add_argument("--workers", type=int, default=None, help="Processos para ler jars novos (padrão: todos os núcleos)")
+    parser.add_argument("--json", action="store_true", help="Imprime o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    report = ModsIndex(args.game_dir).check(args.workers)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2, ensure_ascii=False))
+    else:
+        for _path, mod in sorted(report.mods, key=lambda m: m[1]["modid"].lower()):
+            print(f"{mod['modid']:<30}{mod['version']:<20}{mod['name']}")
+        for problem in report.errors:
+            print(f"ERRO: {problem['message']}")
+        for problem in report.warnings:
+            print(f"Aviso: {problem['message']}")
+        print(report.summary())
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import os
+import shutil
+import hashlib
+import zipfile
+import threading
+
+from game_files import (
+    launcher_data_path, load_version_chain, merge_version_chain, native_files,
+    file_sha1, link_or_copy, read_json, write_json_atomic,
+)
+
+
+class NativesCache:
+    """
+    Cache de natives (LWJGL/jinput) endereçado pelo conteúdo.
+
+    Cada jar de natives é extraído uma única vez em
+    <game_dir>/.grcraft/natives/objects/<sha1 do jar>/. O diretório usado pelo
+    jogo (natives/sets/<hash do conjunto>/) é montado com links para esses
+    arquivos e reaproveitado em todos os lançamentos. Entradas antigas só são
+    apagadas quando as versões das bibliotecas de natives mudam.
+    """
+
+    def __init__(self, game_directory, version):
+        self.game_directory = game_directory
+        self.version = version
+        self.root = launcher_data_path(game_directory, "natives")
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.sets_dir = os.path.join(self.root, "sets")
+        self.hash_cache_path = os.path.join(self.root, "jar_hashes.json")
+
+    def _jar_sha1(self, game_file, hash_cache):
+        """SHA-1 do jar de natives: do JSON da versão ou calculado uma vez e guardado por tamanho/mtime."""
+        if game_file.sha1:
+            return game_file.sha1
+        st = os.stat(game_file.path)
+        cached = hash_cache.get(game_file.path)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["sha1"]
+        sha1 = file_sha1(game_file.path)
+        hash_cache[game_file.path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": sha1}
+        return sha1
+
+    def _extract(self, jar_path, sha1, exclude):
+        target = os.path.join(self.objects_dir, sha1)
+        if os.path.isdir(target):
+            return target
+        # Extrai em uma pasta temporária e renomeia: outro lançamento nunca vê uma extração pela metade
+        tmp_target = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.rmtree(tmp_target, ignore_errors=True)
+        os.makedirs(tmp_target)
+        with zipfile.ZipFile(jar_path) as zf:
+            for name in zf.namelist():
+                if name.endswith("/") or any(name.startswith(e) for e in exclude):
+                    continue
+                zf.extract(name, tmp_target)
+        try:
+            os.replace(tmp_target, target)
+        except OSError:
+            # Outro processo terminou a mesma extração antes
+            shutil.rmtree(tmp_target, ignore_errors=True)
+        return target
+
+    def _compose(self, set_hash, object_dirs):
+        target = os.path.join(self.sets_dir, set_hash)
+        if os.path.isdir(target):
+            return target
+        tmp_target = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.rmtree(tmp_target, ignore_errors=True)
+        os.makedirs(tmp_target)
+        for object_dir in object_dirs:
+            for dirpath, _dirnames, filenames in os.walk(object_dir):
+                relative_dir = os.path.relpath(dirpath, object_dir)
+                for filename in filenames:
+                    dst = os.path.normpath(os.path.join(tmp_target, relative_dir, filename))
+                    if os.path.exists(dst):
+                        continue
+                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    link_or_copy(os.path.join(dirpath, filename), dst)
+        try:
+            os.replace(tmp_target, target)
+        except OSError:
+            shutil.rmtree(tmp_target, ignore_errors=True)
+        return target
+
+    def prepare(self, read_only=False):
+        """
+        Garante que os natives da versão estejam extraídos e retorna o diretório para o java.library.path.
+        Com read_only, só calcula o diretório (que pode ainda não existir) sem extrair nem gravar nada.
+        """
+        merged = merge_version_chain(load_version_chain(self.version, self.game_directory))
+        natives = native_files(merged, self.game_directory)
+        hash_cache = read_json(self.hash_cache_path, {})
+        hashes_before = dict(hash_cache)
+
+        object_dirs = []
+        jar_hashes = []
+        for game_file, exclude in natives:
+            if not os.path.isfile(game_file.path):
+                continue
+            sha1 = self._jar_sha1(game_file, hash_cache)
+            jar_hashes.append(sha1)
+            if not read_only:
+                object_dirs.append(self._extract(game_file.path, sha1, exclude))
+
+        set_hash = hashlib.sha1("\n".join(sorted(jar_hashes)).encode("ascii")).hexdigest()
+        if read_only:
+            return os.path.join(self.sets_dir, set_hash)
+        natives_directory = self._compose(set_hash, object_dirs)
+
+        if hash_cache != hashes_before:
+            write_json_atomic(self.hash_cache_path, hash_cache)
+        self._evict(set(jar_hashes), set_hash)
+        return natives_directory
+
+    def _evict(self, keep_objects, keep_set):
+        """Remove extrações de jars e conjuntos que não pertencem mais à versão atual."""
+        state_path = os.path.join(self.root, "current_sets.json")
+        state = read_json(state_path, {})
+        entry = {"set": keep_set, "objects": sorted(keep_objects)}
+        if state.get(self.version) == entry:
+            return
+        state[self.version] = entry
+        write_json_atomic(state_path, state)
+        # Conjuntos de outras versões no mesmo diretório do jogo continuam protegidos
+        keep_sets = {e["set"] for e in state.values()}
+        still_used = {sha1 for e in state.values() for sha1 in e["objects"]}
+        for directory, keep in ((self.sets_dir, keep_sets), (self.objects_dir, still_used)):
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name not in keep and not name.endswith(".tmp"):
+                    shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
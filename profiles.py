@@ -0,0 +1,122 @@
+import os
+
+from game_files import user_config_path, read_json
+from jvm_profiles import JVM_PROFILES, DEFAULT_PROFILE
+from launch_pipeline import DEFAULT_VERSION, default_game_directory
+from settings_store import DebouncedWriter
+
+PROFILES_FORMAT = 1
+DEFAULT_PROFILE_NAME = "Padrão"
+# Intervalos mínimos entre backups oferecidos na interface: (horas, rótulo)
+BACKUP_INTERVALS = (
+    (0, "Backup a cada lançamento"),
+    (1, "No máximo um backup por hora"),
+    (6, "No máximo um backup a cada 6 h"),
+    (24, "No máximo um backup por dia"),
+)
+
+
+class InstanceProfile:
+    """
+    Uma instância do jogo: versão, diretório, RAM, perfil e argumentos extras da JVM, backup dos mundos.
+    backup_interval_hours é o intervalo mínimo entre dois backups (0 = a cada lançamento).
+    """
+
+    def __init__(self, name, version=DEFAULT_VERSION, game_directory=None, ram_gb=2, jvm_profile=DEFAULT_PROFILE,
+                 extra_jvm_arguments=(), backup_worlds=False, backup_interval_hours=0):
+        self.name = name
+        self.version = version
+        self.game_directory = game_directory or default_game_directory()
+        self.ram_gb = int(ram_gb)
+        self.jvm_profile = jvm_profile if jvm_profile in JVM_PROFILES else DEFAULT_PROFILE
+        self.extra_jvm_arguments = list(extra_jvm_arguments)
+        self.backup_worlds = bool(backup_worlds)
+        self.backup_interval_hours = max(0.0, float(backup_interval_hours))
+
+    def to_dict(self):
+        return {
+            "version": self.version,
+            "game_directory": self.game_directory,
+            "ram_gb": self.ram_gb,
+            "jvm_profile": self.jvm_profile,
+            "extra_jvm_arguments": self.extra_jvm_arguments,
+            "backup_worlds": self.backup_worlds,
+            "backup_interval_hours": self.backup_interval_hours,
+        }
+
+    @classmethod
+    def from_dict(cls, name, data):
+        return cls(name, data.get("version", DEFAULT_VERSION), data.get("game_directory"), data.get("ram_gb", 2),
+                   data.get("jvm_profile", DEFAULT_PROFILE), data.get("extra_jvm_arguments", ()),
+                   data.get("backup_worlds", False), data.get("backup_interval_hours", 0))
+
+    def __repr__(self):
+        return f"InstanceProfile({self.name!r}, {self.version}, {self.game_directory!r})"
+
+
+class ProfileStore:
+    """
+    Perfis de instância salvos em profiles.json na pasta de configuração do usuário.
+    Sempre existe pelo menos um perfil; "selected" é o perfil mostrado ao abrir o launcher.
+    Com delay > 0 (interface), save() só agenda a gravação e flush() a força.
+    """
+
+    def __init__(self, path=None, default_ram_gb=2, default_jvm_profile=DEFAULT_PROFILE, delay=0):
+        self.path = path or user_config_path("profiles.json")
+        self.writer = DebouncedWriter(self.path, delay)
+        data = read_json(self.path, {})
+        if data.get("format") != PROFILES_FORMAT:
+            data = {}
+        self.profiles = {name: InstanceProfile.from_dict(name, entry) for name, entry in data.get("profiles", {}).items()}
+        if not self.profiles:
+            # Primeira execução: o perfil padrão herda a RAM e o perfil de JVM das configurações antigas
+            self.profiles[DEFAULT_PROFILE_NAME] = InstanceProfile(DEFAULT_PROFILE_NAME, ram_gb=default_ram_gb,
+                                                                  jvm_profile=default_jvm_profile)
+        self.selected_name = data.get("selected")
+        if self.selected_name not in self.profiles:
+            self.selected_name = next(iter(self.profiles))
+
+    def names(self):
+        return list(self.profiles)
+
+    def get(self, name):
+        return self.profiles.get(name)
+
+    @property
+    def selected(self):
+        return self.profiles[self.selected_name]
+
+    def select(self, name):
+        if name not in self.profiles:
+            raise KeyError(name)
+        self.selected_name = name
+        self.save()
+
+    def add(self, profile):
+        if profile.name in self.profiles:
+            raise ValueError(f"Já existe um perfil chamado '{profile.name}'.")
+        self.profiles[profile.name] = profile
+        self.save()
+        return profile
+
+    def delete(self, name):
+        if len(self.profiles) <= 1:
+            raise ValueError("É preciso manter pelo menos um perfil.")
+        del self.profiles[name]
+        if self.selected_name == name:
+            self.selected_name = next(iter(self.profiles))
+        self.save()
+
+    def save(self):
+        self.writer.schedule({
+            "format": PROFILES_FORMAT,
+            "selected": self.selected_name,
+            "profiles": {name: dict(profile.to_dict(), extra_jvm_arguments=list(profile.extra_jvm_arguments))
+                         for name, profile in self.profiles.items()},
+        })
+
+    def flush(self):
+        self.writer.flush()
+
+    def exists(self):
+        return os.path.isfile(self.path)
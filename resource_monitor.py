@@ -0,0 +1,356 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import ctypes
+import argparse
+import threading
+
+import numpy as np
+
+from jvm_profiles import system_memory_mb, MIN_HEAP_MB, MIN_SYSTEM_RESERVE_MB
+
+DEFAULT_INTERVAL = 1.0 # Uma amostra por segundo: ~20 µs de CPU por amostra
+DEFAULT_CAPACITY = 3600 # Uma hora de amostras (~70 KB)
+# Heap recomendado = maior conjunto vivo após GC × fator (regra usual: 3 a 4× o "live set")
+LIVE_SET_FACTOR = 3.0
+MIN_GC_EVENTS = 3 # Menos coletas que isso não dizem quanto o jogo realmente usa
+
+SAMPLE_DTYPE = np.dtype([
+    ("time", np.float32), # Segundos desde o início do monitor
+    ("rss_mb", np.float32),
+    ("cpu", np.float32), # Percentual de um núcleo (pode passar de 100)
+    ("threads", np.uint16),
+    ("heap_used_mb", np.float32), # Heap ocupado após o último GC (NaN sem log de GC)
+    ("heap_committed_mb", np.float32),
+])
+
+# "24M->5120K(2048M), 0.0061 secs" (Java 8, -XX:+PrintGC) ou "24M->5M(256M) 3.456ms" (Java 9+, -Xlog:gc)
+GC_LINE = re.compile(r"(\d+(?:\.\d+)?)([KMG])->(\d+(?:\.\d+)?)([KMG])\((\d+(?:\.\d+)?)([KMG])\),? (\d+(?:\.\d+)?) ?(secs|ms)")
+_UNIT_MB = {"K": 1 / 1024, "M": 1, "G": 1024}
+
+
+def gc_log_template(game_directory):
+    """Log de GC de cada jogo (um por PID, então jogos simultâneos não disputam o arquivo)."""
+    return os.path.join(game_directory, "logs", "gc-%p.log")
+
+
+def gc_log_arguments(java_major, path_template):
+    """Argumentos da JVM para um log de GC barato (uma linha por coleta). %p vira o PID."""
+    if java_major and java_major >= 9:
+        return [f"-Xlog:gc:file={path_template}"]
+    return [f"-Xloggc:{path_template}", "-XX:+PrintGC", "-XX:+PrintGCTimeStamps"]
+
+
+def parse_gc_line(line):
+    """(heap antes, heap depois, heap total, pausa em ms, coleta completa) em MB, ou None."""
+    match = GC_LINE.search(line)
+    if not match:
+        return None
+    before, before_unit, after, after_unit, total, total_unit, pause, pause_unit = match.groups()
+    pause_ms = float(pause) * (1000 if pause_unit == "secs" else 1)
+    full = "Full" in line or "Pause Full" in line
+    return (float(before) * _UNIT_MB[before_unit], float(after) * _UNIT_MB[after_unit],
+            float(total) * _UNIT_MB[total_unit], pause_ms, full)
+
+
+class SampleBuffer:
+    """Buffer circular de amostras em um array NumPy de tamanho fixo."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._data = np.zeros(capacity, dtype=SAMPLE_DTYPE)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def append(self, sample):
+        with self._lock:
+            self._data[self._count % len(self._data)] = sample
+            self._count += 1
+
+    def samples(self):
+        """Cópia das amostras em ordem cronológica."""
+        with self._lock:
+            capacity = len(self._data)
+            if self._count <= capacity:
+                return self._data[:self._count].copy()
+            start = self._count % capacity
+            return np.concatenate((self._data[start:], self._data[:start]))
+
+    def __len__(self):
+        return min(self._count, len(self._data))
+
+
+class _ProcSampler:
+    """RSS, tempo de CPU e threads lidos de /proc/<pid>/stat (Linux): uma leitura por amostra."""
+
+    def __init__(self, pid):
+        self.path = f"/proc/{pid}/stat"
+        self.ticks = os.sysconf("SC_CLK_TCK")
+        self.page_mb = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+    def read(self):
+        with open(self.path, "rb") as f:
+            stat = f.read()
+        # O nome do processo fica entre parênteses e pode conter espaços
+        fields = stat[stat.rindex(b")") + 2:].split()
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / self.ticks
+        return int(fields[21]) * self.page_mb, cpu_seconds, int(fields[17])
+
+
+class _WindowsSampler:
+    """RSS (working set) e tempo de CPU via kernel32; a contagem de threads não é lida no Windows."""
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+    class _MemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", ctypes.c_ulong), ("PageFaultCount", ctypes.c_ulong),
+            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    def __init__(self, pid):
+        self.kernel32 = ctypes.windll.kernel32
+        self.handle = self.kernel32.OpenProcess(self.PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not self.handle:
+            raise OSError(f"OpenProcess falhou para o PID {pid}")
+
+    def read(self):
+        counters = self._MemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        if not self.kernel32.K32GetProcessMemoryInfo(self.handle, ctypes.byref(counters), counters.cb):
+            raise OSError("K32GetProcessMemoryInfo falhou")
+        creation, exit_time, kernel, user = (ctypes.c_ulonglong() for _ in range(4))
+        if not self.kernel32.GetProcessTimes(self.handle, ctypes.byref(creation), ctypes.byref(exit_time),
+                                             ctypes.byref(kernel), ctypes.byref(user)):
+            raise OSError("GetProcessTimes falhou")
+        # Tempos em unidades de 100 ns
+        return counters.WorkingSetSize / (1024 * 1024), (kernel.value + user.value) / 1e7, 0
+
+    def close(self):
+        self.kernel32.CloseHandle(self.handle)
+
+
+def _process_sampler(pid):
+    try:
+        if sys.platform == "win32":
+            return _WindowsSampler(pid)
+        if os.path.exists(f"/proc/{pid}/stat"):
+            return _ProcSampler(pid)
+    except (OSError, AttributeError, ValueError):
+        pass
+    return None
+
+
+class ResourceMonitor:
+    """
+    Amostra memória, CPU, threads e GC de um jogo em execução, em uma thread própria e a uma
+    taxa fixa baixa. Cada amostra é uma leitura de /proc/<pid>/stat mais as linhas novas do
+    log de GC (lidas a partir do último offset), então o custo fica bem abaixo de 0,1% de um
+    núcleo; overhead_share() mede isso.
+    """
+
+    def __init__(self, pid, gc_log_path=None, interval=DEFAULT_INTERVAL, capacity=DEFAULT_CAPACITY, on_sample=None):
+        self.pid = pid
+        self.gc_log_path = gc_log_path.replace("%p", str(pid)) if gc_log_path else None
+        self.interval = interval
+        self.on_sample = on_sample
+        self.buffer = SampleBuffer(capacity)
+        self.peak_rss_mb = 0.0
+        self.peak_live_mb = 0.0 # Maior heap ocupado logo após um GC
+        self.peak_heap_mb = 0.0 # Maior heap ocupado antes de um GC
+        self.heap_committed_mb = 0.0
+        self.gc_count = 0
+        self.full_gc_count = 0
+        self.gc_pause_ms = 0.0
+        self.max_gc_pause_ms = 0.0
+        self.cpu_seconds = 0.0
+        self._heap_used_mb = float("nan")
+        self._gc_offset = 0
+        self._gc_partial = b""
+        self._sampler = _process_sampler(pid)
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+        self._own_cpu_seconds = 0.0
+
+    @property
+    def available(self):
+        return self._sampler is not None or self.gc_log_path is not None
+
+    def start(self):
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name=f"resource-monitor-{self.pid}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Para a amostragem e lê o que restou do log de GC."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(self.interval + 1)
+        self._read_gc_log()
+        if isinstance(self._sampler, _WindowsSampler):
+            self._sampler.close()
+        self._sampler = None
+
+    def _run(self):
+        last_cpu = last_time = None
+        while not self._stop.is_set():
+            own_start = time.thread_time()
+            now = time.monotonic()
+            rss_mb = cpu_percent = 0.0
+            threads = 0
+            if self._sampler is not None:
+                try:
+                    rss_mb, cpu_seconds, threads = self._sampler.read()
+                except (OSError, ValueError, IndexError):
+                    break # O processo terminou
+                if last_cpu is not None and now > last_time:
+                    cpu_percent = 100.0 * (cpu_seconds - last_cpu) / (now - last_time)
+                last_cpu, last_time = cpu_seconds, now
+                self.cpu_seconds = cpu_seconds
+                self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+            self._read_gc_log()
+            sample = (now - self._started, rss_mb, cpu_percent, min(threads, 65535), self._heap_used_mb,
+                      self.heap_committed_mb)
+            self.buffer.append(sample)
+            self._own_cpu_seconds += time.thread_time() - own_start
+            if self.on_sample:
+                self.on_sample(sample)
+            self._stop.wait(self.interval)
+
+    def _read_gc_log(self):
+        if not self.gc_log_path:
+            return
+        try:
+            with open(self.gc_log_path, "rb") as f:
+                f.seek(self._gc_offset)
+                chunk = f.read()
+        except OSError:
+            return # A JVM ainda não criou o arquivo
+        self._gc_offset += len(chunk)
+        lines = (self._gc_partial + chunk).split(b"\n")
+        self._gc_partial = lines.pop() # Linha ainda sendo escrita
+        for line in lines:
+            event = parse_gc_line(line.decode("utf-8", "replace"))
+            if event is None:
+                continue
+            before, after, committed, pause_ms, full = event
+            self.gc_count += 1
+            self.full_gc_count += full
+            self.gc_pause_ms += pause_ms
+            self.max_gc_pause_ms = max(self.max_gc_pause_ms, pause_ms)
+            self.peak_heap_mb = max(self.peak_heap_mb, before)
+            self.peak_live_mb = max(self.peak_live_mb, after)
+            self.heap_committed_mb = committed
+            self._heap_used_mb = after
+
+    def overhead_share(self):
+        """Fração de um núcleo gasta pela própria amostragem."""
+        if not self._started:
+            return 0.0
+        return self._own_cpu_seconds / max(time.monotonic() - self._started, 1e-9)
+
+    def summary(self):
+        samples = self.buffer.samples()
+        return {
+            "pid": self.pid,
+            "samples": int(len(samples)),
+            "duration_s": round(float(samples["time"][-1]), 1) if len(samples) else 0.0,
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "mean_cpu_percent": round(float(samples["cpu"][1:].mean()), 1) if len(samples) > 1 else 0.0,
+            "max_threads": int(samples["threads"].max()) if len(samples) else 0,
+            "gc_count": self.gc_count,
+            "full_gc_count": self.full_gc_count,
+            "gc_pause_ms": round(self.gc_pause_ms, 1),
+            "max_gc_pause_ms": round(self.max_gc_pause_ms, 1),
+            "peak_heap_mb": round(self.peak_heap_mb, 1),
+            "peak_live_mb": round(self.peak_live_mb, 1),
+            "heap_committed_mb": round(self.heap_committed_mb, 1),
+            "overhead_share": round(self.overhead_share(), 6),
+        }
+
+    def recommendation(self, current_heap_mb=None, total_memory_mb=None):
+        """RamRecommendation para a próxima sessão, ou None se não houve dados suficientes."""
+        return recommend_ram(self.summary(), current_heap_mb, total_memory_mb)
+
+
+class RamRecommendation:
+    def __init__(self, ram_gb, heap_mb, reason, source):
+        self.ram_gb = ram_gb
+        self.heap_mb = heap_mb
+        self.reason = reason
+        self.source = source # "gc" (heap vivo medido) ou "rss" (estimativa pela memória do processo)
+
+    def to_dict(self):
+        return {"ram_gb": self.ram_gb, "heap_mb": self.heap_mb, "reason": self.reason, "source": self.source}
+
+    def __repr__(self):
+        return f"RamRecommendation(-Xmx{self.ram_gb}G, {self.source})"
+
+
+def recommend_ram(summary, current_heap_mb=None, total_memory_mb=None):
+    """
+    Sugere o -Xmx (em GB inteiros, como o slider) a partir de uma sessão.
+
+    Com log de GC: o maior heap vivo após uma coleta × LIVE_SET_FACTOR. Sem log de GC: o pico de
+    RSS (heap + metaspace + memória nativa) é um teto, então a sugestão é só não passar dele.
+    """
+    if total_memory_mb is None:
+        total_memory_mb = system_memory_mb()
+    if summary["peak_live_mb"] > 0 and summary["gc_count"] >= MIN_GC_EVENTS:
+        heap_mb = summary["peak_live_mb"] * LIVE_SET_FACTOR
+        source = "gc"
+        reason = (f"maior heap vivo após GC: {summary['peak_live_mb']:.0f} MB "
+                  f"(pico antes do GC: {summary['peak_heap_mb']:.0f} MB, {summary['gc_count']} coletas)")
+        if summary["full_gc_count"]:
+            # Coletas completas indicam que o heap ficou apertado
+            heap_mb = max(heap_mb, summary["peak_heap_mb"] * 1.25)
+            reason += f"; {summary['full_gc_count']} coleta(s) completa(s)"
+    elif summary["peak_rss_mb"] > 0 and summary["samples"] >= 30:
+        heap_mb = summary["peak_rss_mb"] * 0.75
+        source = "rss"
+        reason = f"pico de memória do processo: {summary['peak_rss_mb']:.0f} MB (sem log de GC)"
+    else:
+        return None
+    ram_gb = max(MIN_HEAP_MB // 1024, math.ceil(heap_mb / 1024))
+    if total_memory_mb:
+        ram_gb = min(ram_gb, max(1, (total_memory_mb - MIN_SYSTEM_RESERVE_MB) // 1024))
+    if current_heap_mb:
+        reason += f"; atual: {current_heap_mb / 1024:.0f} GB"
+    return RamRecommendation(int(ram_gb), int(heap_mb), reason, source)
+
+
+def main(argv=None):
+    """Modo sem interface: python resource_monitor.py <pid> [--gc-log <arquivo>] [--duration 60]"""
+    parser = argparse.ArgumentParser(description="Monitora memória, CPU e GC de um jogo em execução.")
+    parser.add_argument("pid", type=int)
+    parser.add_argument("--gc-log", help="Log de GC da JVM (aceita %%p para o PID)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument("--duration", type=float, default=None, help="Segundos (padrão: até o processo terminar)")
+    args = parser.parse_args(argv)
+
+    monitor = ResourceMonitor(args.pid, args.gc_log, args.interval)
+    if not monitor.available:
+        print("Erro: não é possível monitorar este processo nesta plataforma.", file=sys.stderr)
+        return 1
+    monitor.start()
+    try:
+        monitor._thread.join(args.duration)
+    except KeyboardInterrupt:
+        pass
+    monitor.stop()
+    summary = monitor.summary()
+    recommendation = monitor.recommendation()
+    summary["recommendation"] = recommendation.to_dict() if recommendation else None
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+import re
+import sys
+import json
+import time
+import struct
+import asyncio
+import argparse
+
+from game_files import user_cache_path, user_config_path, read_json, write_json_atomic
+
+DEFAULT_PORT = 25565
+PROTOCOL_VERSION = 47 # Minecraft 1.8.x
+DEFAULT_TIMEOUT = 3.0 # Segundos por servidor (conexão + status + ping)
+DEFAULT_TTL = 60.0 # Segundos em que um status no cache é considerado atual
+DEFAULT_CONCURRENCY = 32
+MAX_PACKET_SIZE = 2 * 1024 * 1024 # O status de um servidor 1.8 (com favicon) fica bem abaixo disso
+FORMATTING_CODES = re.compile("§.")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def parse_address(address):
+    """"host", "host:porta" ou "[ipv6]:porta" -> (host, porta)."""
+    address = address.strip()
+    if address.startswith("["):
+        host, _, rest = address[1:].partition("]")
+        port = rest[1:] if rest.startswith(":") else ""
+    elif address.count(":") == 1:
+        host, port = address.split(":")
+    else:
+        host, port = address, ""
+    if not host:
+        raise ValueError(f"Endereço de servidor inválido: {address!r}")
+    try:
+        port = int(port) if port else DEFAULT_PORT
+    except ValueError:
+        raise ValueError(f"Porta inválida em {address!r}") from None
+    if not 0 < port < 65536:
+        raise ValueError(f"Porta inválida em {address!r}")
+    return host, port
+
+
+def encode_varint(value):
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_varint(data, offset=0):
+    """Retorna (valor, próximo offset)."""
+    value = 0
+    for shift in range(0, 35, 7):
+        if offset >= len(data):
+            raise ProtocolError("VarInt incompleto")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return (value - (1 << 32) if value & 0x80000000 else value), offset
+    raise ProtocolError("VarInt longo demais")
+
+
+def encode_string(text):
+    data = text.encode("utf-8")
+    return encode_varint(len(data)) + data
+
+
+def packet(packet_id, payload=b""):
+    body = encode_varint(packet_id) + payload
+    return encode_varint(len(body)) + body
+
+
+async def read_varint(reader):
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value
+    raise ProtocolError("VarInt longo demais")
+
+
+async def read_packet(reader):
+    """Lê um pacote (sem compressão, como no estado de status). Retorna (id, payload)."""
+    length = await read_varint(reader)
+    if not 0 < length <= MAX_PACKET_SIZE:
+        raise ProtocolError(f"Tamanho de pacote inválido: {length}")
+    data = await reader.readexactly(length)
+    packet_id, offset = decode_varint(data)
+    return packet_id, data[offset:]
+
+
+def flatten_motd(description):
+    """Texto simples do MOTD (string ou componente de chat com "extra"), sem códigos de cor §."""
+    if isinstance(description, str):
+        return FORMATTING_CODES.sub("", description)
+    if isinstance(description, dict):
+        text = description.get("text", "") + "".join(flatten_motd(part) for part in description.get("extra", ()))
+        return FORMATTING_CODES.sub("", text)
+    if isinstance(description, list):
+        return "".join(flatten_motd(part) for part in description)
+    return ""
+
+
+def _as_int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+
+class ServerStatus:
+    """Resultado de um Server List Ping (online ou com o erro que impediu a consulta)."""
+
+    def __init__(self, address, online=False, motd="", players_online=0, players_max=0, version="",
+                 protocol=None, latency_ms=None, error="", checked_at=None):
+        self.address = address
+        self.online = online
+        self.motd = motd
+        self.players_online = players_online
+        self.players_max = players_max
+        self.version = version
+        self.protocol = protocol
+        self.latency_ms = latency_ms
+        self.error = error
+        self.checked_at = checked_at if checked_at is not None else time.time()
+
+    @classmethod
+    def from_response(cls, address, response, latency_ms):
+        """Status a partir do JSON do servidor. ProtocolError se não for um objeto; campos malformados ficam vazios."""
+        if not isinstance(response, dict):
+            raise ProtocolError(f"Resposta de status inválida: {type(response).__name__} em vez de objeto")
+        players = response.get("players")
+        players = players if isinstance(players, dict) else {}
+        version = response.get("version")
+        version = version if isinstance(version, dict) else {}
+        protocol = version.get("protocol")
+        return cls(address, True, flatten_motd(response.get("description", "")).strip(),
+                   _as_int(players.get("online")), _as_int(players.get("max")), str(version.get("name") or ""),
+                   protocol if isinstance(protocol, int) and not isinstance(protocol, bool) else None, latency_ms)
+
+    @property
+    def compatible(self):
+        """O servidor aceita clientes 1.8 (None quando não se sabe)."""
+        return None if self.protocol is None else self.protocol == PROTOCOL_VERSION
+
+    def age(self):
+        return time.time() - self.checked_at
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def describe(self):
+        if not self.online:
+            return f"{self.address}: offline ({self.error})"
+        return (f"{self.address}: {self.players_online}/{self.players_max} jogadores, {self.version}, "
+                f"{self.latency_ms:.0f} ms - {self.motd}")
+
+
+async def ping_server(address, timeout=DEFAULT_TIMEOUT):
+    """
+    Consulta um servidor pelo Server List Ping da 1.7+ (handshake, status e ping/pong).
+    Nunca lança exceção: falhas e o tempo esgotado voltam como ServerStatus offline.
+    """
+    try:
+        host, port = parse_address(address)
+        return await asyncio.wait_for(_ping(address, host, port), timeout)
+    except asyncio.TimeoutError:
+        return ServerStatus(address, error="tempo esgotado")
+    except (OSError, ValueError, ProtocolError, asyncio.IncompleteReadError) as e:
+        return ServerStatus(address, error=str(e) or type(e).__name__)
+    except Exception as e: # Resposta que nenhuma validação previu: um servidor ruim não derruba a lista toda
+        return ServerStatus(address, error=f"resposta inválida ({type(e).__name__}: {e})")
+
+
+async def _ping(address, host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        handshake = encode_varint(PROTOCOL_VERSION) + encode_string(host) + struct.pack(">H", port) + encode_varint(1)
+        writer.write(packet(0x00, handshake) + packet(0x00))
+        started = time.perf_counter()
+        await writer.drain()
+        packet_id, payload = await read_packet(reader)
+        status_ms = (time.perf_counter() - started) * 1000
+        if packet_id != 0x00:
+            raise ProtocolError(f"Pacote inesperado: {packet_id:#x}")
+        length, offset = decode_varint(payload)
+        try:
+            response = json.loads(payload[offset:offset + length].decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ProtocolError(f"Resposta de status inválida: {e}") from None
+
+        # A latência vem do ping/pong; servidores que não respondem o ping ficam com o tempo do status
+        latency_ms = status_ms
+        token = int(time.time() * 1000) & 0x7FFFFFFFFFFFFFFF
+        try:
+            writer.write(packet(0x01, struct.pack(">q", token)))
+            started = time.perf_counter()
+            await writer.drain()
+            packet_id, payload = await read_packet(reader)
+            if packet_id == 0x01 and payload == struct.pack(">q", token):
+                latency_ms = (time.perf_counter() - started) * 1000
+        except (OSError, ProtocolError, asyncio.IncompleteReadError):
+            pass
+        return ServerStatus.from_response(address, response, round(latency_ms, 1))
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+
+async def ping_many(addresses, timeout=DEFAULT_TIMEOUT, concurrency=DEFAULT_CONCURRENCY, on_result=None):
+    """
+    Consulta vários servidores ao mesmo tempo (no máximo concurrency conexões abertas).
+    on_result(status) é chamado assim que cada um responde. Retorna {endereço: ServerStatus}.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(address):
+        async with semaphore:
+            status = await ping_server(address, timeout)
+        if on_result:
+            on_result(status)
+        return status
+
+    results = await asyncio.gather(*(one(address) for address in dict.fromkeys(addresses)))
+    return {status.address: status for status in results}
+
+
+class StatusCache:
+    """
+    Últimos status consultados, em server_status.json na pasta de cache. Um status mais novo
+    que ttl segundos é considerado atual; os mais velhos continuam disponíveis para a lista
+    aparecer preenchida enquanto a atualização em segundo plano não termina.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL):
+        self.path = path or user_cache_path("server_status.json")
+        self.ttl = ttl
+        self.entries = {}
+        for data in read_json(self.path, {}).values():
+            try:
+                status = ServerStatus.from_dict(data)
+            except TypeError:
+                continue
+            self.entries[status.address] = status
+
+    def get(self, address):
+        return self.entries.get(address)
+
+    def is_fresh(self, address):
+        status = self.entries.get(address)
+        return status is not None and status.age() < self.ttl
+
+    def stale(self, addresses):
+        """Endereços sem status ou com status vencido."""
+        return [address for address in addresses if not self.is_fresh(address)]
+
+    def put(self, status):
+        self.entries[status.address] = status
+
+    def save(self):
+        write_json_atomic(self.path, {address: status.to_dict() for address, status in self.entries.items()})
+
+    async def refresh(self, addresses, force=False, timeout=DEFAULT_TIMEOUT, on_result=None):
+        """Consulta os servidores vencidos (ou todos, com force) e atualiza o cache."""
+        def store(status):
+            self.put(status)
+            if on_result:
+                on_result(status)
+
+        pending = list(addresses) if force else self.stale(addresses)
+        if pending:
+            await ping_many(pending, timeout, on_result=store)
+            self.save()
+        return {address: self.entries[address] for address in addresses if address in self.entries}
+
+
+class ServerList:
+    """Servidores salvos pelo jogador (nome e endereço), em servers.json na pasta de configuração."""
+
+    def __init__(self, path=None):
+        self.path = path or user_config_path("servers.json")
+        self.servers = [entry for entry in read_json(self.path, {}).get("servers", [])
+                        if entry.get("name") and entry.get("address")]
+
+    def addresses(self):
+        return [entry["address"] for entry in self.servers]
+
+    def add(self, name, address):
+        parse_address(address) # ValueError se o endereço for inválido
+        if address in self.addresses():
+            raise ValueError(f"O servidor {address} já está na lista.")
+        self.servers.append({"name": name, "address": address})
+        self.save()
+
+    def remove(self, address):
+        self.servers = [entry for entry in self.servers if entry["address"] != address]
+        self.save()
+
+    def save(self):
+        write_json_atomic(self.path, {"servers": self.servers})
+
+
+async def start_fake_server(response, host="127.0.0.1", port=0, delay=0.0, answer_ping=True):
+    """
+    Servidor falso que responde ao Server List Ping com response (o JSON de status), para
+    testar o cliente sem um servidor de verdade. delay atrasa a resposta (testa o timeout).
+    Retorna o asyncio.Server; a porta escolhida está em server.sockets[0].getsockname()[1].
+    """
+    async def handle(reader, writer):
+        try:
+            await read_packet(reader) # Handshake
+            await read_packet(reader) # Pedido de status
+            if delay:
+                await asyncio.sleep(delay)
+            writer.write(packet(0x00, encode_string(json.dumps(response))))
+            await writer.drain()
+            packet_id, payload = await read_packet(reader)
+            if packet_id == 0x01 and answer_ping:
+                writer.write(packet(0x01, payload))
+                await writer.drain()
+        except (OSError, ProtocolError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+def fake_response(motd="Servidor de teste", online=3, maximum=20, version="1.8.8", protocol=PROTOCOL_VERSION):
+    return {"version": {"name": version, "protocol": protocol}, "players": {"online": online, "max": maximum},
+            "description": {"text": motd}}
+
+
+def main(argv=None):
+    """Modo sem interface: python server_status.py ping host[:porta] ... | python server_status.py fake-server"""
+    parser = argparse.ArgumentParser(description="Status de servidores Minecraft 1.8 (Server List Ping).")
+    parser.add_argument("command", choices=["ping", "list", "fake-server"])
+    parser.add_argument("addresses", nargs="*", help="ping: endereços (padrão: a lista salva)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--force", action="store_true", help="ping: ignora o cache")
+    parser.add_argument("--json", action="store_true", help="ping: imprime os resultados em JSON")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="fake-server: porta")
+    parser.add_argument("--motd", default="Servidor de teste", help="fake-server: MOTD")
+    args = parser.parse_args(argv)
+
+    if args.command == "fake-server":
+        async def serve():
+            server = await start_fake_server(fake_response(args.motd), port=args.port)
+            print(f"Servidor falso em 127.0.0.1:{server.sockets[0].getsockname()[1]}", flush=True)
+            async with server:
+                await server.serve_forever()
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    server_list = ServerList()
+    if args.command == "list":
+        for entry in server_list.servers:
+            print(f"{entry['name']}\t{entry['address']}")
+        return 0
+
+    addresses = args.addresses or server_list.addresses()
+    if not addresses:
+        print("Nenhum servidor informado ou salvo.", file=sys.stderr)
+        return 1
+    cache = StatusCache()
+    results = asyncio.run(cache.refresh(addresses, force=args.force, timeout=args.timeout))
+    if args.json:
+        print(json.dumps([results[address].to_dict() for address in addresses], indent=2))
+    else:
+        for address in addresses:
+            print(results[address].describe())
+    return 0 if any(status.online for status in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+import os
+import time
+import threading
+import configparser
+
+from game_files import user_config_path, read_json, write_json_atomic
+from jvm_profiles import JVM_PROFILES, DEFAULT_PROFILE
+
+SETTINGS_FORMAT = 1
+DEFAULT_DELAY = 0.5 # Segundos sem mudanças antes de gravar (um arraste do slider vira uma gravação só)
+LEGACY_INI_NAME = "launcher_settings.ini"
+LEGACY_SECTION = "LauncherSettings"
+DEFAULT_PARTICLES = 50
+MAX_PARTICLES = 1000
+# Quantidades de partículas do fundo oferecidas na interface: (quantidade, rótulo)
+PARTICLE_LEVELS = (
+    (0, "Sem partículas"),
+    (25, "Poucas partículas"),
+    (DEFAULT_PARTICLES, "Partículas normais"),
+    (150, "Muitas partículas"),
+)
+
+# Campos das configurações: tipo e valor padrão
+SETTINGS_FIELDS = {
+    "nickname": (str, ""),
+    "ram_gb": (int, 2), # Padrão de RAM dos perfis novos
+    "jvm_profile": (str, DEFAULT_PROFILE), # Padrão de JVM dos perfis novos
+    "skin_path": (str, ""),
+    "window_geometry": (str, ""), # QMainWindow.saveGeometry() em base64
+    "particle_count": (int, DEFAULT_PARTICLES), # Partículas da animação de fundo (0 = desligada)
+}
+
+
+class DebouncedWriter:
+    """
+    Grava um JSON de forma atômica, numa thread própria, só depois de delay segundos sem
+    novos pedidos: vários schedule() seguidos viram uma única gravação do dado mais recente.
+    """
+
+    def __init__(self, path, delay=DEFAULT_DELAY):
+        self.path = path
+        self.delay = delay
+        self.writes = 0
+        self.last_error = None # Último erro de gravação na thread (o próximo schedule tenta de novo)
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock() # Uma gravação por vez (o temporário tem nome fixo por processo)
+        self._pending = None
+        self._deadline = None
+        self._thread = None
+
+    def schedule(self, data):
+        """Agenda a gravação de data (já copiado pelo chamador); com delay 0 grava na hora."""
+        if self.delay <= 0:
+            self._write(data)
+            return
+        with self._condition:
+            self._pending = data
+            self._deadline = time.monotonic() + self.delay
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="grcraft-settings-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._deadline is not None and time.monotonic() < self._deadline:
+                    self._condition.wait(self._deadline - time.monotonic())
+                if self._deadline is None:
+                    self._thread = None
+                    return
+                data, self._pending, self._deadline = self._pending, None, None
+            try:
+                self._write(data)
+            except OSError as e:
+                self.last_error = e
+
+    def _write(self, data):
+        with self._write_lock:
+            write_json_atomic(self.path, data)
+            self.writes += 1
+
+    def flush(self):
+        """Grava agora o que estiver pendente e espera uma gravação em andamento terminar."""
+        with self._condition:
+            data, self._pending, self._deadline = self._pending, None, None
+            self._condition.notify()
+        if data is not None:
+            self._write(data)
+        else:
+            with self._write_lock:
+                pass
+
+    def has_pending(self):
+        with self._condition:
+            return self._deadline is not None
+
+
+def find_legacy_ini():
+    """launcher_settings.ini das versões antigas (gravado na pasta de onde o launcher era aberto)."""
+    for directory in (os.getcwd(), os.path.dirname(os.path.abspath(__file__))):
+        path = os.path.join(directory, LEGACY_INI_NAME)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def read_legacy_ini(path):
+    """Valores do INI antigo convertidos para os campos atuais (os inválidos são ignorados)."""
+    config = configparser.ConfigParser()
+    try:
+        config.read(path, encoding="utf-8")
+    except (configparser.Error, UnicodeDecodeError):
+        return {}
+    if LEGACY_SECTION not in config:
+        return {}
+    section = config[LEGACY_SECTION]
+    values = {}
+    for field, key in (("nickname", "last_nickname"), ("ram_gb", "last_ram_gb"), ("jvm_profile", "jvm_profile"),
+                       ("skin_path", "skin_path")):
+        if key in section:
+            values[field] = section[key]
+    return values
+
+
+class SettingsStore:
+    """
+    Configurações do launcher em settings.json na pasta de configuração do usuário.
+
+    Os valores ficam em memória e são tipados (SETTINGS_FIELDS); set() só agenda a gravação,
+    que acontece numa thread depois de uma pausa (DebouncedWriter). Na primeira execução,
+    o launcher_settings.ini antigo é importado (e deixado como estava).
+    """
+
+    def __init__(self, path=None, delay=DEFAULT_DELAY, legacy_ini=None):
+        self.path = path or user_config_path("settings.json")
+        self.writer = DebouncedWriter(self.path, delay)
+        self.migrated_from = None
+        self._lock = threading.Lock()
+        self.values = {name: default for name, (_type, default) in SETTINGS_FIELDS.items()}
+        data = read_json(self.path)
+        if isinstance(data, dict) and data.get("format") == SETTINGS_FORMAT:
+            self._load(data.get("settings", {}))
+        elif data is None:
+            legacy_ini = legacy_ini or find_legacy_ini()
+            if legacy_ini:
+                self._load(read_legacy_ini(legacy_ini))
+                self.migrated_from = legacy_ini
+                self.writer.schedule(self._snapshot())
+
+    def _load(self, values):
+        for name, value in values.items():
+            try:
+                self.values[name] = self._coerce(name, value)
+            except (KeyError, ValueError, TypeError):
+                continue # Campo desconhecido ou inválido: fica o padrão
+
+    @staticmethod
+    def _coerce(name, value):
+        field_type = SETTINGS_FIELDS[name][0]
+        value = field_type(value)
+        if name == "jvm_profile" and value not in JVM_PROFILES:
+            raise ValueError(f"Perfil de JVM desconhecido: {value}")
+        if name == "ram_gb" and value < 1:
+            raise ValueError("A RAM precisa ser de pelo menos 1 GB")
+        if name == "particle_count" and not 0 <= value <= MAX_PARTICLES:
+            raise ValueError(f"A quantidade de partículas precisa estar entre 0 e {MAX_PARTICLES}")
+        return value
+
+    def _snapshot(self):
+        return {"format": SETTINGS_FORMAT, "settings": dict(self.values)}
+
+    def get(self, name):
+        return self.values[name]
+
+    def set(self, **values):
+        """Atualiza campos (KeyError se o campo não existir, ValueError se o valor for inválido)."""
+        with self._lock:
+            changed = False
+            for name, value in values.items():
+                value = self._coerce(name, value)
+                if self.values[name] != value:
+                    self.values[name] = value
+                    changed = True
+            if changed:
+                self.writer.schedule(self._snapshot())
+        return changed
+
+    def flush(self):
+        self.writer.flush()
+
+    def exists(self):
+        return os.path.isfile(self.path)
@@ -0,0 +1,261 @@
+import os
+import sys
+import time
+import json
+import shutil
+import argparse
+import threading
+
+from game_files import user_data_path, file_sha1, link_or_copy, read_json, write_json_atomic, game_files
+
+# Blobs mais novos que isso nunca são apagados pelo coletor (podem estar sendo ligados agora)
+GC_MIN_AGE_SECONDS = 3600
+
+
+def default_store():
+    """Store compartilhado do usuário, ou None se GRCRAFT_STORE=off."""
+    root = os.environ.get("GRCRAFT_STORE")
+    if root and root.lower() in ("off", "0", "no"):
+        return None
+    return ContentStore(root or None)
+
+
+class ContentStore:
+    """
+    Store de arquivos endereçado pelo SHA-1, compartilhado por todos os diretórios do jogo.
+
+    Bibliotecas, jar do cliente e objetos de assets ficam uma única vez em
+    <store>/objects/<2 primeiros>/<sha1>; cada instância recebe um hardlink para o
+    blob (symlink se o hardlink não for possível, cópia em último caso). Um blob
+    sem nenhum hardlink além do próprio e sem symlink registrado é lixo e pode ser
+    removido pelo gc().
+    """
+
+    def __init__(self, root=None):
+        self.root = root or user_data_path("store")
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.symlinks_path = os.path.join(self.root, "symlinks.json")
+        self._symlinks = None
+        self._symlinks_changed = False
+        self._lock = threading.Lock()
+        self.stats = {"hardlink": 0, "symlink": 0, "copy": 0, "reused": 0, "adopted": 0, "discarded": 0}
+
+    def blob_path(self, sha1):
+        return os.path.join(self.objects_dir, sha1[:2], sha1)
+
+    def has(self, sha1):
+        return os.path.isfile(self.blob_path(sha1))
+
+    def _load_symlinks(self):
+        if self._symlinks is None:
+            self._symlinks = read_json(self.symlinks_path, {})
+        return self._symlinks
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _link(self, sha1, path):
+        """Troca o arquivo em path por um link para o blob (sem nunca deixar path ausente)."""
+        blob = self.blob_path(sha1)
+        tmp_path = f"{path}.{threading.get_ident()}.link"
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        mode = link_or_copy(blob, tmp_path)
+        os.replace(tmp_path, path)
+        self._count(mode)
+        if mode == "symlink":
+            # Symlinks não aparecem no st_nlink do blob: ficam registrados para o gc()
+            with self._lock:
+                self._load_symlinks()[os.path.abspath(path)] = sha1
+                self._symlinks_changed = True
+        return mode
+
+    def adopt(self, path, sha1):
+        """
+        Coloca um arquivo já verificado no store (se o blob ainda não existir) e o
+        substitui por um link para o blob. Arquivos que já são o blob não são tocados.
+        """
+        blob = self.blob_path(sha1)
+        try:
+            if os.path.isfile(blob) and os.path.samefile(path, blob):
+                return
+        except OSError:
+            return
+        if not os.path.isfile(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            tmp_blob = f"{blob}.{os.getpid()}.{threading.get_ident()}.tmp"
+            if link_or_copy(path, tmp_blob) == "symlink":
+                # O blob precisa ser um arquivo de verdade, nunca um link para uma instância
+                os.remove(tmp_blob)
+                shutil.copy2(path, tmp_blob)
+            os.replace(tmp_blob, blob)
+            self._count("adopted")
+            if os.path.samefile(path, blob):
+                return
+        self._link(sha1, path)
+
+    def discard(self, sha1):
+        """Remove um blob (ex.: corrompido). As instâncias ligadas a ele continuam com o arquivo."""
+        try:
+            os.remove(self.blob_path(sha1))
+        except FileNotFoundError:
+            return False
+        self._count("discarded")
+        return True
+
+    def verified(self, sha1):
+        """
+        True se o blob existe e o conteúdo ainda bate com o SHA-1. Como as instâncias são
+        hardlinks do blob, um arquivo corrompido numa instância corrompe o blob também:
+        um blob inválido é removido para que o arquivo seja baixado de novo.
+        """
+        if not self.has(sha1):
+            return False
+        try:
+            if file_sha1(self.blob_path(sha1)) == sha1:
+                return True
+        except OSError:
+            return False
+        self.discard(sha1)
+        return False
+
+    def invalidate(self, path, checksums):
+        """Descarta os blobs de um arquivo encontrado corrompido (antes do reparo apagá-lo)."""
+        for sha1 in checksums:
+            blob = self.blob_path(sha1)
+            try:
+                linked = os.path.isfile(path) and os.path.isfile(blob) and os.path.samefile(path, blob)
+            except OSError:
+                linked = False
+            if linked:
+                self.discard(sha1)
+            else:
+                self.verified(sha1)
+
+    def link_into(self, path, checksums):
+        """Se algum dos SHA-1 aceitos já estiver no store (e íntegro), cria o arquivo a partir dele. Retorna True se criou."""
+        for sha1 in checksums:
+            if self.verified(sha1):
+                self._link(sha1, path)
+                self._count("reused")
+                return True
+        return False
+
+    def save(self):
+        """Grava o registro de symlinks (chamado ao fechar o DownloadEngine)."""
+        with self._lock:
+            if self._symlinks_changed:
+                write_json_atomic(self.symlinks_path, self._symlinks)
+                self._symlinks_changed = False
+
+    def link_instance(self, version, game_directory):
+        """Deduplica uma instância já instalada: todo arquivo válido passa a ser um link para o store."""
+        from install_index import InstallIndex
+
+        linked = skipped = 0
+        for game_file in game_files(version, game_directory):
+            if not game_file.checksums or not os.path.isfile(game_file.path):
+                skipped += 1
+                continue
+            sha1 = file_sha1(game_file.path)
+            if sha1 not in game_file.checksums:
+                skipped += 1
+                continue
+            self.adopt(game_file.path, sha1)
+            linked += 1
+        self.save()
+        # Os links mudam o stat dos arquivos: atualiza o índice para não parecer uma instalação alterada
+        index = InstallIndex(game_directory, version)
+        index.load()
+        index.rebuild()
+        index.save()
+        return linked, skipped
+
+    def gc(self, min_age=GC_MIN_AGE_SECONDS, dry_run=False):
+        """Apaga blobs que nenhuma instância usa mais. Retorna (blobs removidos, bytes liberados, blobs mantidos)."""
+        with self._lock:
+            symlinks = self._load_symlinks()
+            # Symlinks cujo arquivo foi apagado ou substituído não seguram mais o blob
+            live = {}
+            for link, sha1 in symlinks.items():
+                if os.path.islink(link) and os.path.realpath(link) == os.path.realpath(self.blob_path(sha1)):
+                    live[link] = sha1
+            if live != symlinks:
+                self._symlinks = live
+                self._symlinks_changed = True
+            referenced = set(live.values())
+
+        removed = freed = kept = 0
+        now = time.time()
+        if os.path.isdir(self.objects_dir):
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                if not os.path.isdir(prefix_dir):
+                    continue
+                for name in os.listdir(prefix_dir):
+                    path = os.path.join(prefix_dir, name)
+                    st = os.stat(path)
+                    # ctime muda ao criar links: um blob recém-ligado nunca é considerado velho
+                    recent = now - max(st.st_mtime, st.st_ctime) < min_age
+                    if recent or (not name.endswith(".tmp") and (st.st_nlink > 1 or name in referenced)):
+                        kept += 1
+                        continue
+                    removed += 1
+                    freed += st.st_size
+                    if not dry_run:
+                        os.remove(path)
+        if not dry_run:
+            self.save()
+        return removed, freed, kept
+
+    def usage(self):
+        """(blobs, bytes no store, bytes economizados pelos hardlinks extras)."""
+        blobs = size = saved = 0
+        if os.path.isdir(self.objects_dir):
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                for entry in os.scandir(prefix_dir) if os.path.isdir(prefix_dir) else ():
+                    st = entry.stat()
+                    blobs += 1
+                    size += st.st_size
+                    # nlink conta o próprio blob + uma cópia "de graça" para a primeira instância
+                    saved += st.st_size * max(0, st.st_nlink - 2)
+        return blobs, size, saved
+
+
+def main(argv=None):
+    """Modo sem interface: python shared_store.py {link,gc,usage} [--game-dir <pasta>]"""
+    parser = argparse.ArgumentParser(description="Store compartilhado de bibliotecas e assets entre instâncias.")
+    parser.add_argument("command", choices=["link", "gc", "usage"])
+    parser.add_argument("--store", default=None, help="Pasta do store (padrão: GRCRAFT_STORE ou a pasta de dados do usuário)")
+    parser.add_argument("--game-dir", help="Instância a deduplicar (comando link)")
+    parser.add_argument("--version", default="1.8.8-forge1.8.8-11.15.0.1655")
+    parser.add_argument("--dry-run", action="store_true", help="gc: só mostra o que seria apagado")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    store = ContentStore(args.store)
+    if args.command == "link":
+        if not args.game_dir:
+            parser.error("link precisa de --game-dir")
+        linked, skipped = store.link_instance(args.version, args.game_dir)
+        result = {"linked": linked, "skipped": skipped, **store.stats}
+    elif args.command == "gc":
+        removed, freed, kept = store.gc(dry_run=args.dry_run)
+        result = {"removed": removed, "bytes_freed": freed, "kept": kept, "dry_run": args.dry_run}
+    else:
+        blobs, size, saved = store.usage()
+        result = {"root": store.root, "blobs": blobs, "bytes": size, "bytes_saved": saved}
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for key, value in result.items():
+            print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
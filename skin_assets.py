@@ -0,0 +1,392 @@
+import os
+import sys
+import json
+import base64
+import struct
+import hashlib
+import argparse
+import urllib.parse
+
+import numpy as np
+
+from game_files import user_cache_path, file_sha1, read_json, write_json_atomic
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_GLTF = os.path.join(ROOT_DIR, "model.gltf")
+MODEL_GLB = os.path.join(ROOT_DIR, "model.glb")
+VENDOR_DIR = os.path.join(ROOT_DIR, "vendor")
+
+# Dependências do visualizador (index.html carrega vendor/ primeiro e só usa a CDN se faltar o arquivo)
+VENDOR_FILES = {
+    "three.min.js": "https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js",
+    "GLTFLoader.js": "https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/loaders/GLTFLoader.js",
+}
+
+GLB_MAGIC = 0x46546C67 # "glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+QUANTIZATION_EXTENSION = "KHR_mesh_quantization"
+COMPONENT_DTYPES = {5120: np.int8, 5121: np.uint8, 5122: np.int16, 5123: np.uint16, 5125: np.uint32, 5126: np.float32}
+DTYPE_COMPONENTS = {np.dtype(dtype): component for component, dtype in COMPONENT_DTYPES.items()}
+TYPE_SIZES = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT2": 4, "MAT3": 9, "MAT4": 16}
+SIZE_TYPES = {1: "SCALAR", 2: "VEC2", 3: "VEC3", 4: "VEC4"}
+
+THUMBNAIL_SIZE = 64
+# Face da frente de cada parte na skin (x, y, largura, altura): (base, camada externa ou None)
+# e a posição dela na miniatura de 16x32 (o braço/perna direito do personagem fica à esquerda)
+SKIN_FRONT_PARTS = (
+    ((8, 8, 8, 8), (40, 8), (4, 0)), # Cabeça / chapéu
+    ((20, 20, 8, 12), (20, 36), (4, 8)), # Tronco / jaqueta
+    ((44, 20, 4, 12), (44, 36), (0, 8)), # Braço direito / manga
+    ((36, 52, 4, 12), (52, 52), (12, 8)), # Braço esquerdo / manga
+    ((4, 20, 4, 12), (4, 36), (4, 20)), # Perna direita / calça
+    ((20, 52, 4, 12), (4, 52), (8, 20)), # Perna esquerda / calça
+)
+
+
+def _decode_uri(uri, base_directory):
+    if uri.startswith("data:"):
+        header, _, payload = uri.partition(",")
+        return base64.b64decode(payload) if header.endswith(";base64") else urllib.parse.unquote_to_bytes(payload)
+    with open(os.path.join(base_directory, urllib.parse.unquote(uri)), "rb") as f:
+        return f.read()
+
+
+def _read_accessor(gltf, buffers, index):
+    """Valores de um accessor como array (count, componentes), respeitando byteStride."""
+    accessor = gltf["accessors"][index]
+    dtype = np.dtype(COMPONENT_DTYPES[accessor["componentType"]])
+    components = TYPE_SIZES[accessor["type"]]
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    data = buffers[view["buffer"]]
+    offset = view.get("byteOffset", 0) + accessor.get("byteOffset", 0)
+    stride = view.get("byteStride") or dtype.itemsize * components
+    values = np.ndarray((accessor["count"], components), dtype.newbyteorder("<"), data, offset,
+                        (stride, dtype.itemsize))
+    values = values.astype(dtype.newbyteorder("="))
+    if accessor.get("normalized"):
+        info = np.iinfo(dtype)
+        values = np.maximum(values / info.max, -1.0).astype(np.float32)
+    return values
+
+
+def _accessor_semantics(gltf):
+    """Uso de cada accessor nas malhas ("POSITION", "NORMAL", "TEXCOORD_0", "indices"...)."""
+    semantics = {}
+    for mesh in gltf.get("meshes", ()):
+        for primitive in mesh["primitives"]:
+            for name, index in primitive["attributes"].items():
+                semantics[index] = name
+            for target in primitive.get("targets", ()):
+                for name, index in target.items():
+                    semantics[index] = f"target:{name}"
+            if "indices" in primitive:
+                semantics[primitive["indices"]] = "indices"
+    return semantics
+
+
+def _encode_values(values, semantic, quantize):
+    """
+    Codificação final de um accessor: (bytes, componentType, normalized, stride).
+    Com quantize, normais viram int8 e coordenadas de textura em [0, 1] viram uint16
+    normalizados (KHR_mesh_quantization); posições ficam em float para não mexer nas transformações.
+    """
+    components = values.shape[1]
+    if semantic == "indices":
+        dtype = np.uint8 if values.max(initial=0) < 256 else np.uint16 if values.max(initial=0) < 65536 else np.uint32
+        return values.astype(dtype).tobytes(), DTYPE_COMPONENTS[np.dtype(dtype)], False, None
+    if quantize and semantic == "NORMAL":
+        quantized = np.clip(np.round(values * 127), -127, 127).astype(np.int8)
+        padded = np.zeros((len(values), 4), np.int8) # Atributos de vértice precisam de stride múltiplo de 4
+        padded[:, :components] = quantized
+        return padded.tobytes(), 5120, True, 4
+    if quantize and semantic.startswith("TEXCOORD") and values.size and values.min() >= 0 and values.max() <= 1:
+        return np.round(values * 65535).astype("<u2").tobytes(), 5123, True, components * 2
+    data = values.astype("<f4")
+    return data.tobytes(), 5126, False, components * 4 if semantic != "unknown" else None
+
+
+def convert_gltf_to_glb(source=MODEL_GLTF, target=MODEL_GLB, quantize=True):
+    """
+    Converte um .gltf com buffers e imagens em data URIs (como os exportados pelo Blockbench)
+    para um .glb binário: accessors idênticos são unificados, normais e UVs são quantizados e
+    a textura vai no próprio binário, sem base64. Retorna um resumo com os tamanhos.
+    """
+    with open(source, encoding="utf-8") as f:
+        gltf = json.load(f)
+    base_directory = os.path.dirname(os.path.abspath(source))
+    buffers = [_decode_uri(buffer["uri"], base_directory) for buffer in gltf.get("buffers", ())]
+    semantics = _accessor_semantics(gltf)
+
+    binary = bytearray()
+    views = []
+
+    def add_view(data, target=None, stride=None):
+        binary.extend(b"\0" * (-len(binary) % 4))
+        view = {"buffer": 0, "byteOffset": len(binary), "byteLength": len(data)}
+        if target:
+            view["target"] = target
+        if stride:
+            view["byteStride"] = stride
+        binary.extend(data)
+        views.append(view)
+        return len(views) - 1
+
+    accessors = []
+    remap = {}
+    unique = {}
+    quantized_any = False
+    for index, accessor in enumerate(gltf.get("accessors", ())):
+        values = _read_accessor(gltf, buffers, index)
+        semantic = semantics.get(index, "unknown")
+        data, component, normalized, stride = _encode_values(values, semantic, quantize)
+        key = (data, component, normalized, accessor["type"])
+        if key in unique:
+            remap[index] = unique[key]
+            continue
+        quantized_any |= normalized and semantic != "indices"
+        new_accessor = {"bufferView": add_view(data, ELEMENT_ARRAY_BUFFER if semantic == "indices" else
+                                               ARRAY_BUFFER if semantic != "unknown" else None,
+                                               stride if semantic != "indices" else None),
+                        "componentType": component, "count": accessor["count"], "type": accessor["type"]}
+        if normalized:
+            new_accessor["normalized"] = True
+        if semantic == "POSITION" or "min" in accessor:
+            # min/max dos valores gravados (já quantizados), como a especificação exige
+            stored = _decoded(data, component, normalized, stride, values.shape)
+            new_accessor["min"] = [float(v) for v in stored.min(axis=0)]
+            new_accessor["max"] = [float(v) for v in stored.max(axis=0)]
+            if not normalized and component != 5126:
+                new_accessor["min"] = [int(v) for v in new_accessor["min"]]
+                new_accessor["max"] = [int(v) for v in new_accessor["max"]]
+            elif normalized:
+                info = np.iinfo(COMPONENT_DTYPES[component])
+                new_accessor["min"] = [int(round(v * info.max)) for v in new_accessor["min"]]
+                new_accessor["max"] = [int(round(v * info.max)) for v in new_accessor["max"]]
+        unique[key] = len(accessors)
+        remap[index] = len(accessors)
+        accessors.append(new_accessor)
+
+    for mesh in gltf.get("meshes", ()):
+        for primitive in mesh["primitives"]:
+            primitive["attributes"] = {name: remap[i] for name, i in primitive["attributes"].items()}
+            primitive["targets"] = [{name: remap[i] for name, i in target.items()} for target in primitive.get("targets", ())]
+            if not primitive["targets"]:
+                del primitive["targets"]
+            if "indices" in primitive:
+                primitive["indices"] = remap[primitive["indices"]]
+
+    for image in gltf.get("images", ()):
+        if "uri" in image:
+            header = image["uri"].partition(",")[0]
+            data = _decode_uri(image.pop("uri"), base_directory)
+            image.setdefault("mimeType", header[5:].split(";")[0] if header.startswith("data:") else "image/png")
+            image["bufferView"] = add_view(data)
+        elif "bufferView" in image:
+            old_view = gltf["bufferViews"][image["bufferView"]]
+            start = old_view.get("byteOffset", 0)
+            image["bufferView"] = add_view(buffers[old_view["buffer"]][start:start + old_view["byteLength"]])
+
+    binary.extend(b"\0" * (-len(binary) % 4))
+    gltf["accessors"] = accessors
+    gltf["bufferViews"] = views
+    gltf["buffers"] = [{"byteLength": len(binary)}]
+    gltf["asset"]["generator"] = f"{gltf['asset'].get('generator', '')} + GRcraft skin_assets".strip(" +")
+    if quantized_any:
+        for key in ("extensionsUsed", "extensionsRequired"):
+            gltf[key] = sorted(set(gltf.get(key, [])) | {QUANTIZATION_EXTENSION})
+
+    json_chunk = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    json_chunk += b" " * (-len(json_chunk) % 4)
+    total = 12 + 8 + len(json_chunk) + 8 + len(binary)
+    tmp_path = target + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(struct.pack("<III", GLB_MAGIC, 2, total))
+        f.write(struct.pack("<II", len(json_chunk), CHUNK_JSON) + json_chunk)
+        f.write(struct.pack("<II", len(binary), CHUNK_BIN) + bytes(binary))
+    os.replace(tmp_path, target)
+    return {"source_bytes": os.path.getsize(source), "glb_bytes": total, "accessors_before": len(remap),
+            "accessors_after": len(accessors), "quantized": quantized_any}
+
+
+def _decoded(data, component, normalized, stride, shape):
+    """Valores (count, componentes) de bytes gravados por _encode_values, dequantizados."""
+    dtype = np.dtype(COMPONENT_DTYPES[component]).newbyteorder("<")
+    count, components = shape
+    stride = stride or dtype.itemsize * components
+    values = np.ndarray((count, components), dtype, data, 0, (stride, dtype.itemsize)).astype(np.float64)
+    if normalized:
+        values = np.maximum(values / np.iinfo(dtype).max, -1.0)
+    return values
+
+
+def read_glb(path):
+    """(json, binário) de um arquivo .glb."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, length = struct.unpack_from("<III", data, 0)
+    if magic != GLB_MAGIC or version != 2 or length != len(data):
+        raise ValueError(f"{path} não é um GLB 2.0 válido")
+    json_length, chunk_type = struct.unpack_from("<II", data, 12)
+    if chunk_type != CHUNK_JSON:
+        raise ValueError(f"{path}: primeiro bloco não é JSON")
+    gltf = json.loads(data[20:20 + json_length])
+    offset = 20 + json_length
+    binary = b""
+    if offset < len(data):
+        bin_length, chunk_type = struct.unpack_from("<II", data, offset)
+        if chunk_type == CHUNK_BIN:
+            binary = data[offset + 8:offset + 8 + bin_length]
+    return gltf, binary
+
+
+def verify_glb(gltf_path=MODEL_GLTF, glb_path=MODEL_GLB):
+    """Maior diferença entre os atributos do .gltf original e do .glb gerado (0 para o que não é quantizado)."""
+    with open(gltf_path, encoding="utf-8") as f:
+        original = json.load(f)
+    original_buffers = [_decode_uri(b["uri"], os.path.dirname(os.path.abspath(gltf_path))) for b in original["buffers"]]
+    converted, binary = read_glb(glb_path)
+    worst = 0.0
+    for mesh_a, mesh_b in zip(original["meshes"], converted["meshes"]):
+        for primitive_a, primitive_b in zip(mesh_a["primitives"], mesh_b["primitives"]):
+            for name, index in primitive_a["attributes"].items():
+                a = _read_accessor(original, original_buffers, index)
+                b = _read_accessor(converted, [binary], primitive_b["attributes"][name])
+                worst = max(worst, float(np.abs(a - b).max(initial=0)))
+    return worst
+
+
+def vendor_dependencies(directory=VENDOR_DIR, engine=None, pin=False):
+    """
+    Baixa three.js e o GLTFLoader para vendor/, para o visualizador abrir sem rede.
+    Cada arquivo precisa bater com o SHA-256 fixado no vendor/manifest.json do repositório;
+    sem hash fixado o download é recusado, a não ser com pin=True, que registra o hash baixado
+    (feito uma vez pelo mantenedor, que confere os arquivos e faz commit do manifest).
+    """
+    from downloader import DownloadEngine
+
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, "manifest.json")
+    manifest = read_json(manifest_path, {})
+    own_engine = engine is None
+    engine = engine or DownloadEngine(max_workers=1)
+    try:
+        for name, url in VENDOR_FILES.items():
+            path = os.path.join(directory, name)
+            expected = manifest.get(name, {}).get("sha256")
+            if not expected and not pin:
+                raise ValueError(f"{name}: sem SHA-256 fixado em {manifest_path} (use --pin numa rede confiável)")
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    current = hashlib.sha256(f.read()).hexdigest()
+                if current == expected:
+                    continue
+            data = engine.fetch_bytes(url)
+            digest = hashlib.sha256(data).hexdigest()
+            if expected and digest != expected:
+                raise ValueError(f"{name}: SHA-256 {digest} diferente do fixado em {manifest_path}")
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            manifest[name] = dict(manifest.get(name, {}), url=url, sha256=digest, bytes=len(data))
+    finally:
+        if own_engine:
+            engine.close()
+    write_json_atomic(manifest_path, manifest)
+    return manifest
+
+
+def _skin_pixels(path):
+    """Pixels RGBA (altura, largura, 4) de uma skin PNG, pelo QImage (o launcher já depende do PyQt5)."""
+    from PyQt5.QtGui import QImage
+
+    image = QImage(path)
+    if image.isNull() or image.width() != 64 or image.height() not in (32, 64):
+        raise ValueError(f"{path} não é uma skin de 64x64 ou 64x32")
+    image = image.convertToFormat(QImage.Format_RGBA8888)
+    pointer = image.constBits()
+    pointer.setsize(image.byteCount())
+    return np.frombuffer(pointer, np.uint8).reshape(image.height(), image.bytesPerLine() // 4, 4)[:, :64].copy()
+
+
+def render_skin_front(pixels):
+    """Vista de frente 16x32 (RGBA) da skin, com a camada externa sobre a base."""
+    canvas = np.zeros((32, 16, 4), np.uint8)
+    legacy = pixels.shape[0] == 32
+    for (x, y, width, height), overlay, (dx, dy) in SKIN_FRONT_PARTS:
+        if legacy and y >= 32:
+            # Skins 64x32 não têm braço/perna esquerdos: o jogo espelha os direitos
+            x, y = {(36, 52): (44, 20), (20, 52): (4, 20)}[(x, y)]
+            base = pixels[y:y + height, x:x + width][:, ::-1]
+            overlay = None
+        else:
+            base = pixels[y:y + height, x:x + width]
+        canvas[dy:dy + height, dx:dx + width] = base
+        canvas[dy:dy + height, dx:dx + width, 3] = 255 # A base da skin é opaca no jogo
+        if overlay is not None and not (legacy and overlay[1] >= 32):
+            ox, oy = overlay
+            layer = pixels[oy:oy + height, ox:ox + width]
+            visible = layer[:, :, 3] > 0
+            canvas[dy:dy + height, dx:dx + width][visible] = layer[visible]
+            canvas[dy:dy + height, dx:dx + width, 3] = 255
+    return canvas
+
+
+def skin_thumbnail(skin_path, size=THUMBNAIL_SIZE):
+    """
+    Miniatura PNG (size de altura) da frente da skin, guardada em <cache>/skins pelo SHA-1
+    do arquivo: a mesma skin nunca é desenhada duas vezes. Retorna o caminho da miniatura.
+    """
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+
+    path = user_cache_path("skins", f"{file_sha1(skin_path)}-{size}.png")
+    if os.path.isfile(path):
+        return path
+    canvas = np.ascontiguousarray(render_skin_front(_skin_pixels(skin_path)))
+    image = QImage(canvas.data, 16, 32, 16 * 4, QImage.Format_RGBA8888)
+    image = image.scaled(size // 2, size, Qt.KeepAspectRatio, Qt.FastTransformation) # Sem suavizar os pixels
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not image.save(path + ".tmp.png", "PNG"):
+        raise OSError(f"Não foi possível gravar a miniatura em {path}")
+    os.replace(path + ".tmp.png", path)
+    return path
+
+
+def main(argv=None):
+    """Modo sem interface: python skin_assets.py {glb,vendor,thumbnail} [...]"""
+    parser = argparse.ArgumentParser(description="Assets do visualizador de skin.")
+    parser.add_argument("command", choices=["glb", "vendor", "thumbnail"])
+    parser.add_argument("paths", nargs="*", help="glb: [origem.gltf [destino.glb]]; thumbnail: skins PNG")
+    parser.add_argument("--no-quantize", action="store_true", help="glb: mantém normais e UVs em float")
+    parser.add_argument("--size", type=int, default=THUMBNAIL_SIZE, help="thumbnail: altura em pixels")
+    parser.add_argument("--pin", action="store_true", help="vendor: registra o SHA-256 dos arquivos ainda sem hash fixado")
+    args = parser.parse_args(argv)
+
+    if args.command == "glb":
+        source = args.paths[0] if args.paths else MODEL_GLTF
+        target = args.paths[1] if len(args.paths) > 1 else os.path.splitext(source)[0] + ".glb"
+        summary = convert_gltf_to_glb(source, target, quantize=not args.no_quantize)
+        summary["max_error"] = verify_glb(source, target)
+        print(json.dumps(summary))
+    elif args.command == "vendor":
+        try:
+            for name, entry in vendor_dependencies(pin=args.pin).items():
+                print(f"{name}: {entry['bytes']} bytes, sha256 {entry['sha256']}")
+        except (OSError, ValueError) as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            return 1
+    else:
+        for skin_path in args.paths:
+            try:
+                print(skin_thumbnail(skin_path, args.size))
+            except (OSError, ValueError) as e:
+                print(f"Erro: {e}", file=sys.stderr)
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
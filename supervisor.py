@@ -0,0 +1,146 @@
+import os
+import time
+import threading
+
+from launch_pipeline import start_game
+from resource_monitor import ResourceMonitor, DEFAULT_INTERVAL
+
+
+class RunningGame:
+    """Um jogo iniciado pelo supervisor (em execução ou já encerrado)."""
+
+    def __init__(self, launch_id, profile_name, game_directory, log_path):
+        self.launch_id = launch_id
+        self.profile_name = profile_name
+        self.game_directory = game_directory
+        self.log_path = log_path
+        self.game_process = None
+        self.monitor = None # ResourceMonitor (memória, CPU, threads e GC) enquanto o jogo roda
+        self.started_at = time.time()
+        self.ended_at = None
+        self.returncode = None
+
+    @property
+    def pid(self):
+        return self.game_process.pid if self.game_process else None
+
+    def is_running(self):
+        return self.game_process is not None and self.ended_at is None
+
+    def to_dict(self):
+        return {
+            "launch_id": self.launch_id,
+            "profile": self.profile_name,
+            "game_directory": self.game_directory,
+            "pid": self.pid,
+            "log": self.log_path,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+            "returncode": self.returncode,
+            "launched": bool(self.game_process and self.game_process.launched),
+            "resources": self.monitor.summary() if self.monitor else None,
+        }
+
+
+class GameSupervisor:
+    """
+    Acompanha vários jogos ao mesmo tempo (de perfis diferentes ou do mesmo perfil).
+
+    Cada lançamento recebe um id, o seu próprio log (launcher-output.log,
+    launcher-output-2.log, ... dentro de <game_dir>/logs, reaproveitando nomes de
+    jogos já encerrados) e tem PID e código de saída registrados. Com monitor_interval, cada
+    jogo também é amostrado por um ResourceMonitor (None desativa).
+    """
+
+    def __init__(self, monitor_interval=DEFAULT_INTERVAL):
+        self.monitor_interval = monitor_interval
+        self._games = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def _log_path(self, game_directory):
+        in_use = {game.log_path for game in self._games.values() if game.is_running() or game.game_process is None}
+        slot = 1
+        while True:
+            name = "launcher-output.log" if slot == 1 else f"launcher-output-{slot}.log"
+            path = os.path.join(game_directory, "logs", name)
+            if path not in in_use:
+                return path
+            slot += 1
+
+    def launch(self, prepared, profile_name, on_launched=None, on_output=None, on_exit=None, tracer=None,
+               gc_log_path=None):
+        """
+        Inicia o jogo de um PreparedLaunch e passa a acompanhá-lo. Retorna o RunningGame.
+        gc_log_path deve ser o mesmo passado ao prepare_launch, para o monitor ler o log de GC.
+        """
+        with self._lock:
+            game = RunningGame(self._next_id, profile_name, prepared.game_directory,
+                               self._log_path(prepared.game_directory))
+            self._next_id += 1
+            self._games[game.launch_id] = game
+
+        def exited(returncode, launched):
+            if game.monitor is not None:
+                game.monitor.stop()
+                if tracer is not None:
+                    tracer.event("resources", **game.monitor.summary())
+                if game.monitor.gc_log_path and os.path.exists(game.monitor.gc_log_path):
+                    os.remove(game.monitor.gc_log_path) # Só serve ao monitor; o resumo fica no trace
+            with self._lock:
+                game.returncode = returncode
+                game.ended_at = time.time()
+            if on_exit:
+                on_exit(returncode, launched)
+
+        try:
+            game.game_process = start_game(prepared, on_launched=on_launched, on_output=on_output, on_exit=exited,
+                                           tracer=tracer, log_path=game.log_path)
+        except Exception:
+            with self._lock:
+                del self._games[game.launch_id]
+            raise
+        if self.monitor_interval and game.game_process.is_running():
+            monitor = ResourceMonitor(game.game_process.pid, gc_log_path, self.monitor_interval)
+            if monitor.available:
+                game.monitor = monitor.start()
+        return game
+
+    def get(self, launch_id):
+        with self._lock:
+            return self._games.get(launch_id)
+
+    def games(self):
+        with self._lock:
+            return list(self._games.values())
+
+    def running(self):
+        return [game for game in self.games() if game.is_running()]
+
+    def running_in(self, game_directory):
+        """Jogos abertos nesta pasta do jogo (que podem estar gravando os mundos)."""
+        game_directory = os.path.abspath(game_directory)
+        return [game for game in self.running() if os.path.abspath(game.game_directory) == game_directory]
+
+    def stop(self, launch_id, timeout=10.0):
+        """Fecha um jogo (terminate, depois kill). Retorna o código de saída."""
+        game = self.get(launch_id)
+        if game is None or game.game_process is None:
+            return None
+        return game.game_process.stop(timeout)
+
+    def stop_all(self, timeout=10.0):
+        """Fecha todos os jogos em paralelo, esperando no máximo ~timeout segundos no total."""
+        threads = [threading.Thread(target=game.game_process.stop, args=(timeout,), daemon=True)
+                   for game in self.running()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout + 5)
+        return len(threads)
+
+    def forget_finished(self):
+        """Remove do histórico os jogos que já terminaram."""
+        with self._lock:
+            for launch_id in [i for i, game in self._games.items() if game.ended_at is not None]:
+                del self._games[launch_id]
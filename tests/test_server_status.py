@@ -0,0 +1,166 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server_status import (
+    PROTOCOL_VERSION, ServerStatus, StatusCache, fake_response, ping_many, ping_server, start_fake_server,
+)
+
+
+def _address(server):
+    return f"127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+async def _closed_port():
+    """Porta local sem ninguém escutando (conexão recusada)."""
+    server = await asyncio.start_server(lambda _reader, _writer: None, "127.0.0.1", 0)
+    address = _address(server)
+    server.close()
+    await server.wait_closed()
+    return address
+
+
+class PingServerTest(unittest.TestCase):
+    """Server List Ping contra o servidor falso do server_status.py."""
+
+    def ping(self, response, timeout=2.0, **server_options):
+        async def run():
+            server = await start_fake_server(response, **server_options)
+            try:
+                return await ping_server(_address(server), timeout), _address(server)
+            finally:
+                server.close()
+                await server.wait_closed()
+        return asyncio.run(run())
+
+    def test_online(self):
+        status, address = self.ping(fake_response("§aServidor §lde teste", online=5, maximum=50))
+        self.assertTrue(status.online)
+        self.assertEqual(status.address, address)
+        self.assertEqual(status.motd, "Servidor de teste")
+        self.assertEqual((status.players_online, status.players_max), (5, 50))
+        self.assertEqual(status.version, "1.8.8")
+        self.assertEqual(status.protocol, PROTOCOL_VERSION)
+        self.assertTrue(status.compatible)
+        self.assertIsNotNone(status.latency_ms)
+
+    def test_incompatible_version(self):
+        status, _address = self.ping(fake_response(version="1.12.2", protocol=340))
+        self.assertTrue(status.online)
+        self.assertFalse(status.compatible)
+
+    def test_timeout(self):
+        started = time.monotonic()
+        status, _address = self.ping(fake_response(), timeout=0.3, delay=2.0)
+        self.assertFalse(status.online)
+        self.assertEqual(status.error, "tempo esgotado")
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_no_pong(self):
+        # Sem resposta ao ping, a latência fica com o tempo da resposta de status
+        status, _address = self.ping(fake_response(), answer_ping=False)
+        self.assertTrue(status.online)
+        self.assertIsNotNone(status.latency_ms)
+
+    def test_response_not_an_object(self):
+        for response in (["list"], "texto", 5, None):
+            with self.subTest(response=response):
+                status, _address = self.ping(response)
+                self.assertFalse(status.online)
+                self.assertIn("inválida", status.error)
+
+    def test_malformed_fields(self):
+        status, _address = self.ping({"description": {"text": "oi"}, "players": "x", "version": "1.8"})
+        self.assertTrue(status.online)
+        self.assertEqual((status.players_online, status.players_max), (0, 0))
+        self.assertEqual(status.version, "")
+        self.assertIsNone(status.protocol)
+        status, _address = self.ping({"players": {"online": "muitos", "max": None}, "version": {"protocol": "47"}})
+        self.assertTrue(status.online)
+        self.assertEqual(status.players_online, 0)
+        self.assertIsNone(status.compatible)
+
+    def test_connection_refused(self):
+        async def run():
+            return await ping_server(await _closed_port(), 2.0)
+        status = asyncio.run(run())
+        self.assertFalse(status.online)
+        self.assertTrue(status.error)
+
+    def test_invalid_address(self):
+        status = asyncio.run(ping_server("host:porta", 1.0))
+        self.assertFalse(status.online)
+        self.assertIn("Porta inválida", status.error)
+
+
+class PingManyTest(unittest.TestCase):
+    def test_mixed_servers(self):
+        async def run():
+            servers = {
+                "online": await start_fake_server(fake_response(online=1)),
+                "slow": await start_fake_server(fake_response(), delay=2.0),
+                "no_pong": await start_fake_server(fake_response(online=2), answer_ping=False),
+                "malformed": await start_fake_server(["list"]),
+            }
+            addresses = {name: _address(server) for name, server in servers.items()}
+            addresses["refused"] = await _closed_port()
+            reported = []
+            try:
+                results = await ping_many(list(addresses.values()), timeout=0.5, concurrency=2,
+                                          on_result=reported.append)
+            finally:
+                for server in servers.values():
+                    server.close()
+                    await server.wait_closed()
+            return addresses, results, reported
+
+        addresses, results, reported = asyncio.run(run())
+        self.assertEqual(set(results), set(addresses.values()))
+        self.assertEqual(len(reported), len(addresses))
+        online = {name for name, address in addresses.items() if results[address].online}
+        self.assertEqual(online, {"online", "no_pong"})
+        self.assertEqual(results[addresses["slow"]].error, "tempo esgotado")
+        self.assertEqual(results[addresses["online"]].players_online, 1)
+
+    def test_duplicate_addresses(self):
+        async def run():
+            server = await start_fake_server(fake_response())
+            try:
+                return await ping_many([_address(server)] * 3, timeout=1.0)
+            finally:
+                server.close()
+                await server.wait_closed()
+        self.assertEqual(len(asyncio.run(run())), 1)
+
+
+class StatusCacheTest(unittest.TestCase):
+    def test_refresh_and_reload(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "server_status.json")
+
+            async def run():
+                server = await start_fake_server(fake_response(online=7))
+                try:
+                    cache = StatusCache(path, ttl=60)
+                    await cache.refresh([_address(server)])
+                    return _address(server)
+                finally:
+                    server.close()
+                    await server.wait_closed()
+
+            address = asyncio.run(run())
+            cache = StatusCache(path, ttl=60)
+            self.assertTrue(cache.is_fresh(address))
+            self.assertEqual(cache.get(address).players_online, 7)
+            self.assertEqual(cache.stale([address, "outro.servidor"]), ["outro.servidor"])
+            self.assertEqual(ServerStatus.from_dict(cache.get(address).to_dict()).motd, "Servidor de teste")
+
+
+if __name__ == "__main__":
+    unittest.main()
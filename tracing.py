@@ -0,0 +1,173 @@
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+
+from game_files import launcher_data_path
+from game_process import RotatingLogWriter
+
+TRACE_MAX_BYTES = 2 * 1024 * 1024
+
+
+def trace_path(game_directory):
+    return launcher_data_path(game_directory, "traces", "trace.jsonl")
+
+
+class Span:
+    """Etapa em andamento. outcome começa como "ok" e vira "error" se a etapa terminar com exceção."""
+
+    def __init__(self, tracer, name, index, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.index = index
+        self.attrs = attrs
+        self.outcome = "ok"
+        self.started = None
+        self.duration_ms = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.tracer._emit("start", self.name, index=self.index, attrs=self.attrs)
+        return self
+
+    def __exit__(self, exc_type, exc, _tb):
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+        if exc is not None:
+            self.outcome = "error"
+            self.attrs["error"] = str(exc)
+        self.tracer._emit("end", self.name, index=self.index, attrs=self.attrs,
+                          duration_ms=round(self.duration_ms, 3), outcome=self.outcome)
+        return False
+
+
+class Tracer:
+    """
+    Registra cada etapa de uma execução (instalação ou lançamento) com início, duração e resultado.
+
+    Os eventos são acrescentados, um JSON por linha, em <game_dir>/.grcraft/traces/trace.jsonl
+    e também entregues ao listener (ex.: um sinal Qt que atualiza a barra de progresso).
+    stages é a lista de etapas esperadas, usada para calcular o progresso (index/total).
+    """
+
+    def __init__(self, kind, stages=(), path=None, listener=None, **attrs):
+        self.kind = kind
+        self.stages = list(stages)
+        self.path = path
+        self.listener = listener
+        self.run_id = uuid.uuid4().hex[:12]
+        self.outcome = None
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._emit("run_start", kind, attrs=attrs)
+
+    def span(self, name, **attrs):
+        index = self.stages.index(name) if name in self.stages else None
+        return Span(self, name, index, attrs)
+
+    def event(self, name, **attrs):
+        """Evento pontual (sem duração), ex.: a janela do jogo apareceu."""
+        self._emit("event", name, attrs=attrs)
+
+    def finish(self, outcome="ok", **attrs):
+        """Fecha a execução: grava a duração total e o resultado."""
+        if self.outcome is not None:
+            return
+        self.outcome = outcome
+        self._emit("run_end", self.kind, attrs=attrs, outcome=outcome,
+                   duration_ms=round((time.perf_counter() - self._started) * 1000, 3))
+
+    def _emit(self, event_type, name, index=None, attrs=None, duration_ms=None, outcome=None):
+        record = {"run": self.run_id, "kind": self.kind, "type": event_type, "name": name, "ts": round(time.time(), 6)}
+        if index is not None:
+            record["index"] = index
+            record["total"] = len(self.stages)
+        if duration_ms is not None:
+            record["duration_ms"] = duration_ms
+        if outcome is not None:
+            record["outcome"] = outcome
+        if attrs:
+            record["attrs"] = dict(attrs)
+        if self.path:
+            # Abre, acrescenta e fecha a cada evento: são poucas linhas por execução, e eventos
+            # que chegam depois do fim (ex.: o jogo fechou) continuam sendo gravados
+            with self._lock:
+                try:
+                    writer = RotatingLogWriter(self.path, max_bytes=TRACE_MAX_BYTES, backup_count=1)
+                    try:
+                        writer.write(json.dumps(record, ensure_ascii=False))
+                    finally:
+                        writer.close()
+                except OSError:
+                    pass # O trace nunca pode impedir o lançamento
+        if self.listener:
+            self.listener(record)
+
+
+def read_runs(path):
+    """Agrupa os eventos do arquivo por execução, na ordem em que foram gravadas."""
+    runs = {}
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue # Linha cortada por um encerramento abrupto
+                runs.setdefault(record["run"], []).append(record)
+    except FileNotFoundError:
+        pass
+    return list(runs.values())
+
+
+def summarize_run(records):
+    """Resumo de uma execução: tipo, resultado, duração total e duração de cada etapa."""
+    summary = {"run": records[0]["run"], "kind": records[0]["kind"], "started": records[0]["ts"],
+               "outcome": None, "duration_ms": None, "stages": {}}
+    for record in records:
+        if record["type"] == "end":
+            summary["stages"][record["name"]] = record["duration_ms"]
+            if record["outcome"] != "ok":
+                summary["failed_stage"] = record["name"]
+        elif record["type"] == "run_end":
+            summary["outcome"] = record["outcome"]
+            summary["duration_ms"] = record["duration_ms"]
+    return summary
+
+
+def main(argv=None):
+    """Compara as últimas execuções: python tracing.py --game-dir <pasta> [--kind launch] [--runs 5]"""
+    parser = argparse.ArgumentParser(description="Mostra a duração de cada etapa das últimas instalações/lançamentos.")
+    parser.add_argument("--game-dir", required=True)
+    parser.add_argument("--kind", choices=["launch", "install"], default="launch")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Imprime os resumos em JSON")
+    args = parser.parse_args(argv)
+
+    summaries = [summarize_run(r) for r in read_runs(trace_path(args.game_dir)) if r[0]["kind"] == args.kind]
+    summaries = summaries[-args.runs:]
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+        return 0
+    if not summaries:
+        print("Nenhuma execução registrada.")
+        return 1
+
+    stages = []
+    for summary in summaries:
+        stages.extend(name for name in summary["stages"] if name not in stages)
+    print(f"{'etapa (ms)':<20}" + "".join(f"{s['run'][:8]:>12}" for s in summaries))
+    for stage in stages:
+        cells = "".join(f"{s['stages'][stage]:>12.1f}" if stage in s["stages"] else f"{'-':>12}" for s in summaries)
+        print(f"{stage:<20}{cells}")
+    print(f"{'total':<20}" + "".join(f"{s['duration_ms'] or 0:>12.1f}" for s in summaries))
+    print(f"{'resultado':<20}" + "".join(f"{s['outcome'] or '?':>12}" for s in summaries))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
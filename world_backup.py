@@ -0,0 +1,416 @@
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from game_files import user_data_path, read_json, write_json_atomic
+
+SNAPSHOT_FORMAT = 1
+REGION_EXTENSIONS = (".mca", ".mcr")
+REGION_HEADER_SIZE = 8192 # Tabela de posições (4 KB) + tabela de timestamps (4 KB)
+SECTOR_SIZE = 4096
+LARGE_FILE_PIECE = 1024 * 1024 # Arquivos comuns maiores que isso são divididos em blocos fixos
+DEFAULT_COMPRESSION = 6 # Nível do zlib (0 = sem compressão)
+DEFAULT_RETENTION = {"keep_last": 5, "keep_daily": 7, "keep_weekly": 4}
+# Objetos gravados (ou reaproveitados) há menos que isso nunca são apagados pelo gc(): podem
+# pertencer a um backup de outro processo cujo snapshot ainda não foi gravado
+GC_MIN_AGE_SECONDS = 3600
+
+# Um lock por repositório (pela pasta), compartilhado por todas as instâncias de BackupRepository
+# do processo: dois jogos abertos ao mesmo tempo não fazem backup e gc no mesmo repositório juntos
+_repository_locks = {}
+_repository_locks_guard = threading.Lock()
+
+
+def _repository_lock(root):
+    key = os.path.normcase(os.path.abspath(root))
+    with _repository_locks_guard:
+        return _repository_locks.setdefault(key, threading.RLock())
+
+
+def default_repository():
+    """Repositório de backups do usuário (GRCRAFT_BACKUPS muda a pasta)."""
+    return BackupRepository(os.environ.get("GRCRAFT_BACKUPS") or user_data_path("backups"))
+
+
+def find_worlds(game_directory):
+    """Pastas de mundo em <game_dir>/saves (as que têm level.dat)."""
+    saves = os.path.join(game_directory, "saves")
+    try:
+        entries = sorted(os.scandir(saves), key=lambda e: e.name.lower())
+    except FileNotFoundError:
+        return []
+    return [e.path for e in entries if e.is_dir() and os.path.isfile(os.path.join(e.path, "level.dat"))]
+
+
+def region_boundaries(data):
+    """
+    Limites dos pedaços de um arquivo de região Anvil: o cabeçalho e cada chunk (com o
+    preenchimento até o setor), além dos trechos livres entre eles. Um chunk que não mudou
+    gera exatamente os mesmos bytes e, portanto, o mesmo objeto no repositório.
+    """
+    size = len(data)
+    if size < REGION_HEADER_SIZE:
+        return [0, size] if size else [0]
+    boundaries = {0, REGION_HEADER_SIZE, size}
+    for entry in struct.unpack_from(">1024I", data, 0):
+        offset, sectors = (entry >> 8) * SECTOR_SIZE, entry & 0xFF
+        if entry and offset >= REGION_HEADER_SIZE:
+            boundaries.add(min(offset, size))
+            boundaries.add(min(offset + sectors * SECTOR_SIZE, size))
+    return sorted(boundaries)
+
+
+def file_boundaries(path, data):
+    if path.endswith(REGION_EXTENSIONS):
+        return region_boundaries(data)
+    return list(range(0, len(data), LARGE_FILE_PIECE)) + [len(data)] if data else [0]
+
+
+class BackupRepository:
+    """
+    Repositório de snapshots de mundos, endereçado pelo conteúdo.
+
+    Cada arquivo do mundo vira uma lista de pedaços (chunks das regiões, blocos de 1 MB nos
+    demais) guardados uma única vez em objects/<2 primeiros>/<sha1>, com zlib. Um snapshot
+    (snapshots/<id>.json) é só a lista de arquivos e pedaços; o que não mudou desde o
+    anterior não ocupa espaço novo. Arquivos com o mesmo tamanho e mtime do último backup
+    nem são lidos (cache em cache/<mundo>.json).
+    """
+
+    def __init__(self, root, compression=DEFAULT_COMPRESSION, workers=None):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+        self.cache_dir = os.path.join(root, "cache")
+        self.compression = compression
+        self.workers = workers or min(8, (os.cpu_count() or 2))
+        self._lock = _repository_lock(root) # Serializa backups, restaurações, prune e gc no processo
+
+    @staticmethod
+    def world_key(world_path):
+        """Identificador estável de um mundo (pasta do jogo + nome), usado no cache e na retenção."""
+        world_path = os.path.abspath(world_path)
+        digest = hashlib.sha1(os.path.dirname(world_path).encode("utf-8")).hexdigest()[:8]
+        return f"{os.path.basename(world_path)}-{digest}"
+
+    def _object_path(self, sha1):
+        return os.path.join(self.objects_dir, sha1[:2], sha1)
+
+    def _write_object(self, sha1, piece):
+        """Grava um pedaço se ainda não existir. Retorna os bytes gravados (0 se já existia)."""
+        path = self._object_path(sha1)
+        if os.path.exists(path):
+            try:
+                os.utime(path) # Reaproveitado agora: o gc() de outro processo não o trata como lixo
+            except OSError:
+                pass
+            return 0
+        payload = b"z" + zlib.compress(piece, self.compression) if self.compression else b"r" + piece
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return len(payload)
+
+    def read_object(self, sha1):
+        with open(self._object_path(sha1), "rb") as f:
+            payload = f.read()
+        piece = zlib.decompress(payload[1:]) if payload[:1] == b"z" else payload[1:]
+        if hashlib.sha1(piece).hexdigest() != sha1:
+            raise ValueError(f"Objeto corrompido no backup: {sha1}")
+        return piece
+
+    def _store_file(self, path):
+        """Lê, divide e guarda um arquivo (executado no pool). Retorna (pedaços, bytes novos gravados)."""
+        with open(path, "rb") as f:
+            data = f.read()
+        boundaries = file_boundaries(path, data)
+        chunks = []
+        written = 0
+        view = memoryview(data)
+        for start, end in zip(boundaries, boundaries[1:]):
+            piece = view[start:end]
+            sha1 = hashlib.sha1(piece).hexdigest()
+            written += self._write_object(sha1, piece)
+            chunks.append(sha1)
+        return chunks, written
+
+    def backup(self, world_path, label="", progress_callback=None):
+        """Cria um snapshot do mundo. Retorna o dicionário do snapshot (com "stats")."""
+        with self._lock:
+            return self._backup(world_path, label, progress_callback)
+
+    def _backup(self, world_path, label, progress_callback):
+        started = time.monotonic()
+        world_path = os.path.abspath(world_path)
+        key = self.world_key(world_path)
+        cache_path = os.path.join(self.cache_dir, f"{key}.json")
+        cache = read_json(cache_path, {})
+
+        files = []
+        for directory, _dirs, names in os.walk(world_path):
+            for name in names:
+                if name == "session.lock":
+                    continue # Muda a cada abertura do mundo e é recriado pelo jogo
+                path = os.path.join(directory, name)
+                st = os.stat(path)
+                files.append({"path": os.path.relpath(path, world_path).replace(os.sep, "/"),
+                              "size": st.st_size, "mtime_ns": st.st_mtime_ns})
+
+        to_read = []
+        for entry in files:
+            cached = cache.get(entry["path"])
+            if (cached and cached["size"] == entry["size"] and cached["mtime_ns"] == entry["mtime_ns"]
+                    and all(os.path.exists(self._object_path(sha1)) for sha1 in cached["chunks"])):
+                entry["chunks"] = cached["chunks"]
+            else:
+                to_read.append(entry)
+
+        bytes_read = bytes_written = done = 0
+        # hashlib e zlib liberam o GIL em blocos grandes: threads bastam para usar vários núcleos
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self._store_file, os.path.join(world_path, entry["path"])): entry
+                       for entry in to_read}
+            for future, entry in futures.items():
+                entry["chunks"], written = future.result()
+                bytes_read += entry["size"]
+                bytes_written += written
+                done += 1
+                if progress_callback:
+                    progress_callback(done, len(to_read))
+
+        created = time.time()
+        snapshot_id = f"{datetime.fromtimestamp(created).strftime('%Y%m%d-%H%M%S')}-{key}"
+        suffix = 2
+        while os.path.exists(os.path.join(self.snapshots_dir, f"{snapshot_id}.json")):
+            snapshot_id = f"{datetime.fromtimestamp(created).strftime('%Y%m%d-%H%M%S')}-{suffix}-{key}"
+            suffix += 1
+        snapshot = {
+            "format": SNAPSHOT_FORMAT,
+            "id": snapshot_id,
+            "world": os.path.basename(world_path),
+            "world_key": key,
+            "world_path": world_path,
+            "created": created,
+            "label": label,
+            "files": sorted(files, key=lambda e: e["path"]),
+        }
+        snapshot["stats"] = {
+            "files": len(files),
+            "files_read": len(to_read),
+            "bytes_total": sum(e["size"] for e in files),
+            "bytes_read": bytes_read,
+            "bytes_written": bytes_written,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+        write_json_atomic(os.path.join(self.snapshots_dir, f"{snapshot['id']}.json"), snapshot)
+        write_json_atomic(cache_path, {e["path"]: {"size": e["size"], "mtime_ns": e["mtime_ns"], "chunks": e["chunks"]}
+                                       for e in files})
+        return snapshot
+
+    def snapshots(self, world_key=None):
+        """Snapshots do repositório (ou de um mundo), do mais antigo para o mais novo."""
+        try:
+            names = os.listdir(self.snapshots_dir)
+        except FileNotFoundError:
+            return []
+        result = []
+        for name in names:
+            if name.endswith(".json"):
+                snapshot = read_json(os.path.join(self.snapshots_dir, name), {})
+                if snapshot.get("format") == SNAPSHOT_FORMAT and (world_key is None or snapshot["world_key"] == world_key):
+                    result.append(snapshot)
+        return sorted(result, key=lambda s: s["created"])
+
+    def get(self, snapshot_id):
+        snapshot = read_json(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"), {})
+        if snapshot.get("format") != SNAPSHOT_FORMAT:
+            raise KeyError(snapshot_id)
+        return snapshot
+
+    def restore(self, snapshot_id, target=None):
+        """
+        Restaura um snapshot em target (padrão: "<mundo> (backup AAAA-MM-DD HH.MM)" ao lado do
+        mundo original, que nunca é sobrescrito). Retorna a pasta restaurada.
+        """
+        with self._lock:
+            snapshot = self.get(snapshot_id)
+            if target is None:
+                stamp = datetime.fromtimestamp(snapshot["created"]).strftime("%Y-%m-%d %H.%M")
+                target = os.path.join(os.path.dirname(snapshot["world_path"]), f"{snapshot['world']} (backup {stamp})")
+            if os.path.exists(target) and os.listdir(target):
+                raise FileExistsError(f"A pasta de destino já existe e não está vazia: {target}")
+
+            def restore_file(entry):
+                path = os.path.join(target, *entry["path"].split("/"))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path + ".tmp", "wb") as f:
+                    for sha1 in entry["chunks"]:
+                        f.write(self.read_object(sha1))
+                os.replace(path + ".tmp", path)
+                os.utime(path, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(restore_file, snapshot["files"]))
+            return target
+
+    def prune(self, world_key, keep_last=5, keep_daily=7, keep_weekly=4, dry_run=False):
+        """
+        Aplica a retenção a um mundo: mantém os keep_last mais novos, o último de cada um dos
+        keep_daily dias e de cada uma das keep_weekly semanas mais recentes. Retorna os ids removidos.
+        """
+        with self._lock:
+            snapshots = self.snapshots(world_key)[::-1] # Mais novo primeiro
+            keep = {s["id"] for s in snapshots[:keep_last]}
+            for bucket_format, count in (("%Y-%m-%d", keep_daily), ("%G-%V", keep_weekly)):
+                seen = []
+                for snapshot in snapshots:
+                    bucket = datetime.fromtimestamp(snapshot["created"]).strftime(bucket_format)
+                    if bucket not in seen:
+                        if len(seen) >= count:
+                            break
+                        seen.append(bucket)
+                        keep.add(snapshot["id"])
+            removed = [s["id"] for s in snapshots if s["id"] not in keep]
+            if not dry_run:
+                for snapshot_id in removed:
+                    os.remove(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"))
+            return removed
+
+    def gc(self, dry_run=False, min_age=GC_MIN_AGE_SECONDS):
+        """
+        Apaga objetos que nenhum snapshot usa mais. Temporários e objetos tocados há menos de
+        min_age segundos ficam (podem ser de um backup em andamento). Retorna (objetos removidos, bytes liberados).
+        """
+        with self._lock:
+            cutoff = time.time() - min_age
+            referenced = set()
+            for snapshot in self.snapshots():
+                for entry in snapshot["files"]:
+                    referenced.update(entry["chunks"])
+            # O cache de stat continua valendo: o backup só reaproveita uma entrada se todos os
+            # objetos dela ainda existirem, então apagar objetos aqui nunca força reler o mundo inteiro
+            removed = freed = 0
+            if os.path.isdir(self.objects_dir):
+                for prefix in os.listdir(self.objects_dir):
+                    prefix_dir = os.path.join(self.objects_dir, prefix)
+                    for entry in os.scandir(prefix_dir):
+                        if entry.name in referenced or entry.name.endswith(".tmp"):
+                            continue
+                        st = entry.stat()
+                        if st.st_mtime >= cutoff:
+                            continue
+                        removed += 1
+                        freed += st.st_size
+                        if not dry_run:
+                            os.remove(entry.path)
+            return removed, freed
+
+    def usage(self):
+        """(objetos, bytes no repositório)."""
+        count = size = 0
+        if os.path.isdir(self.objects_dir):
+            for prefix in os.listdir(self.objects_dir):
+                for entry in os.scandir(os.path.join(self.objects_dir, prefix)):
+                    count += 1
+                    size += entry.stat().st_size
+        return count, size
+
+
+def backup_worlds(game_directory, repository=None, retention=None, min_interval_hours=0, status_callback=None):
+    """
+    Faz backup de todos os mundos da pasta do jogo e aplica a retenção (usado antes do
+    lançamento). Mundos com backup mais novo que min_interval_hours são pulados.
+    Retorna a lista de snapshots criados.
+    """
+    repository = repository or default_repository()
+    retention = retention or DEFAULT_RETENTION
+    status = status_callback or (lambda _message: None)
+    created = []
+    for world_path in find_worlds(game_directory):
+        key = repository.world_key(world_path)
+        previous = repository.snapshots(key)
+        if previous and time.time() - previous[-1]["created"] < min_interval_hours * 3600:
+            continue
+        status(f"Backup do mundo {os.path.basename(world_path)}...")
+        snapshot = repository.backup(world_path, label="antes de jogar")
+        stats = snapshot["stats"]
+        status(f"Backup de {snapshot['world']}: {stats['files_read']}/{stats['files']} arquivos lidos, "
+               f"{stats['bytes_written'] / (1024 * 1024):.1f} MB novos em {stats['seconds']:.1f}s.")
+        repository.prune(key, **retention)
+        created.append(snapshot)
+    if created:
+        repository.gc()
+    return created
+
+
+def main(argv=None):
+    """Modo sem interface: python world_backup.py {backup,list,restore,prune,usage} [...]"""
+    from launch_pipeline import default_game_directory
+
+    parser = argparse.ArgumentParser(description="Backups incrementais dos mundos em saves/.")
+    parser.add_argument("command", choices=["backup", "list", "restore", "prune", "usage"])
+    parser.add_argument("snapshot", nargs="?", help="Id do snapshot (comando restore)")
+    parser.add_argument("--game-dir", default=default_game_directory())
+    parser.add_argument("--repository", default=None, help="Pasta do repositório (padrão: GRCRAFT_BACKUPS ou a pasta de dados)")
+    parser.add_argument("--world", help="Só este mundo (nome da pasta em saves/)")
+    parser.add_argument("--target", help="restore: pasta de destino")
+    parser.add_argument("--compression", type=int, default=DEFAULT_COMPRESSION, help="Nível do zlib, 0 a 9")
+    parser.add_argument("--keep-last", type=int, default=DEFAULT_RETENTION["keep_last"])
+    parser.add_argument("--keep-daily", type=int, default=DEFAULT_RETENTION["keep_daily"])
+    parser.add_argument("--keep-weekly", type=int, default=DEFAULT_RETENTION["keep_weekly"])
+    parser.add_argument("--dry-run", action="store_true", help="prune: só mostra o que seria removido")
+    args = parser.parse_args(argv)
+
+    repository = BackupRepository(args.repository, args.compression) if args.repository else default_repository()
+    repository.compression = args.compression
+    worlds = [w for w in find_worlds(args.game_dir) if not args.world or os.path.basename(w) == args.world]
+    retention = {"keep_last": args.keep_last, "keep_daily": args.keep_daily, "keep_weekly": args.keep_weekly}
+
+    if args.command == "backup":
+        if not worlds:
+            print("Nenhum mundo encontrado.", file=sys.stderr)
+            return 1
+        for world_path in worlds:
+            snapshot = repository.backup(world_path)
+            print(json.dumps({"id": snapshot["id"], **snapshot["stats"]}))
+            repository.prune(snapshot["world_key"], **retention)
+        repository.gc()
+    elif args.command == "list":
+        keys = {repository.world_key(w) for w in worlds} if args.world else None
+        for snapshot in repository.snapshots():
+            if keys is None or snapshot["world_key"] in keys:
+                stamp = datetime.fromtimestamp(snapshot["created"]).strftime("%Y-%m-%d %H:%M:%S")
+                print(f"{snapshot['id']}  {stamp}  {snapshot['world']}  {snapshot['stats']['bytes_total'] / (1024 * 1024):.1f} MB")
+    elif args.command == "restore":
+        if not args.snapshot:
+            parser.error("restore precisa do id do snapshot")
+        try:
+            print(repository.restore(args.snapshot, args.target))
+        except (KeyError, FileExistsError, ValueError) as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            return 1
+    elif args.command == "prune":
+        for world_path in worlds:
+            removed = repository.prune(repository.world_key(world_path), dry_run=args.dry_run, **retention)
+            print(f"{os.path.basename(world_path)}: {len(removed)} snapshot(s) removido(s)")
+        if not args.dry_run:
+            objects, freed = repository.gc()
+            print(f"{objects} objeto(s) removido(s), {freed / (1024 * 1024):.1f} MB liberados")
+    else:
+        objects, size = repository.usage()
+        print(f"{repository.root}: {len(repository.snapshots())} snapshots, {objects} objetos, {size / (1024 * 1024):.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())